@@ -0,0 +1,218 @@
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from stock_analyzer import StockCompetitorAnalyzer, add_analyzer_arguments, create_analyzer
+
+
+def to_jsonable(value):
+    """Convert analysis results (numpy scalars, NaN, timestamps) into plain JSON types"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist())
+    if hasattr(value, 'to_dict'):
+        return to_jsonable(value.to_dict())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class AnalysisService:
+    """
+    Long-lived analyzer shared by every HTTP client.
+
+    All requests go through one StockCompetitorAnalyzer, so its symbol cache is shared,
+    and concurrent requests for the same symbol are coalesced into a single analysis.
+    """
+
+    def __init__(self, analyzer=None, max_workers=8):
+        self.analyzer = analyzer or StockCompetitorAnalyzer()
+        self.max_workers = max_workers
+        self.results = {}
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def analyze(self, symbol):
+        """Analyze a symbol, joining an in-flight analysis of the same symbol if there is one"""
+        symbol = symbol.strip().upper()
+
+        with self._lock:
+            future = self._inflight.get(symbol)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[symbol] = Future()
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = self.analyzer.analyze_stock(symbol)
+            if result:
+                result['analyzed_at'] = time.time()
+                self.results[symbol] = result
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[symbol]
+
+    def batch_analyze(self, symbols):
+        """Analyze several symbols concurrently; duplicates are analyzed once"""
+        unique = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(unique, pool.map(self.analyze, unique)))
+
+    def cached(self, symbol):
+        """Return whatever is already known about a symbol without touching the data source"""
+        symbol = symbol.strip().upper()
+        stock = self.analyzer.cache.get(symbol)
+        analysis = self.results.get(symbol)
+        if stock is None and analysis is None:
+            return None
+        return {'symbol': symbol, 'stock': stock, 'analysis': analysis}
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: /health, /metrics, /analyze, /batch, /cached"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        symbol = params.get('symbol', [''])[0]
+
+        if url.path == '/health':
+            stats = self.server.service.analyzer.fetch_stats()
+            self._send(200, {'status': 'ok' if stats['breaker_state'] == 'closed' else 'degraded',
+                             'data_source': stats['breaker_state'],
+                             'cached_symbols': len(self.server.service.analyzer.cache)})
+        elif url.path == '/metrics':
+            self._send(200, self.server.service.analyzer.fetch_stats())
+        elif url.path == '/analyze':
+            self._analyze(symbol)
+        elif url.path == '/batch':
+            self._batch(','.join(params.get('symbols', [''])).split(','))
+        elif url.path == '/cached':
+            self._cached(symbol)
+        else:
+            self._send(404, {'error': f"Unknown endpoint '{url.path}'"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send(400, {'error': 'Request body must be valid JSON'})
+            return
+
+        if url.path == '/analyze':
+            self._analyze(payload.get('symbol', ''))
+        elif url.path == '/batch':
+            self._batch(payload.get('symbols', []))
+        else:
+            self._send(404, {'error': f"Unknown endpoint '{url.path}'"})
+
+    def _analyze(self, symbol):
+        if not symbol:
+            self._send(400, {'error': "Missing 'symbol' parameter"})
+            return
+        result = self.server.service.analyze(symbol)
+        if result:
+            self._send(200, result)
+        else:
+            self._send(404, {'error': f"Could not analyze '{symbol.upper()}'"})
+
+    def _batch(self, symbols):
+        symbols = [s for s in symbols if s and s.strip()]
+        if not symbols:
+            self._send(400, {'error': "Missing 'symbols' parameter"})
+            return
+        self._send(200, {'results': self.server.service.batch_analyze(symbols)})
+
+    def _cached(self, symbol):
+        if not symbol:
+            self._send(400, {'error': "Missing 'symbol' parameter"})
+            return
+        cached = self.server.service.cached(symbol)
+        if cached:
+            self._send(200, cached)
+        else:
+            self._send(404, {'error': f"No cached data for '{symbol.upper()}'"})
+
+    def _send(self, status, payload):
+        body = json.dumps(to_jsonable(payload)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(service, host='127.0.0.1', port=8765, quiet=False):
+    """Create (but do not start) a threaded HTTP server around an AnalysisService"""
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON service for the Stock Competitor Analyzer")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument('--offline', action='store_true', help="Serve synthetic offline data instead of Yahoo Finance")
+    parser.add_argument('--workers', type=int, default=8, help="Parallel analyses per batch request")
+    parser.add_argument('--warmup', nargs='?', const='', default=None, metavar='SYMBOLS',
+                        help="Prefetch the most analyzed peer groups at startup (plus optional comma-separated symbols)")
+    add_analyzer_arguments(parser)
+    args = parser.parse_args()
+
+    data_source = None
+    if args.offline:
+        from offline_data import OfflineDataSource
+        data_source = OfflineDataSource()
+
+    analyzer = create_analyzer(args.peers, args.record_history, data_source)
+    service = AnalysisService(analyzer, max_workers=args.workers)
+    server = create_server(service, args.host, args.port)
+    if args.warmup is not None:
+        from analysis_snapshots import SnapshotStore
+        from cache_warmup import start_warmup
+        warmer = start_warmup(service.analyzer, SnapshotStore(), args.warmup.split(','))
+        if warmer:
+            print(f"🔥 Warming up {', '.join(warmer.symbols)} in the background")
+
+    print(f"🚀 Stock analysis service listening on http://{args.host}:{args.port}")
+    print("📋 Endpoints: /analyze?symbol=CRM  /batch?symbols=CRM,NOW  /cached?symbol=CRM  /health  /metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
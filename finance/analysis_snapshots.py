@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis_service import to_jsonable
+from history_store import DEFAULT_CACHE_DIR
+from stock_analyzer import PeerStats
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(DEFAULT_CACHE_DIR, 'snapshots')
+
+# Columns of the snapshot index, which is all the history list needs to read
+INDEX_COLUMNS = ['id', 'symbol', 'name', 'saved_at', 'score', 'recommendation', 'peers']
+
+# Rows shown when comparing snapshots side by side
+COMPARE_FIELDS = [
+    ('score', 'Score'), ('recommendation', 'Recommendation'), ('peer_rank', 'Peer Rank'),
+    ('current_price', 'Price'), ('target_price', 'Target Price'), ('pe_ratio', 'P/E'),
+    ('roe', 'ROE'), ('profit_margin', 'Profit Margin'), ('debt_to_equity', 'Debt/Equity'),
+    ('current_ratio', 'Current Ratio'), ('revenue_growth', 'Revenue Growth'),
+    ('one_year_return', '1Y Return %'), ('volatility', 'Volatility'), ('peers', 'Peers')
+]
+
+
+class SnapshotStore:
+    """
+    Saved analysis results that reopen instantly without any network access.
+
+    Each snapshot is a folder holding the scored records, peer statistics and
+    sensitivity as JSON plus the aligned daily closes as .npy arrays, which are
+    memory-mapped on load. A small CSV index backs the history list.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_SNAPSHOT_DIR
+        os.makedirs(self.root, exist_ok=True)
+        self.index_path = os.path.join(self.root, 'index.csv')
+
+    def save(self, result, closes=None):
+        """
+        Save an analysis result (and optionally the close prices behind it).
+
+        Returns:
+            str: snapshot id
+        """
+        main_stock = result['main_stock']
+        saved_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        snapshot_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{re.sub(r'[^A-Za-z0-9.-]', '_', main_stock['symbol'])}"
+        path = os.path.join(self.root, snapshot_id)
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.root, f"{snapshot_id}-{suffix}")
+        snapshot_id = os.path.basename(path)
+        os.makedirs(path)
+
+        meta = {
+            'id': snapshot_id,
+            'saved_at': saved_at,
+            'main_symbol': main_stock['symbol'],
+            'records': result['all_stocks'],
+            'industry_avg': result['industry_avg'],
+            'peer_stats': result['peer_stats'],
+            'sensitivity': result.get('sensitivity'),
+            'price_symbols': []
+        }
+
+        if closes is not None and len(closes) > 0:
+            meta['price_symbols'] = list(closes.columns)
+            np.save(os.path.join(path, 'dates.npy'), closes.index.values.astype('datetime64[ns]').astype(np.int64))
+            np.save(os.path.join(path, 'closes.npy'), closes.to_numpy(dtype=float))
+
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(to_jsonable(meta), f)
+
+        is_new = not os.path.exists(self.index_path)
+        with open(self.index_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(INDEX_COLUMNS)
+            writer.writerow([snapshot_id, main_stock['symbol'], main_stock['name'], saved_at,
+                             f"{main_stock['score']:.2f}", main_stock['recommendation_data']['recommendation'],
+                             ' '.join(s['symbol'] for s in result['competitors'])])
+        return snapshot_id
+
+    def list(self):
+        """All saved snapshots, newest first"""
+        if not os.path.exists(self.index_path):
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        index = pd.read_csv(self.index_path, dtype={'peers': str}, keep_default_na=False)
+        index = index[[os.path.isdir(os.path.join(self.root, i)) for i in index['id']]]
+        return index.iloc[::-1].reset_index(drop=True)
+
+    def load(self, snapshot_id, mmap=True):
+        """Rebuild an analysis result from a snapshot, in the same shape build_analysis returns"""
+        path = os.path.join(self.root, snapshot_id)
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        all_stocks = meta['records']
+        main_stock = next(s for s in all_stocks if s['symbol'] == meta['main_symbol'])
+        sensitivity = meta.get('sensitivity')
+        if sensitivity:
+            sensitivity['percentiles'] = {int(q): v for q, v in sensitivity['percentiles'].items()}
+
+        price_history = pd.DataFrame()
+        if meta['price_symbols']:
+            mode = 'r' if mmap else None
+            dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode=mode)
+            closes = np.load(os.path.join(path, 'closes.npy'), mmap_mode=mode)
+            price_history = pd.DataFrame(closes, index=pd.to_datetime(np.asarray(dates)), columns=meta['price_symbols'])
+
+        return {
+            'main_stock': main_stock,
+            'competitors': [s for s in all_stocks if s['symbol'] != meta['main_symbol']],
+            'all_stocks': all_stocks,
+            'industry_avg': meta['industry_avg'],
+            'peer_stats': PeerStats(all_stocks),
+            'sensitivity': sensitivity,
+            'price_history': price_history,
+            'snapshot_id': snapshot_id,
+            'saved_at': meta['saved_at']
+        }
+
+    def delete(self, snapshot_id):
+        """Remove a snapshot's files (the index skips missing snapshots)"""
+        path = os.path.join(self.root, snapshot_id)
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+        os.rmdir(path)
+
+    def compare(self, snapshot_ids):
+        """Key figures of several snapshots side by side, one column per snapshot"""
+        columns = {}
+        for snapshot_id in snapshot_ids:
+            result = self.load(snapshot_id)
+            main_stock = result['main_stock']
+            values = dict(main_stock)
+            values.update({
+                'recommendation': main_stock['recommendation_data']['recommendation'],
+                'target_price': main_stock['recommendation_data']['target_price'],
+                'peer_rank': f"{next(i + 1 for i, s in enumerate(result['all_stocks']) if s['symbol'] == main_stock['symbol'])}"
+                             f"/{len(result['all_stocks'])}",
+                'peers': ', '.join(s['symbol'] for s in result['competitors'])
+            })
+            columns[snapshot_id] = [values.get(field) for field, _ in COMPARE_FIELDS]
+        return pd.DataFrame(columns, index=[label for _, label in COMPARE_FIELDS])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse and compare saved analysis snapshots")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help="List saved snapshots, newest first")
+    show_parser = subparsers.add_parser('show', help="Show the rankings of one snapshot")
+    show_parser.add_argument('id')
+    compare_parser = subparsers.add_parser('compare', help="Compare snapshots side by side")
+    compare_parser.add_argument('ids', nargs='+')
+    args = parser.parse_args()
+
+    store = SnapshotStore()
+    if args.command == 'list':
+        print(store.list().to_string(index=False))
+    elif args.command == 'show':
+        result = store.load(args.id)
+        print(f"📸 {result['main_stock']['symbol']} saved {result['saved_at']}")
+        for rank, stock in enumerate(result['all_stocks'], start=1):
+            marker = '⭐' if stock['symbol'] == result['main_stock']['symbol'] else '  '
+            print(f"#{rank:<3} {marker}{stock['symbol']:<8} {stock['score']:6.1f}  "
+                  f"{stock['recommendation_data']['recommendation']}")
+    else:
+        print(store.compare(args.ids).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import threading
+import time
+from collections import Counter
+
+from stock_analyzer import StockCompetitorAnalyzer
+from watchlist_monitor import RateBudget
+
+
+def popular_symbols(snapshots=None, configured=None, limit=5):
+    """
+    Symbols worth warming up: the configured ones first, then the most analyzed
+    symbols from the snapshot history (ties go to the most recently analyzed).
+
+    Args:
+        snapshots (SnapshotStore): Saved analyses used as usage history
+        configured (list): Symbols that are always warmed up
+        limit (int): Max symbols taken from the usage history
+    """
+    symbols = [s.strip().upper() for s in configured or [] if s.strip()]
+    if snapshots is not None and limit:
+        history = snapshots.list()
+        counts = Counter(str(s).upper() for s in history['symbol'])  # newest first, so ties favor recent use
+        symbols.extend([s for s, _ in counts.most_common() if s not in symbols][:limit])
+    return list(dict.fromkeys(symbols))
+
+
+class CacheWarmer:
+    """
+    Loads popular peer groups into the analyzer's caches in the background.
+
+    A single daemon thread fetches each symbol, its competitors and their peer
+    statistics and scores, spending at most `max_requests` data requests at a slow
+    rate so user-facing lookups keep priority. A user analysis that starts while a
+    symbol is being warmed joins that in-flight fetch instead of repeating it.
+    """
+
+    def __init__(self, analyzer, symbols, requests_per_minute=30, max_requests=120):
+        """
+        Args:
+            analyzer (StockCompetitorAnalyzer): Shared analyzer whose caches are warmed
+            symbols (list): Main symbols whose peer groups are loaded, most important first
+            requests_per_minute (float): Data request rate of the warm-up
+            max_requests (int): Total data requests the warm-up may spend
+        """
+        self.analyzer = analyzer
+        self.symbols = [s.upper() for s in symbols]
+        self.budget = RateBudget(requests_per_minute / 60.0, burst=5)
+        self.max_requests = max_requests
+        self.requests_used = 0
+        self.warmed = []
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start warming in a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop after the current fetch"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wait(self, timeout=None):
+        """Block until the warm-up has finished; returns False on timeout"""
+        return self.finished.wait(timeout)
+
+    def _spend(self, cost):
+        """Take `cost` requests from the budget; False once it is exhausted, stopped or the source is failing"""
+        if self.requests_used + cost > self.max_requests or self.analyzer.fetch_stats()['breaker_state'] != 'closed':
+            return False
+        if not self.budget.acquire(cost, self._stop):
+            return False
+        self.requests_used += cost
+        return True
+
+    def _fetch(self, symbol):
+        """Cached stock data for a symbol, fetching it (info + history) if the budget allows"""
+        if symbol in self.analyzer.cache:
+            return self.analyzer.cache[symbol]
+        if not self._spend(2):
+            return None
+        return self.analyzer.get_stock_info(symbol)
+
+    def _run(self):
+        start = time.time()
+        try:
+            for symbol in self.symbols:
+                if self._stop.is_set():
+                    break
+                main_stock = self._fetch(symbol)
+                if not main_stock:
+                    continue
+
+                # Competitor discovery validates up to five symbols
+                if not self._spend(5):
+                    break
+                peers = self.analyzer.find_industry_competitors(main_stock)
+                competitor_data = [data for data in (self._fetch(peer) for peer in peers) if data]
+
+                # Fill the peer statistics and score caches too
+                if competitor_data:
+                    self.analyzer.build_analysis(main_stock, competitor_data)
+                    self.warmed.append(symbol)
+        except Exception as e:
+            print(f"Warm-up stopped: {str(e)}")
+        finally:
+            self.finished.set()
+            if self.warmed:
+                print(f"🔥 Warmed {len(self.warmed)} peer groups ({', '.join(self.warmed)}) with "
+                      f"{self.requests_used} data requests in {time.time() - start:.1f}s")
+
+
+def start_warmup(analyzer, snapshots=None, configured=None, limit=5, requests_per_minute=30, max_requests=120):
+    """Start a background warm-up of the popular peer groups; returns the CacheWarmer (None if nothing to warm)"""
+    # Don't spend requests against a data source that is already failing
+    if analyzer.fetch_stats()['breaker_state'] != 'closed':
+        print("⚠️ Skipping warm-up: data source circuit breaker is open")
+        return None
+    symbols = popular_symbols(snapshots, configured, limit)
+    if not symbols:
+        return None
+    return CacheWarmer(analyzer, symbols, requests_per_minute, max_requests).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how much a cache warm-up speeds up the first analysis")
+    parser.add_argument('symbols', nargs='*', help="Symbols to warm (default: most analyzed in the snapshot history)")
+    parser.add_argument('--offline', action='store_true', help="Use synthetic offline data instead of Yahoo Finance")
+    parser.add_argument('--latency', type=float, default=0.2, help="Simulated offline latency per request in seconds")
+    parser.add_argument('--rpm', type=float, default=600, help="Warm-up data requests per minute")
+    args = parser.parse_args()
+
+    from analysis_snapshots import SnapshotStore
+
+    def make_analyzer():
+        if args.offline:
+            from offline_data import OfflineDataSource
+            return StockCompetitorAnalyzer(data_source=OfflineDataSource(latency=args.latency))
+        return StockCompetitorAnalyzer()
+
+    symbols = popular_symbols(SnapshotStore(), args.symbols)
+    if not symbols:
+        print("❌ Nothing to warm: pass symbols or save some analyses first")
+        return
+
+    cold = make_analyzer()
+    start = time.perf_counter()
+    cold.analyze_stock(symbols[0])
+    cold_seconds = time.perf_counter() - start
+
+    warm = make_analyzer()
+    warmer = CacheWarmer(warm, symbols, requests_per_minute=args.rpm).start()
+    warmer.wait()
+    start = time.perf_counter()
+    warm.analyze_stock(symbols[0])
+    warm_seconds = time.perf_counter() - start
+
+    print(f"🧊 First analysis of {symbols[0]} cold: {cold_seconds:.2f}s")
+    print(f"🔥 First analysis of {symbols[0]} after warm-up: {warm_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
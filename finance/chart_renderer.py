@@ -0,0 +1,318 @@
+import argparse
+import base64
+import html
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Same palette as the GUI's dark theme
+DASHBOARD_COLORS = {
+    'bg_primary': '#0f172a',
+    'bg_card': '#334155',
+    'accent_primary': '#3b82f6',
+    'accent_success': '#10b981',
+    'accent_warning': '#f59e0b',
+    'accent_danger': '#ef4444',
+    'text_primary': '#f8fafc',
+    'text_muted': '#64748b',
+    'border': '#475569'
+}
+
+REPORT_FORMATS = ('png', 'html')
+
+
+class DashboardRenderer:
+    """
+    Draws the 2x2 investment dashboard without any GUI.
+
+    The figure and its axes are created once and cleared between reports, so a
+    renderer kept alive in a worker process draws hundreds of dashboards without
+    rebuilding the figure each time. The tight layout is computed for the first
+    report only: every dashboard has the same panels and short ticker labels, and
+    the layout pass costs about as much as drawing. Uses the Agg canvas directly,
+    never pyplot.
+    """
+
+    def __init__(self, colors=None, figsize=(14, 10), dpi=100):
+        self.colors = dict(DASHBOARD_COLORS, **(colors or {}))
+        self.dpi = dpi
+        self.figure = Figure(figsize=figsize, facecolor=self.colors['bg_primary'])
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.subplots(2, 2)
+        self._laid_out = False
+
+    def draw(self, result):
+        """Draw the dashboard for one analysis result (as returned by build_analysis) and return the figure"""
+        c = self.colors
+        all_stocks = result['all_stocks']
+        main_symbol = result['main_stock']['symbol']
+        fig = self.figure
+
+        for ax in self.axes.flat:
+            ax.clear()
+            ax.set_facecolor(c['bg_card'])
+        fig.suptitle('Investment Analysis Dashboard', fontsize=16, color=c['text_primary'], fontweight='bold')
+
+        symbols = [stock['symbol'] for stock in all_stocks]
+        colors = [c['accent_danger'] if s == main_symbol else c['accent_primary'] for s in symbols]
+
+        # 1. Investment Scores Ranking
+        ax1 = self.axes[0, 0]
+        scores = [stock['score'] for stock in all_stocks]
+        ax1.barh(symbols, scores, color=colors, alpha=0.8)
+        ax1.set_title('Investment Scores (Ranked)', fontweight='bold', color=c['text_primary'])
+        ax1.set_xlabel('Score (0-100)', color=c['text_primary'])
+        ax1.axvline(x=50, color=c['text_muted'], linestyle='--', alpha=0.7, label='Neutral (50)')
+        ax1.axvline(x=60, color=c['accent_success'], linestyle='--', alpha=0.7, label='Buy Zone (60+)')
+        for i, score in enumerate(scores):
+            ax1.text(score + 1, i, f'{score:.1f}', va='center', fontweight='bold', color=c['text_primary'])
+        ax1.legend(loc='lower right')
+
+        # 2. P/E Ratio Comparison
+        ax2 = self.axes[0, 1]
+        pe_ratios = [stock['pe_ratio'] if stock['pe_ratio'] and stock['pe_ratio'] > 0 else 0 for stock in all_stocks]
+        bars2 = ax2.bar(symbols, pe_ratios, color=colors, alpha=0.8)
+        ax2.set_title('P/E Ratio Comparison', fontweight='bold', color=c['text_primary'])
+        ax2.set_ylabel('P/E Ratio', color=c['text_primary'])
+        for bar in bars2:
+            height = bar.get_height()
+            if height > 0:
+                ax2.text(bar.get_x() + bar.get_width() / 2., height + 0.5, f'{height:.1f}',
+                         ha='center', va='bottom', fontweight='bold', color=c['text_primary'])
+        setp(ax2.get_xticklabels(), rotation=45, ha='right')
+
+        # 3. ROE vs Debt/Equity Scatter
+        ax3 = self.axes[1, 0]
+        roe_values = [stock['roe'] * 100 if stock['roe'] else 0 for stock in all_stocks]
+        debt_values = [stock['debt_to_equity'] if stock['debt_to_equity'] else 0 for stock in all_stocks]
+        ax3.scatter(debt_values, roe_values, c=colors, s=120, alpha=0.8, edgecolors='white', linewidth=2)
+        for i, symbol in enumerate(symbols):
+            if debt_values[i] > 0 or roe_values[i] > 0:
+                ax3.annotate(symbol, (debt_values[i], roe_values[i]), xytext=(5, 5), textcoords='offset points',
+                             fontsize=9, fontweight='bold', color=c['text_primary'])
+        ax3.set_xlabel('Debt/Equity Ratio', color=c['text_primary'])
+        ax3.set_ylabel('ROE (%)', color=c['text_primary'])
+        ax3.set_title('Profitability vs Financial Leverage', fontweight='bold', color=c['text_primary'])
+        ax3.grid(True, alpha=0.3, color=c['text_muted'])
+
+        # Quadrant lines at the peer averages
+        if max(debt_values) > 0 and max(roe_values) > 0:
+            peer_means = result['peer_stats'].positive_means
+            ax3.axhline(y=peer_means['roe'] * 100, color=c['text_muted'], linestyle='--', alpha=0.5)
+            ax3.axvline(x=peer_means['debt_to_equity'], color=c['text_muted'], linestyle='--', alpha=0.5)
+
+        # 4. Recommendation Distribution
+        ax4 = self.axes[1, 1]
+        rec_colors_map = {
+            'STRONG BUY': c['accent_success'],
+            'BUY': '#16a34a',
+            'HOLD': c['accent_warning'],
+            'SELL': '#dc2626',
+            'STRONG SELL': c['accent_danger']
+        }
+        rec_counts = {}
+        for stock in all_stocks:
+            rec = stock['recommendation_data']['recommendation']
+            rec_counts[rec] = rec_counts.get(rec, 0) + 1
+        if rec_counts:
+            ax4.pie(rec_counts.values(), labels=rec_counts.keys(),
+                    colors=[rec_colors_map.get(rec, c['accent_primary']) for rec in rec_counts],
+                    autopct='%1.0f%%', startangle=90, textprops={'color': c['text_primary'], 'fontweight': 'bold'})
+            ax4.set_title('Investment Recommendations Distribution', fontweight='bold', color=c['text_primary'])
+
+        # Style all axes
+        for ax in self.axes.flat:
+            ax.tick_params(colors=c['text_primary'])
+            for spine in ax.spines.values():
+                spine.set_color(c['border'])
+
+        if not self._laid_out:
+            fig.tight_layout()
+            self._laid_out = True
+        return fig
+
+    def to_png(self, result):
+        """The dashboard for one analysis result as PNG bytes"""
+        self.draw(result)
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format='png', dpi=self.dpi, facecolor=self.figure.get_facecolor())
+        return buffer.getvalue()
+
+
+def report_html(result, png):
+    """Standalone HTML page: the dashboard image (embedded) and the ranking table"""
+    main_stock = result['main_stock']
+    rows = []
+    for rank, stock in enumerate(result['all_stocks'], start=1):
+        rec_data = stock['recommendation_data']
+        marker = ' class="main"' if stock['symbol'] == main_stock['symbol'] else ''
+        rows.append(f"<tr{marker}><td>{rank}</td><td>{html.escape(stock['symbol'])}</td>"
+                    f"<td>{html.escape(str(stock['name']))}</td><td>{stock['score']:.1f}</td>"
+                    f"<td>{rec_data['recommendation']}</td><td>${rec_data['target_price']:.2f}</td>"
+                    f"<td>${stock['current_price']:.2f}</td><td>{rec_data['risk_level']}</td></tr>")
+    title = f"{main_stock['symbol']} - {main_stock['name']}"
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>
+body {{ background: #0f172a; color: #f8fafc; font-family: 'Segoe UI', sans-serif; margin: 24px; }}
+table {{ border-collapse: collapse; margin-top: 16px; }}
+th, td {{ padding: 6px 14px; border-bottom: 1px solid #475569; text-align: left; }}
+th {{ background: #1e293b; }}
+tr.main {{ color: #ef4444; font-weight: bold; }}
+img {{ max-width: 100%; }}
+</style></head><body>
+<h1>{html.escape(title)}</h1>
+<p>{html.escape(str(main_stock['sector']))} / {html.escape(str(main_stock['industry']))} &middot;
+Generated {time.strftime('%Y-%m-%d %H:%M')}</p>
+<img src="data:image/png;base64,{base64.b64encode(png).decode('ascii')}" alt="Investment Analysis Dashboard">
+<table>
+<tr><th>Rank</th><th>Symbol</th><th>Company</th><th>Score</th><th>Recommendation</th><th>Target</th><th>Price</th><th>Risk</th></tr>
+{chr(10).join(rows)}
+</table>
+</body></html>
+"""
+
+
+def render_report(renderer, result, out_dir, formats=REPORT_FORMATS, name=None):
+    """Write one analysis result's dashboard as PNG and/or HTML; returns the written paths"""
+    name = name or result['main_stock']['symbol']
+    png = renderer.to_png(result)
+    paths = []
+    if 'png' in formats:
+        paths.append(os.path.join(out_dir, f"{name}.png"))
+        with open(paths[-1], 'wb') as f:
+            f.write(png)
+    if 'html' in formats:
+        paths.append(os.path.join(out_dir, f"{name}.html"))
+        with open(paths[-1], 'w', encoding='utf-8') as f:
+            f.write(report_html(result, png))
+    return paths
+
+
+def report_payload(result):
+    """The parts of an analysis result the renderer needs (keeps what is sent to workers small)"""
+    return {key: result[key] for key in ('main_stock', 'all_stocks', 'peer_stats')}
+
+
+# One renderer per worker process, so the figure template is reused across reports
+_worker_renderer = None
+
+
+def _init_worker(colors):
+    global _worker_renderer
+    _worker_renderer = DashboardRenderer(colors)
+
+
+def _render_job(job, out_dir, formats):
+    name, result = job
+    try:
+        return name, render_report(_worker_renderer, result, out_dir, formats, name), None
+    except Exception as e:
+        return name, [], str(e)
+
+
+def render_batch(results, out_dir, formats=REPORT_FORMATS, workers=None, colors=None, callback=None):
+    """
+    Render many dashboards in parallel across a process pool.
+
+    Args:
+        results (dict): report name -> analysis result
+        out_dir (str): Directory for the PNG/HTML files
+        formats (tuple): Any of 'png' and 'html'
+        workers (int): Rendering processes (default: CPU count)
+
+    Returns:
+        dict: report name -> written paths (empty for reports that failed)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(name, report_payload(result)) for name, result in results.items()]
+    written = {}
+    chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(colors,)) as pool:
+        for name, paths, error in pool.map(partial(_render_job, out_dir=out_dir, formats=formats), jobs,
+                                           chunksize=chunksize):
+            written[name] = paths
+            if error:
+                print(f"Error rendering {name}: {error}")
+            elif callback and len(written) % 50 == 0:
+                callback(f"🎨 Rendered {len(written)}/{len(jobs)} reports...")
+    return written
+
+
+def write_index(out_dir, results, written):
+    """index.html linking every rendered report, best score first"""
+    rows = []
+    ranked = sorted(results.items(), key=lambda item: item[1]['main_stock']['score'], reverse=True)
+    for name, result in ranked:
+        if not written.get(name):
+            continue
+        main_stock = result['main_stock']
+        target = os.path.basename(next((p for p in written[name] if p.endswith('.html')), written[name][0]))
+        rows.append(f"<tr><td><a href=\"{html.escape(target)}\">{html.escape(name)}</a></td>"
+                    f"<td>{html.escape(str(main_stock['name']))}</td><td>{main_stock['score']:.1f}</td>"
+                    f"<td>{main_stock['recommendation_data']['recommendation']}</td></tr>")
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Coverage dashboards</title>
+<style>body {{ background: #0f172a; color: #f8fafc; font-family: 'Segoe UI', sans-serif; margin: 24px; }}
+a {{ color: #3b82f6; }} td, th {{ padding: 4px 14px; text-align: left; }}</style></head><body>
+<h1>Coverage dashboards ({len(rows)})</h1><p>Generated {time.strftime('%Y-%m-%d %H:%M')}</p>
+<table><tr><th>Report</th><th>Company</th><th>Score</th><th>Recommendation</th></tr>
+{chr(10).join(rows)}
+</table></body></html>
+""")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render dashboard PNG/HTML reports for many symbols without the GUI")
+    parser.add_argument('symbols', nargs='*', help="Symbols to analyze (default: the --universe file or all competitor tables)")
+    parser.add_argument('--universe', help="CSV or text file of symbols")
+    parser.add_argument('--snapshots', nargs='*', metavar='ID',
+                        help="Render saved analysis snapshots instead (all of them when no ids are given)")
+    parser.add_argument('--offline', action='store_true', help="Use synthetic offline data instead of Yahoo Finance")
+    parser.add_argument('--output', default='reports', help="Output directory (default: reports)")
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=list(REPORT_FORMATS),
+                        help="Report formats to write")
+    parser.add_argument('--workers', type=int, default=None, help="Rendering processes (default: CPU count)")
+    parser.add_argument('--fetch-workers', type=int, default=16, help="Concurrent analyses")
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.snapshots is not None:
+        from analysis_snapshots import SnapshotStore
+        store = SnapshotStore()
+        ids = args.snapshots or list(store.list()['id'])
+        results = {snapshot_id: store.load(snapshot_id) for snapshot_id in ids}
+    else:
+        from sector_screener import load_universe
+        from stock_analyzer import StockCompetitorAnalyzer
+
+        symbols = [s.upper() for s in args.symbols] or load_universe(args.universe)
+        data_source = None
+        if args.offline:
+            from offline_data import OfflineDataSource
+            data_source = OfflineDataSource(extra_symbols=symbols)
+        analyzer = StockCompetitorAnalyzer(data_source=data_source)
+
+        print(f"📊 Analyzing {len(symbols)} symbols...")
+        with ThreadPoolExecutor(max_workers=args.fetch_workers) as pool:
+            results = {s: r for s, r in zip(symbols, pool.map(analyzer.analyze_stock, symbols)) if r}
+        print(f"✅ {len(results)} analyses in {time.time() - start:.1f}s")
+
+    render_start = time.time()
+    written = render_batch(results, args.output, tuple(args.format), args.workers, callback=print)
+    index = write_index(args.output, results, written)
+    print(f"🎨 Rendered {sum(1 for paths in written.values() if paths)} reports in "
+          f"{time.time() - render_start:.1f}s -> {index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import numbers
+
+import pandas as pd
+
+from stock_analyzer import PeerStats
+
+try:
+    import xlsxwriter
+except ImportError:  # optional: only needed for Excel export
+    xlsxwriter = None
+
+# (header, record key, cell format, column width)
+RANKING_COLUMNS = [
+    ('Rank', 'rank', 'int', 7), ('Symbol', 'symbol', 'text', 10), ('Company', 'name', 'text', 28),
+    ('Sector', 'sector', 'text', 22), ('Industry', 'industry', 'text', 26), ('Score', 'score', 'number', 9),
+    ('Recommendation', 'recommendation', 'text', 16), ('Target Price', 'target_price', 'money', 13),
+    ('Current Price', 'current_price', 'money', 13), ('Risk Level', 'risk_level', 'text', 11)
+]
+
+METRIC_COLUMNS = [
+    ('Symbol', 'symbol', 'text', 10), ('Market Cap', 'market_cap', 'money0', 18), ('P/E', 'pe_ratio', 'number', 9),
+    ('Forward P/E', 'forward_pe', 'number', 12), ('P/B', 'price_to_book', 'number', 9),
+    ('P/S', 'price_to_sales', 'number', 9), ('ROE', 'roe', 'pct', 9), ('ROA', 'roa', 'pct', 9),
+    ('Gross Margin', 'gross_margin', 'pct', 13), ('Operating Margin', 'operating_margin', 'pct', 16),
+    ('Profit Margin', 'profit_margin', 'pct', 13), ('Revenue Growth', 'revenue_growth', 'pct', 15),
+    ('Earnings Growth', 'earnings_growth', 'pct', 15), ('Debt/Equity', 'debt_to_equity', 'number', 12),
+    ('Current Ratio', 'current_ratio', 'number', 13), ('Quick Ratio', 'quick_ratio', 'number', 12),
+    ('Beta', 'beta', 'number', 8), ('Dividend Yield', 'dividend_yield', 'pct', 14),
+    ('YTD Return %', 'ytd_return', 'number', 13), ('1Y Return %', 'one_year_return', 'number', 12),
+    ('Volatility', 'volatility', 'pct', 11)
+]
+
+# Metrics summarized on the industry averages sheet
+AVERAGE_METRICS = [(header, key, fmt) for header, key, fmt, _ in METRIC_COLUMNS if key != 'symbol']
+
+
+class ExcelReport:
+    """
+    Multi-sheet .xlsx workbook written row by row.
+
+    Uses xlsxwriter's constant_memory mode: each row is flushed to disk as soon as
+    the next one starts, so memory stays flat no matter how many symbols are
+    exported. Sheets must therefore be written one complete table at a time.
+    """
+
+    def __init__(self, path):
+        if xlsxwriter is None:
+            raise ImportError("Excel export needs xlsxwriter: pip install xlsxwriter")
+        self.path = path
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+        add = self.workbook.add_format
+        self.formats = {
+            'header': add({'bold': True, 'font_color': 'white', 'bg_color': '#1e293b', 'border': 1}),
+            'title': add({'bold': True, 'font_size': 14}),
+            'text': add({}),
+            'int': add({'num_format': '0'}),
+            'number': add({'num_format': '0.00'}),
+            'money': add({'num_format': '$#,##0.00'}),
+            'money0': add({'num_format': '$#,##0'}),
+            'pct': add({'num_format': '0.0%'})
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_table(self, sheet_name, columns, rows, title=None):
+        """
+        Stream one table into a new sheet.
+
+        Args:
+            columns (list): (header, key, format, width) per column
+            rows (iterable): dicts keyed by the column keys (a generator keeps memory flat)
+            title (str): Optional title line above the header
+
+        Returns:
+            int: number of data rows written
+        """
+        sheet = self.workbook.add_worksheet(sheet_name[:31])
+        first_row = 0
+        if title:
+            sheet.write_string(0, 0, title, self.formats['title'])
+            first_row = 2
+
+        for col, (header, _, fmt, width) in enumerate(columns):
+            sheet.set_column(col, col, width)
+            sheet.write_string(first_row, col, header, self.formats['header'])
+
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            for col, (_, key, fmt, _) in enumerate(columns):
+                self._write_cell(sheet, first_row + count, col, row.get(key), fmt)
+
+        sheet.freeze_panes(first_row + 1, 1)
+        sheet.autofilter(first_row, 0, first_row + count, len(columns) - 1)
+        return count
+
+    def _write_cell(self, sheet, row, col, value, fmt):
+        if value is None or (isinstance(value, float) and value != value):
+            return
+        if isinstance(value, numbers.Number) and not isinstance(value, bool):
+            sheet.write_number(row, col, float(value), self.formats[fmt])
+        else:
+            sheet.write_string(row, col, str(value), self.formats['text'])
+
+    def close(self):
+        self.workbook.close()
+
+
+def ranking_row(rank, stock):
+    """Flatten a scored record into a rankings-sheet row"""
+    rec_data = stock.get('recommendation_data') or {}
+    row = dict(stock)
+    row.update({
+        'rank': rank,
+        'recommendation': stock.get('recommendation', rec_data.get('recommendation')),
+        'target_price': stock.get('target_price', rec_data.get('target_price')),
+        'risk_level': stock.get('risk_level', rec_data.get('risk_level'))
+    })
+    return row
+
+
+def average_rows(peer_stats, label=None):
+    """Industry-average sheet rows for one peer set"""
+    for header, key, fmt in AVERAGE_METRICS:
+        if key in peer_stats.means:
+            yield {
+                'group': label,
+                'metric': header,
+                'mean': peer_stats.means[key],
+                'median': peer_stats.medians[key],
+                'p25': peer_stats.percentiles[25][key],
+                'p75': peer_stats.percentiles[75][key],
+                'positive_mean': peer_stats.positive_means[key]
+            }
+
+
+AVERAGE_COLUMNS = [
+    ('Metric', 'metric', 'text', 18), ('Mean', 'mean', 'number', 14), ('Median', 'median', 'number', 14),
+    ('25th Pct', 'p25', 'number', 14), ('75th Pct', 'p75', 'number', 14),
+    ('Mean (positive only)', 'positive_mean', 'number', 20)
+]
+
+NOTES_COLUMNS = [('Symbol', 'symbol', 'text', 10), ('Type', 'type', 'text', 12), ('Detail', 'detail', 'text', 100)]
+
+
+def note_rows(analyzer, stock, competitors, peer_means=None):
+    """Strengths, concerns and risks of one stock as sheet rows"""
+    strengths, weaknesses = analyzer.calculate_strengths_weaknesses(stock, competitors, peer_means)
+    for kind, items in (('Strength', strengths), ('Concern', weaknesses),
+                        ('Risk', analyzer.assess_risks(stock, competitors))):
+        for item in items:
+            yield {'symbol': stock['symbol'], 'type': kind, 'detail': item}
+
+
+def write_analysis_report(result, path, analyzer):
+    """
+    Export one competitor analysis: rankings, detailed metrics, industry averages
+    and the main stock's strengths and risks.
+    """
+    main_stock = result['main_stock']
+    all_stocks = result['all_stocks']
+    competitors = [s for s in all_stocks if s['symbol'] != main_stock['symbol']]
+    title = f"{main_stock['symbol']} vs competitors"
+
+    with ExcelReport(path) as report:
+        report.write_table('Rankings', RANKING_COLUMNS,
+                           (ranking_row(rank, stock) for rank, stock in enumerate(all_stocks, start=1)), title)
+        report.write_table('Metrics', METRIC_COLUMNS, all_stocks, title)
+        report.write_table('Industry Averages', AVERAGE_COLUMNS, average_rows(result['peer_stats']), title)
+        report.write_table('Strengths & Risks', NOTES_COLUMNS, note_rows(analyzer, main_stock, competitors), title)
+    return path
+
+
+def write_screener_report(tables, path, analyzer):
+    """
+    Export a sector screener run: every ranked symbol, their metrics, averages per
+    peer group, and strengths and risks of each symbol against its own peer group.
+    """
+    ranked = pd.concat(tables.values(), ignore_index=True) if tables else pd.DataFrame()
+    groups = {key: group.to_dict('records') for key, group in ranked.groupby('peer_group', sort=True)} if len(ranked) else {}
+    peer_stats = {key: PeerStats(members) for key, members in groups.items()}
+
+    def records():
+        for table in tables.values():
+            for row in table.itertuples(index=False):
+                yield row._asdict()
+
+    def grouped_averages():
+        for key, stats in peer_stats.items():
+            yield from average_rows(stats, key)
+
+    def notes():
+        for key, members in groups.items():
+            peer_means = peer_stats[key].positive_means
+            for stock in members:
+                yield from note_rows(analyzer, stock, members, peer_means)
+
+    screener_columns = [('Sector Rank', 'sector_rank', 'int', 12)] + RANKING_COLUMNS[1:5] + [
+        ('Peer Group', 'peer_group', 'text', 22), ('Peer Rank', 'peer_rank', 'int', 10)] + RANKING_COLUMNS[5:]
+    metric_columns = [METRIC_COLUMNS[0]] + [c for c in METRIC_COLUMNS[1:] if c[1] in ranked.columns]
+    average_columns = [('Peer Group', 'group', 'text', 24)] + AVERAGE_COLUMNS
+
+    with ExcelReport(path) as report:
+        report.write_table('Rankings', screener_columns, records(), f"Sector screener: {len(ranked)} symbols")
+        report.write_table('Metrics', metric_columns, records())
+        report.write_table('Industry Averages', average_columns, grouped_averages())
+        report.write_table('Strengths & Risks', NOTES_COLUMNS, notes())
+    return path
@@ -0,0 +1,247 @@
+import bisect
+import random
+import re
+import threading
+import time
+
+
+class FetchError(Exception):
+    """A data source call failed"""
+
+
+class TransientFetchError(FetchError):
+    """Failure that may succeed later (throttling, timeouts, outages); never cache it as a negative result"""
+
+
+class PermanentFetchError(FetchError):
+    """Failure that will not go away by retrying (unknown or delisted symbol)"""
+
+
+class CircuitOpenError(TransientFetchError):
+    """The circuit breaker is open: the source is failing, so calls are refused without trying"""
+
+
+# Message fragments of errors worth retrying (HTTP 429/5xx, throttling, network trouble)
+TRANSIENT_PATTERN = re.compile(
+    r"too many requests|rate.?limit|throttl|timed? ?out|temporar|unavailable|connection|reset by peer"
+    r"|\b(429|500|502|503|504)\b", re.IGNORECASE)
+
+# Message fragments of errors that mean the symbol itself is the problem
+PERMANENT_PATTERN = re.compile(r"\b404\b|not found|no data found|delisted|invalid (symbol|ticker)", re.IGNORECASE)
+
+
+def classify_error(error):
+    """
+    'transient' or 'permanent' for an exception raised by a data source.
+
+    Network, timeout and throttling errors are transient; lookups that fail because
+    the symbol does not exist are permanent. Anything unrecognized counts as
+    transient, so an unexplained failure is never cached as "symbol does not exist".
+    """
+    if isinstance(error, TransientFetchError):
+        return 'transient'
+    if isinstance(error, PermanentFetchError):
+        return 'permanent'
+    if isinstance(error, (ConnectionError, TimeoutError)) or 'RateLimit' in type(error).__name__:
+        return 'transient'
+
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None:
+        return 'transient' if status == 429 or status >= 500 else 'permanent'
+
+    message = str(error)
+    if TRANSIENT_PATTERN.search(message):
+        return 'transient'
+    if PERMANENT_PATTERN.search(message):
+        return 'permanent'
+    return 'transient'
+
+
+class LatencyHistogram:
+    """Call latencies in fixed log-spaced millisecond buckets, with approximate percentiles"""
+
+    BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok=True):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.count += 1
+            self.errors += 0 if ok else 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (max observed for the overflow bucket)"""
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = q / 100 * self.count
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= rank and n:
+                    return float(self.BUCKETS_MS[i]) if i < len(self.BUCKETS_MS) else self.max_ms
+            return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+            'buckets': {(f"<={b}ms" if i < len(self.BUCKETS_MS) else f">{self.BUCKETS_MS[-1]}ms"): n
+                        for i, (b, n) in enumerate(zip(self.BUCKETS_MS + [None], self.counts)) if n}
+        }
+
+
+class CircuitBreaker:
+    """
+    Stops request storms against a failing source.
+
+    After `failure_threshold` consecutive transient failures the breaker opens and
+    calls are refused for `reset_timeout` seconds. Then a single trial call is let
+    through (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class ResilientDataSource:
+    """
+    Wraps a data source with jittered retries, a circuit breaker and latency histograms.
+
+    Transient failures are retried with exponential backoff and full jitter;
+    permanent ones are raised straight away as PermanentFetchError. Callers can
+    therefore tell "this symbol does not exist" from "the source is struggling"
+    (TransientFetchError) and only cache the former.
+    """
+
+    def __init__(self, source, retries=3, base_delay=0.5, max_delay=8.0, breaker=None, sleep=time.sleep):
+        """
+        Args:
+            source: Object providing get_info, get_history and optionally get_histories
+            retries (int): Extra attempts after the first failure of a transient kind
+            base_delay (float): Backoff ceiling for the first retry in seconds (doubles per retry)
+            max_delay (float): Upper limit of the backoff ceiling
+            breaker (CircuitBreaker): Shared breaker (a default one is created)
+        """
+        self.source = source
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.histograms = {}
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Everything else (calls counters, symbols, ...) comes from the wrapped source
+        return getattr(self.source, name)
+
+    def _histogram(self, endpoint):
+        with self._lock:
+            return self.histograms.setdefault(endpoint, LatencyHistogram())
+
+    def _call(self, endpoint, fn, *args, **kwargs):
+        histogram = self._histogram(endpoint)
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{endpoint}: data source circuit is open, not calling it")
+
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                histogram.record(time.perf_counter() - start, ok=False)
+                if classify_error(e) == 'permanent':
+                    self.breaker.record_success()  # the source answered; the request was the problem
+                    raise PermanentFetchError(f"{endpoint}: {e}") from e
+                self.breaker.record_failure()
+                if attempt == self.retries:
+                    raise TransientFetchError(f"{endpoint} failed after {attempt + 1} attempts: {e}") from e
+                with self._lock:
+                    self.retried += 1
+                self.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+            else:
+                histogram.record(time.perf_counter() - start)
+                self.breaker.record_success()
+                return result
+
+    def get_info(self, symbol):
+        return self._call('info', self.source.get_info, symbol)
+
+    def get_history(self, symbol, period="1y"):
+        return self._call('history', self.source.get_history, symbol, period=period)
+
+    def get_histories(self, symbols, period="5d"):
+        if hasattr(self.source, 'get_histories'):
+            return self._call('histories', self.source.get_histories, symbols, period=period)
+        return {s: self.get_history(s, period=period) for s in symbols}
+
+    def stats(self):
+        """Latency histogram summary per endpoint plus retry and breaker counters"""
+        with self._lock:
+            histograms = dict(self.histograms)
+        return {
+            'endpoints': {endpoint: h.summary() for endpoint, h in histograms.items()},
+            'retries': self.retried,
+            'breaker_state': self.breaker.state,
+            'breaker_opened': self.breaker.times_opened
+        }
+
+    def latency_report(self):
+        """One console line per endpoint"""
+        lines = []
+        for endpoint, s in self.stats()['endpoints'].items():
+            lines.append(f"   {endpoint:<10} n={s['count']:<6} errors={s['errors']:<4} "
+                         f"p50≤{s['p50_ms']:.0f}ms p90≤{s['p90_ms']:.0f}ms p99≤{s['p99_ms']:.0f}ms max={s['max_ms']:.0f}ms")
+        return '\n'.join(lines)
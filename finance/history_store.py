@@ -0,0 +1,118 @@
+import csv
+import os
+import re
+
+import pandas as pd
+
+# Local cache folder next to the scripts, like the sales/ folder used by the sales tools
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+# Fields kept in point-in-time fundamentals snapshots
+FUNDAMENTAL_FIELDS = [
+    'sector', 'industry', 'market_cap', 'pe_ratio', 'forward_pe', 'price_to_book', 'price_to_sales',
+    'debt_to_equity', 'current_ratio', 'quick_ratio', 'roe', 'roa', 'gross_margin', 'operating_margin',
+    'profit_margin', 'revenue_growth', 'earnings_growth', 'beta', 'dividend_yield', 'payout_ratio'
+]
+
+
+class HistoryStore:
+    """
+    Daily price histories cached on disk, one CSV per symbol.
+
+    New downloads are merged into what is already stored, so the cache grows over
+    time and can be read back without any network access. Point-in-time
+    fundamentals snapshots are appended alongside, one CSV per symbol.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(DEFAULT_CACHE_DIR, 'history')
+        self.fundamentals_root = os.path.join(self.root, 'fundamentals')
+        os.makedirs(self.fundamentals_root, exist_ok=True)
+
+    def _path(self, symbol, root=None):
+        safe = re.sub(r'[^A-Za-z0-9.\-]', '_', symbol.upper())
+        return os.path.join(root or self.root, f"{safe}.csv")
+
+    def symbols(self):
+        """Symbols with a stored history"""
+        return sorted(f[:-4] for f in os.listdir(self.root) if f.endswith('.csv'))
+
+    def save(self, symbol, hist):
+        """Merge a downloaded history into the stored one (newer rows win)"""
+        if hist is None or len(hist) == 0:
+            return
+        hist = hist[[c for c in ['Open', 'High', 'Low', 'Close', 'Volume'] if c in hist.columns]].copy()
+        index = pd.DatetimeIndex(hist.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        hist.index = index.normalize()
+        hist.index.name = 'Date'
+
+        existing = self.load(symbol)
+        if existing is not None:
+            hist = pd.concat([existing, hist])
+            hist = hist[~hist.index.duplicated(keep='last')]
+
+        hist.sort_index().to_csv(self._path(symbol))
+
+    def load(self, symbol, columns=None):
+        """Load a stored history, or None if the symbol has never been saved"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        usecols = ['Date'] + list(columns) if columns else None
+        return pd.read_csv(path, index_col='Date', parse_dates=['Date'], usecols=usecols)
+
+    def load_closes(self, symbols=None, lookback=None):
+        """
+        Aligned closing prices for many symbols.
+
+        Returns:
+            DataFrame: dates x symbols, NaN where a symbol has no price for a date
+        """
+        closes = {}
+        for symbol in symbols or self.symbols():
+            hist = self.load(symbol, columns=['Close'])
+            if hist is not None and len(hist) > 0:
+                closes[symbol] = hist['Close']
+        if not closes:
+            return pd.DataFrame()
+
+        matrix = pd.DataFrame(closes).sort_index()
+        return matrix.iloc[-lookback:] if lookback else matrix
+
+    def save_fundamentals(self, symbol, stock_data, as_of=None):
+        """Append a point-in-time fundamentals snapshot (skipped if unchanged since the last one)"""
+        as_of = pd.Timestamp(as_of or 'today').normalize().strftime('%Y-%m-%d')
+        values = ['' if stock_data.get(field) is None else str(stock_data.get(field)) for field in FUNDAMENTAL_FIELDS]
+
+        path = self._path(symbol, self.fundamentals_root)
+        last = None
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                for last in csv.reader(f):
+                    pass
+            if last is not None and last[2:] == values:
+                return
+
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if last is None:
+                writer.writerow(['as_of', 'symbol'] + FUNDAMENTAL_FIELDS)
+            writer.writerow([as_of, symbol.upper()] + values)
+
+    def load_fundamentals(self, symbols=None):
+        """
+        All stored fundamentals snapshots.
+
+        Returns:
+            DataFrame: one row per (as_of, symbol) snapshot, sorted by date
+        """
+        if symbols is None:
+            files = [os.path.join(self.fundamentals_root, f) for f in os.listdir(self.fundamentals_root) if f.endswith('.csv')]
+        else:
+            files = [self._path(s, self.fundamentals_root) for s in symbols]
+        frames = [pd.read_csv(f, parse_dates=['as_of']) for f in files if os.path.exists(f)]
+        if not frames:
+            return pd.DataFrame(columns=['as_of', 'symbol'] + FUNDAMENTAL_FIELDS)
+        return pd.concat(frames, ignore_index=True).sort_values(['as_of', 'symbol'], kind='stable')
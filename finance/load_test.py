@@ -0,0 +1,118 @@
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+
+from analysis_service import AnalysisService, create_server
+from offline_data import OfflineDataSource
+from stock_analyzer import StockCompetitorAnalyzer
+
+DEFAULT_SYMBOLS = ['CRM', 'NOW', 'MSFT', 'ORCL', 'ADBE', 'NVDA', 'AMD', 'JPM', 'BAC', 'XOM', 'CVX', 'WMT']
+
+
+def timed_get(url):
+    """Issue one GET request and return (status, seconds)"""
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=120) as response:
+            json.load(response)
+            status = response.status
+    except HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def run_load_test(requests=200, concurrency=16, latency=0.05, symbols=None, seed=42, failure_rate=0.0):
+    """
+    Start the service on an ephemeral port against the offline data source and hammer it.
+
+    Returns a summary dict with throughput, latency percentiles and how many data
+    source calls were actually made (coalescing keeps that close to the number of
+    distinct symbols involved), plus the data source's per-endpoint latency
+    histograms. A failure_rate > 0 makes that share of data source calls fail
+    transiently to exercise retries and the circuit breaker.
+    """
+    symbols = symbols or DEFAULT_SYMBOLS
+    data_source = OfflineDataSource(latency=latency, failure_rate=failure_rate, seed=seed)
+    analyzer = StockCompetitorAnalyzer(data_source=data_source)
+    service = AnalysisService(analyzer, max_workers=concurrency)
+    server = create_server(service, port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.6:
+            urls.append(f"{base_url}/analyze?symbol={rng.choice(symbols)}")
+        elif roll < 0.8:
+            urls.append(f"{base_url}/batch?symbols={','.join(rng.sample(symbols, 3))}")
+        else:
+            urls.append(f"{base_url}/cached?symbol={rng.choice(symbols)}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed_get, urls))
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+
+    latencies = np.array([seconds for _, seconds in outcomes]) * 1000
+    statuses = {}
+    for status, _ in outcomes:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'throughput_rps': requests / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+        'statuses': statuses,
+        'source_calls': dict(data_source.calls),
+        'cached_symbols': len(service.analyzer.cache),
+        'fetch_stats': analyzer.fetch_stats(),
+        'latency_report': analyzer.data_source.latency_report()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analysis service against offline data")
+    parser.add_argument('--requests', type=int, default=200, help="Total requests to send")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent client threads")
+    parser.add_argument('--latency', type=float, default=0.05, help="Simulated data source latency in seconds")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="Share of data source calls that fail transiently (tests retries)")
+    args = parser.parse_args()
+
+    print(f"🚀 Sending {args.requests} requests with {args.concurrency} concurrent clients...")
+    summary = run_load_test(args.requests, args.concurrency, args.latency, failure_rate=args.failure_rate)
+
+    print("=" * 60)
+    print("📊 LOAD TEST RESULTS")
+    print("=" * 60)
+    print(f"⏱️ Elapsed: {summary['elapsed_s']:.2f}s  ({summary['throughput_rps']:.1f} req/s)")
+    print(f"📈 Latency p50/p95/p99/max: {summary['p50_ms']:.1f} / {summary['p95_ms']:.1f} / "
+          f"{summary['p99_ms']:.1f} / {summary['max_ms']:.1f} ms")
+    print(f"📋 Status codes: {summary['statuses']}")
+    print(f"🌐 Data source calls: {summary['source_calls']} for {summary['cached_symbols']} cached symbols")
+    fetch_stats = summary['fetch_stats']
+    print(f"🔁 Retries: {fetch_stats['retries']}  Circuit breaker: {fetch_stats['breaker_state']} "
+          f"(opened {fetch_stats['breaker_opened']}x)")
+    print("⏱️ Data source latency by endpoint:")
+    print(summary['latency_report'])
+
+
+if __name__ == "__main__":
+    main()
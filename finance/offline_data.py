@@ -0,0 +1,188 @@
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from stock_analyzer import INDUSTRY_COMPETITORS, SECTOR_COMPETITORS
+
+# Sector each industry table belongs to, used when a symbol only appears in INDUSTRY_COMPETITORS
+INDUSTRY_SECTORS = {
+    'Software': 'Technology',
+    'Semiconductors': 'Technology',
+    'Consumer Electronics': 'Technology',
+    'Internet Content': 'Communication Services',
+    'E-commerce': 'Consumer Cyclical',
+    'Biotechnology': 'Healthcare',
+    'Drug Manufacturers': 'Healthcare',
+    'Medical Devices': 'Healthcare',
+    'Healthcare Plans': 'Healthcare',
+    'Banks': 'Financial Services',
+    'Insurance': 'Financial Services',
+    'Credit Services': 'Financial Services',
+    'Investment Banking': 'Financial Services',
+    'Oil & Gas': 'Energy',
+    'Utilities': 'Utilities',
+    'Renewable Energy': 'Utilities',
+    'Retail': 'Consumer Cyclical',
+    'Restaurants': 'Consumer Cyclical',
+    'Consumer Goods': 'Consumer Defensive',
+    'Apparel': 'Consumer Cyclical',
+    'Aerospace': 'Industrials',
+    'Industrial Equipment': 'Industrials',
+    'Automotive': 'Consumer Cyclical',
+    'Transportation': 'Industrials',
+    'REITs': 'Real Estate',
+    'Media': 'Communication Services',
+    'Gaming': 'Communication Services'
+}
+
+# Trading days generated per yfinance period string
+PERIOD_DAYS = {'5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504, '5y': 1260, '10y': 2520, 'max': 2520}
+
+
+class OfflineDataSource:
+    """
+    Deterministic synthetic market data for offline runs, demos and load tests.
+
+    Every symbol from the competitor tables gets a stable set of fundamentals and a
+    daily price history driven by shared market and sector factors, so peers in the
+    same sector are correlated the way real ones are. No network access is needed.
+    """
+
+    def __init__(self, latency=0.0, extra_symbols=None, failure_rate=0.0, seed=0):
+        """
+        Args:
+            latency (float): Seconds to sleep per call to simulate network round trips
+            extra_symbols (list): Additional symbols to treat as valid equities
+            failure_rate (float): Share of calls that fail like a throttled API (HTTP 503)
+            seed (int): Seed for the simulated failures
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._failures = random.Random(seed)
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._histories = {}
+        self._profiles = {}
+        self._calendar = None
+
+        for industry, symbols in INDUSTRY_COMPETITORS.items():
+            for symbol in symbols:
+                self._profiles.setdefault(symbol, (INDUSTRY_SECTORS.get(industry, 'Unknown'), industry))
+        for sector, symbols in SECTOR_COMPETITORS.items():
+            for symbol in symbols:
+                self._profiles.setdefault(symbol, (sector, f"{sector} Diversified"))
+        for symbol in extra_symbols or []:
+            self._profiles.setdefault(symbol.upper(), ('Unknown', 'Unknown'))
+
+    @property
+    def symbols(self):
+        """All symbols this source can serve"""
+        return sorted(self._profiles)
+
+    def _record_call(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate:
+            with self._lock:
+                failed = self._failures.random() < self.failure_rate
+            if failed:
+                raise ConnectionError(f"Simulated 503 Service Unavailable ({endpoint})")
+
+    def get_info(self, symbol):
+        """Return a yfinance-style info dict (empty for unknown symbols)"""
+        self._record_call('info')
+        if symbol not in self._profiles:
+            return {}
+
+        sector, industry = self._profiles[symbol]
+        rng = np.random.default_rng(zlib.crc32(f"info:{symbol}".encode()))
+        closes = self._full_history(symbol)['Close']
+        last_year = closes.iloc[-252:]
+        price = float(closes.iloc[-1])
+        shares = rng.uniform(2e8, 8e9)
+
+        return {
+            'symbol': symbol,
+            'shortName': f"{symbol} Corp",
+            'quoteType': 'EQUITY',
+            'sector': sector,
+            'industry': industry,
+            'currentPrice': price,
+            'marketCap': int(price * shares),
+            'trailingPE': rng.uniform(8, 60),
+            'forwardPE': rng.uniform(7, 45),
+            'priceToBook': rng.uniform(0.8, 15),
+            'priceToSalesTrailing12Months': rng.uniform(0.5, 20),
+            'debtToEquity': rng.uniform(0, 250),
+            'currentRatio': rng.uniform(0.6, 3.0),
+            'quickRatio': rng.uniform(0.4, 2.5),
+            'returnOnEquity': rng.uniform(-0.05, 0.45),
+            'returnOnAssets': rng.uniform(-0.02, 0.2),
+            'grossMargins': rng.uniform(0.2, 0.85),
+            'operatingMargins': rng.uniform(0.0, 0.45),
+            'profitMargins': rng.uniform(-0.05, 0.35),
+            'revenueGrowth': rng.uniform(-0.1, 0.4),
+            'earningsGrowth': rng.uniform(-0.3, 0.6),
+            'beta': rng.uniform(0.5, 2.0),
+            'dividendYield': rng.uniform(0, 0.04),
+            'payoutRatio': rng.uniform(0, 0.8),
+            'fiftyTwoWeekHigh': float(last_year.max()),
+            'fiftyTwoWeekLow': float(last_year.min()),
+            'averageVolume': int(rng.uniform(1e6, 5e7)),
+            'fullTimeEmployees': int(rng.uniform(1e3, 3e5))
+        }
+
+    def get_history(self, symbol, period="1y"):
+        """Return daily OHLCV history for the requested yfinance period string"""
+        self._record_call('history')
+        if symbol not in self._profiles:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        return self._full_history(symbol).iloc[-PERIOD_DAYS.get(period, 252):].copy()
+
+    def get_histories(self, symbols, period="5d"):
+        """Return daily history for many symbols in one (simulated) request"""
+        self._record_call('histories')
+        return {s: self._full_history(s).iloc[-PERIOD_DAYS.get(period, 252):].copy()
+                for s in symbols if s in self._profiles}
+
+    def _full_history(self, symbol):
+        """Generate (once) the longest supported history for a symbol"""
+        if symbol in self._histories:
+            return self._histories[symbol]
+
+        sector = self._profiles[symbol][0]
+        days = PERIOD_DAYS['max']
+        dates, market = self._market_calendar()
+
+        # Shared factors make peers in the same sector move together
+        sector_factor = np.random.default_rng(zlib.crc32(f"sector:{sector}".encode())).normal(0, 0.007, days)
+        rng = np.random.default_rng(zlib.crc32(f"history:{symbol}".encode()))
+        log_returns = market * rng.uniform(0.6, 1.6) + sector_factor + rng.normal(0, 0.012, days)
+
+        close = rng.uniform(20, 400) * np.exp(np.cumsum(log_returns))
+        hist = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.003, days)),
+            'High': close * (1 + np.abs(rng.normal(0, 0.008, days))),
+            'Low': close * (1 - np.abs(rng.normal(0, 0.008, days))),
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, days)
+        }, index=dates)
+
+        with self._lock:
+            self._histories.setdefault(symbol, hist)
+        return self._histories[symbol]
+
+    def _market_calendar(self):
+        """Business-day index and market factor shared by every generated history"""
+        if self._calendar is None:
+            days = PERIOD_DAYS['max']
+            dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+            self._calendar = (dates, np.random.default_rng(0).normal(0.0003, 0.009, days))
+        return self._calendar
@@ -0,0 +1,183 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from history_store import DEFAULT_CACHE_DIR, HistoryStore
+
+DEFAULT_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR, 'peer_index.npz')
+
+
+class ReturnCorrelationIndex:
+    """
+    Precomputed nearest peers by daily return correlation.
+
+    Returns are standardized per symbol and scaled to unit length, so the dot
+    product of two return vectors is their correlation. The top neighbours of every
+    symbol are found once at build time (in row blocks, so large universes never
+    need the full N x N matrix in memory) and lookups are plain dict reads.
+    """
+
+    def __init__(self, symbols, neighbor_symbols, neighbor_correlations):
+        self.symbols = list(symbols)
+        self._neighbors = {
+            symbol: list(zip(peers, corrs))
+            for symbol, peers, corrs in zip(self.symbols, neighbor_symbols, neighbor_correlations)
+        }
+
+    def __contains__(self, symbol):
+        return symbol in self._neighbors
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    def build(cls, closes, n_neighbors=10, lookback=252, min_observations=60, block_size=1024):
+        """
+        Build the index from a dates x symbols close-price matrix.
+
+        Args:
+            closes (DataFrame): Aligned closing prices, NaN where missing
+            n_neighbors (int): Peers kept per symbol
+            lookback (int): Most recent trading days of returns to use
+            min_observations (int): Symbols with fewer valid returns are left out
+            block_size (int): Rows of the similarity matrix computed at a time
+        """
+        returns = np.log(closes).diff().iloc[1:].iloc[-lookback:]
+        returns = returns.loc[:, returns.notna().sum() >= min_observations]
+        symbols = np.array(returns.columns)
+        values = returns.to_numpy(dtype=float)
+
+        # Standardize each symbol's returns; missing days contribute nothing to the dot product
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        std[std == 0] = np.nan
+        z = np.nan_to_num((values - mean) / std)
+        norms = np.linalg.norm(z, axis=0)
+        norms[norms == 0] = 1
+        z /= norms
+
+        n = len(symbols)
+        k = min(n_neighbors, max(n - 1, 0))
+        neighbor_symbols, neighbor_correlations = [], []
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            similarity = z[:, start:stop].T @ z
+            similarity[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # never your own peer
+
+            if k == 0:
+                top = np.empty((stop - start, 0), dtype=int)
+            else:
+                top = np.argpartition(similarity, -k, axis=1)[:, -k:]
+                top_values = np.take_along_axis(similarity, top, axis=1)
+                order = np.argsort(-top_values, axis=1)
+                top = np.take_along_axis(top, order, axis=1)
+
+            neighbor_symbols.extend(symbols[top].tolist())
+            neighbor_correlations.extend(np.take_along_axis(similarity, top, axis=1).round(4).tolist())
+
+        return cls(symbols.tolist(), neighbor_symbols, neighbor_correlations)
+
+    @classmethod
+    def build_from_store(cls, store, symbols=None, **kwargs):
+        """Build the index from histories cached in a HistoryStore"""
+        return cls.build(store.load_closes(symbols), **kwargs)
+
+    def peers(self, symbol, k=5, min_correlation=None):
+        """Most correlated symbols, best first"""
+        neighbors = self._neighbors.get(symbol, [])
+        if min_correlation is not None:
+            neighbors = [(peer, corr) for peer, corr in neighbors if corr >= min_correlation]
+        return [peer for peer, _ in neighbors[:k]]
+
+    def neighbors(self, symbol):
+        """(peer, correlation) pairs for a symbol, best first"""
+        return list(self._neighbors.get(symbol, []))
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Persist the index so it can be loaded without rebuilding"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            symbols=np.array(self.symbols),
+            neighbor_symbols=np.array([[p for p, _ in self._neighbors[s]] for s in self.symbols]),
+            neighbor_correlations=np.array([[c for _, c in self._neighbors[s]] for s in self.symbols])
+        )
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """Load an index written by save()"""
+        with np.load(path) as data:
+            return cls(data['symbols'].tolist(), data['neighbor_symbols'].tolist(),
+                       data['neighbor_correlations'].tolist())
+
+
+def cache_histories(data_source, symbols, store, period="2y", max_workers=16):
+    """Download daily histories into the local store"""
+    def fetch(symbol):
+        try:
+            store.save(symbol, data_source.get_history(symbol, period=period))
+            return True
+        except Exception as e:
+            print(f"Error caching history for {symbol}: {str(e)}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return sum(pool.map(fetch, symbols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Return-correlation peer discovery from cached histories")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Cache histories and build the peer index")
+    build_parser.add_argument('--universe', help="CSV or text file of symbols (default: all competitor tables)")
+    build_parser.add_argument('--offline', action='store_true', help="Use synthetic offline data instead of Yahoo Finance")
+    build_parser.add_argument('--skip-download', action='store_true', help="Only use histories already cached")
+    build_parser.add_argument('--neighbors', type=int, default=10, help="Peers kept per symbol")
+
+    peers_parser = subparsers.add_parser('peers', help="Look up the closest peers of symbols")
+    peers_parser.add_argument('symbols', nargs='+')
+    peers_parser.add_argument('-k', type=int, default=5, help="Number of peers to show")
+
+    args = parser.parse_args()
+    store = HistoryStore()
+
+    if args.command == 'build':
+        from sector_screener import load_universe
+        symbols = load_universe(args.universe)
+
+        if not args.skip_download:
+            if args.offline:
+                from offline_data import OfflineDataSource
+                data_source = OfflineDataSource(extra_symbols=symbols)
+            else:
+                from stock_analyzer import YahooFinanceSource
+                data_source = YahooFinanceSource()
+            print(f"📊 Caching daily histories for {len(symbols)} symbols...")
+            cached = cache_histories(data_source, symbols, store)
+            print(f"💾 {cached} histories stored in {store.root}")
+
+        start = time.perf_counter()
+        index = ReturnCorrelationIndex.build_from_store(store, symbols, n_neighbors=args.neighbors)
+        index.save()
+        print(f"✅ Indexed {len(index)} symbols in {time.perf_counter() - start:.2f}s -> {DEFAULT_INDEX_PATH}")
+
+    else:
+        index = ReturnCorrelationIndex.load()
+        for symbol in args.symbols:
+            symbol = symbol.upper()
+            start = time.perf_counter()
+            neighbors = index.neighbors(symbol)[:args.k]
+            elapsed_us = (time.perf_counter() - start) * 1e6
+            if not neighbors:
+                print(f"⚠️ {symbol} is not in the peer index")
+                continue
+            peers = ', '.join(f"{peer} ({corr:.2f})" for peer, corr in neighbors)
+            print(f"🎯 {symbol}: {peers}  [{elapsed_us:.0f} µs]")
+
+
+if __name__ == "__main__":
+    main()
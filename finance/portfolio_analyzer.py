@@ -0,0 +1,240 @@
+import argparse
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sector_screener import fetch_universe
+from stock_analyzer import StockCompetitorAnalyzer
+
+
+def load_holdings(path):
+    """
+    Read a holdings file: one symbol per line followed by its weight (e.g. "CRM, 0.05"
+    or "CRM, 5%"), or a CSV with 'symbol' and 'weight' columns. Weights are normalized
+    to sum to 1; symbols without a weight share whatever weight the others leave over
+    (all of it, equally, if no symbol has a weight).
+    """
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        df.columns = [c.strip().lower() for c in df.columns]
+        weights = df['weight'] if 'weight' in df.columns else pd.Series('', index=df.index)
+        holdings = {str(s).strip().upper(): parse_weight(w, s) for s, w in zip(df['symbol'], weights) if str(s).strip()}
+    else:
+        holdings = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                parts = [p for p in re.split(r'[\s,;]+', line.split('#')[0]) if p]
+                if parts:
+                    holdings[parts[0].upper()] = parse_weight(parts[1], parts[0]) if len(parts) > 1 else None
+    return normalize_weights(fill_unweighted(holdings))
+
+
+def parse_weight(text, symbol):
+    """Weight of one holding ("0.05" or "5%" -> 0.05), or None if it has none"""
+    text = str(text).strip()
+    if not text:
+        return None
+    try:
+        weight = float(text.rstrip('%'))
+    except ValueError:
+        raise ValueError(f"Invalid weight for {symbol}: {text!r}")
+    if not np.isfinite(weight):
+        raise ValueError(f"Invalid weight for {symbol}: {text!r}")
+    return weight / 100 if text.endswith('%') else weight
+
+
+def fill_unweighted(holdings):
+    """Split the weight left over by the weighted holdings equally among those without one (None)"""
+    missing = [symbol for symbol, weight in holdings.items() if weight is None]
+    if not missing:
+        return holdings
+    if len(missing) == len(holdings):
+        return {symbol: 1.0 for symbol in holdings}
+
+    leftover = 1 - sum(weight for weight in holdings.values() if weight is not None)
+    if leftover <= 0:
+        raise ValueError(f"Weights already sum to 1 or more, leaving nothing for {', '.join(missing)}; "
+                         "give every holding a weight or none")
+    share = leftover / len(missing)
+    return {symbol: share if weight is None else weight for symbol, weight in holdings.items()}
+
+
+def normalize_weights(holdings):
+    """Scale weights so they sum to 1"""
+    if not all(np.isfinite(weight) for weight in holdings.values()):
+        raise ValueError("Portfolio weights must be finite numbers")
+    total = sum(holdings.values())
+    if total <= 0:
+        raise ValueError("Portfolio weights must sum to a positive number")
+    return {symbol: weight / total for symbol, weight in holdings.items()}
+
+
+def portfolio_risk(closes, weights, periods_per_year=252):
+    """
+    Covariance-based risk of a weighted portfolio.
+
+    Args:
+        closes (DataFrame): dates x symbols closing prices
+        weights (ndarray): Portfolio weight per column of `closes`
+
+    Returns:
+        dict: annualized 'volatility', per-holding 'volatilities', 'risk_contributions'
+              (fractions of portfolio variance, summing to 1), 'covariance' and 'correlation'
+    """
+    returns = np.log(closes.to_numpy(dtype=float))
+    returns = np.diff(returns, axis=0)
+    returns = returns[~np.isnan(returns).any(axis=1)]
+    if len(returns) < 2:
+        raise ValueError("Not enough overlapping price history to estimate covariance")
+
+    centered = returns - returns.mean(axis=0)
+    covariance = centered.T @ centered / (len(returns) - 1) * periods_per_year
+    std = np.sqrt(np.diag(covariance))
+
+    weights = np.asarray(weights, dtype=float)
+    variance = weights @ covariance @ weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.outer(std, std)
+        risk_contributions = weights * (covariance @ weights) / variance
+
+    symbols = list(closes.columns)
+    return {
+        'volatility': float(np.sqrt(variance)),
+        'volatilities': pd.Series(std, index=symbols),
+        'risk_contributions': pd.Series(risk_contributions, index=symbols),
+        'covariance': pd.DataFrame(covariance, index=symbols, columns=symbols),
+        'correlation': pd.DataFrame(correlation, index=symbols, columns=symbols),
+        'observations': len(returns)
+    }
+
+
+def analyze_portfolio(holdings, analyzer=None, max_workers=16, callback=None):
+    """
+    Score every holding against its peers and measure portfolio-level risk.
+
+    Peer groups of all holdings are merged first so every distinct symbol is fetched
+    exactly once, then each holding is scored from the shared cache and the
+    covariance matrix is built from the cached daily histories.
+
+    Returns:
+        dict: 'holdings' (one row per holding), 'volatility', 'weighted_score',
+              'correlation', 'covariance', 'analyses' (per-holding results) and
+              'symbols_fetched'
+    """
+    analyzer = analyzer or StockCompetitorAnalyzer()
+    holdings = normalize_weights({s.upper(): w for s, w in holdings.items()})
+
+    if callback:
+        callback(f"🔍 Fetching {len(holdings)} holdings...")
+    stocks = {stock['symbol']: stock for stock in fetch_universe(analyzer, list(holdings), max_workers)}
+    missing = [s for s in holdings if s not in stocks]
+    if missing and callback:
+        callback(f"⚠️ No data for {', '.join(missing)}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        peer_lists = dict(zip(stocks, pool.map(analyzer.find_industry_competitors, stocks.values())))
+
+    union = list(dict.fromkeys(peer for peers in peer_lists.values() for peer in peers if peer not in stocks))
+    if callback:
+        callback(f"🎯 {sum(len(p) for p in peer_lists.values())} peer slots -> {len(union)} distinct peers to fetch")
+    for stock in fetch_universe(analyzer, union, max_workers):
+        stocks[stock['symbol']] = stock
+
+    if callback:
+        callback("🧮 Scoring holdings and estimating covariance...")
+    analyses, rows = {}, []
+    for symbol in holdings:
+        if symbol not in stocks:
+            continue
+        competitor_data = [stocks[p] for p in peer_lists[symbol] if p in stocks]
+        result = analyzer.build_analysis(stocks[symbol], competitor_data)
+        analyses[symbol] = result
+        main_stock = result['main_stock']
+        rows.append({
+            'symbol': symbol,
+            'name': main_stock['name'],
+            'sector': main_stock['sector'],
+            'weight': holdings[symbol],
+            'score': main_stock['score'],
+            'recommendation': main_stock['recommendation_data']['recommendation'],
+            'peer_rank': next(i + 1 for i, s in enumerate(result['all_stocks']) if s['symbol'] == symbol),
+            'peer_count': len(result['all_stocks'])
+        })
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        raise ValueError("None of the holdings could be analyzed")
+    weights = table['weight'].to_numpy() / table['weight'].sum()
+    risk = portfolio_risk(analyzer.get_closes(list(table['symbol'])), weights)
+    table['weight'] = weights
+    table['volatility'] = risk['volatilities'].to_numpy()
+    table['risk_contribution'] = risk['risk_contributions'].to_numpy()
+
+    return {
+        'holdings': table,
+        'volatility': risk['volatility'],
+        'weighted_score': float(weights @ table['score'].to_numpy()),
+        'correlation': risk['correlation'],
+        'covariance': risk['covariance'],
+        'analyses': analyses,
+        'symbols_fetched': len(stocks)
+    }
+
+
+def plot_correlation_heatmap(correlation, path):
+    """Save a correlation heatmap of the holdings as an image"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    size = max(6, 0.3 * len(correlation))
+    fig, ax = plt.subplots(figsize=(size + 2, size))
+    sns.heatmap(correlation, cmap='RdYlGn_r', vmin=-1, vmax=1, center=0, square=True,
+                annot=len(correlation) <= 20, fmt='.2f', ax=ax, cbar_kws={'shrink': 0.7})
+    ax.set_title('Holdings Return Correlation', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a portfolio's holdings and measure its risk")
+    parser.add_argument('holdings', help="Holdings file (SYMBOL[,weight] per line, or CSV)")
+    parser.add_argument('--offline', action='store_true', help="Use synthetic offline data instead of Yahoo Finance")
+    parser.add_argument('--workers', type=int, default=16, help="Concurrent data fetches")
+    parser.add_argument('--heatmap', help="Write the correlation heatmap to this image file")
+    parser.add_argument('--output', help="Write the holdings table to this CSV file")
+    args = parser.parse_args()
+
+    data_source = None
+    if args.offline:
+        from offline_data import OfflineDataSource
+        data_source = OfflineDataSource()
+
+    holdings = load_holdings(args.holdings)
+    result = analyze_portfolio(holdings, StockCompetitorAnalyzer(data_source=data_source),
+                               max_workers=args.workers, callback=print)
+    table = result['holdings'].sort_values('risk_contribution', ascending=False)
+
+    print("\n" + "=" * 90)
+    print(f"💼 PORTFOLIO: {len(table)} holdings, {result['symbols_fetched']} symbols fetched once each")
+    print("=" * 90)
+    print(f"📉 Annualized volatility: {result['volatility']*100:.1f}%")
+    print(f"🎯 Weighted score: {result['weighted_score']:.1f}/100")
+    print()
+    print(table[['symbol', 'weight', 'score', 'recommendation', 'peer_rank', 'peer_count', 'volatility',
+                 'risk_contribution']].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.heatmap:
+        plot_correlation_heatmap(result['correlation'], args.heatmap)
+        print(f"\n🗺️ Correlation heatmap written to {args.heatmap}")
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"💾 Holdings table written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from history_store import FUNDAMENTAL_FIELDS, HistoryStore
+from scoring_model import ScoringModel, load_scoring_model
+from stock_analyzer import RECOMMENDATION_LEVELS, StockCompetitorAnalyzer, peer_group_key, recommendation_labels
+
+# Rebalance frequency -> pandas period alias
+REBALANCE_PERIODS = {'weekly': 'W', 'monthly': 'M', 'quarterly': 'Q'}
+
+
+def rebalance_positions(dates, frequency='monthly'):
+    """Row positions of the last trading day of every period"""
+    periods = pd.DatetimeIndex(dates).to_period(REBALANCE_PERIODS[frequency])
+    last_rows = pd.Series(np.arange(len(dates))).groupby(np.asarray(periods)).max()
+    return last_rows.to_numpy()
+
+
+def as_of_panel(snapshots, field, dates, symbols):
+    """
+    Point-in-time values of one fundamentals field.
+
+    Returns:
+        ndarray: dates x symbols, each cell the latest snapshot taken on or before that date
+    """
+    values = pd.to_numeric(snapshots[field], errors='coerce')
+    pivot = (pd.DataFrame({'as_of': snapshots['as_of'], 'symbol': snapshots['symbol'], 'value': values})
+             .drop_duplicates(['as_of', 'symbol'], keep='last')
+             .pivot(index='as_of', columns='symbol', values='value')
+             .reindex(columns=symbols))
+    return pivot.reindex(pivot.index.union(dates)).ffill().reindex(dates).to_numpy(dtype=float)
+
+
+def group_means(values, group_ids, n_groups):
+    """Per-date mean of each peer group (NaN-aware), broadcast back to every member"""
+    one_hot = np.zeros((values.shape[1], n_groups))
+    one_hot[np.arange(values.shape[1]), group_ids] = 1
+    present = ~np.isnan(values)
+    sums = np.where(present, values, 0.0) @ one_hot
+    counts = present.astype(float) @ one_hot
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return means[:, group_ids]
+
+
+def rank_ic(scores, returns):
+    """Mean cross-sectional Spearman correlation between scores and forward returns"""
+    valid = ~np.isnan(scores) & ~np.isnan(returns)
+    score_ranks = pd.DataFrame(np.where(valid, scores, np.nan)).rank(axis=1).to_numpy()
+    return_ranks = pd.DataFrame(np.where(valid, returns, np.nan)).rank(axis=1).to_numpy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score_dev = score_ranks - np.nanmean(score_ranks, axis=1, keepdims=True)
+        return_dev = return_ranks - np.nanmean(return_ranks, axis=1, keepdims=True)
+        ic = (np.nansum(score_dev * return_dev, axis=1) /
+              np.sqrt(np.nansum(score_dev ** 2, axis=1) * np.nansum(return_dev ** 2, axis=1)))
+    ic = ic[valid.sum(axis=1) >= 3]
+    return float(np.nanmean(ic)) if np.isfinite(ic).any() else float('nan')
+
+
+def run_backtest(store, symbols=None, frequency='monthly', horizon=21, model=None):
+    """
+    Replay stored histories and fundamentals snapshots through the scoring model.
+
+    Every symbol is scored on each rebalance date with the fundamentals known at the
+    time and its peer group's averages on that date, then bucketed by recommendation
+    and measured against its return over the next `horizon` trading days.
+    `model` is a ScoringModel (default: the built-in one).
+
+    Returns:
+        dict: 'summary' (one row per recommendation), 'rank_ic', 'dates', 'symbols',
+              'scores' and 'forward_returns' (rebalance dates x symbols)
+    """
+    model = model or ScoringModel.default()
+    unsupported = [m for m in model.metrics if m not in FUNDAMENTAL_FIELDS]
+    if unsupported:
+        raise ValueError(f"Fundamentals snapshots don't record: {', '.join(unsupported)}")
+
+    closes = store.load_closes(symbols)
+    snapshots = store.load_fundamentals(list(closes.columns))
+    symbols = [s for s in closes.columns if s in set(snapshots['symbol'])]
+    if closes.empty or not symbols:
+        raise ValueError("No stored histories with fundamentals snapshots to backtest")
+
+    closes = closes[symbols]
+    prices = closes.to_numpy(dtype=float)
+    positions = rebalance_positions(closes.index, frequency)
+    positions = positions[positions + horizon < len(closes)]
+    dates = closes.index[positions]
+
+    # Forward returns from each rebalance close to the close `horizon` trading days later
+    with np.errstate(invalid='ignore', divide='ignore'):
+        forward_returns = prices[positions + horizon] / prices[positions] - 1
+
+    # Peer groups come from each symbol's latest classification
+    latest = snapshots.drop_duplicates('symbol', keep='last').set_index('symbol')
+    group_keys = [peer_group_key({'industry': str(latest.at[s, 'industry']), 'sector': str(latest.at[s, 'sector'])})
+                  for s in symbols]
+    group_names, group_ids = np.unique(group_keys, return_inverse=True)
+
+    metrics = {field: as_of_panel(snapshots, field, dates, symbols) for field in model.metrics}
+    industry = {field: group_means(metrics[field], group_ids, len(group_names)) for field in model.relative_metrics}
+    has_data = ~np.all([np.isnan(panel) for panel in metrics.values()], axis=0)
+
+    scores = np.where(has_data, model.evaluate(metrics, industry), np.nan)
+    labels = recommendation_labels(scores)
+    with np.errstate(invalid='ignore'):
+        excess = forward_returns - np.nanmean(np.where(has_data, forward_returns, np.nan), axis=1, keepdims=True)
+
+    rows = []
+    observed = has_data & ~np.isnan(forward_returns)
+    for label in RECOMMENDATION_LEVELS:
+        mask = observed & (labels == label)
+        bucket = forward_returns[mask]
+        rows.append({
+            'recommendation': label,
+            'observations': int(mask.sum()),
+            'mean_return': bucket.mean() if bucket.size else np.nan,
+            'median_return': np.median(bucket) if bucket.size else np.nan,
+            'hit_rate': (bucket > 0).mean() if bucket.size else np.nan,
+            'excess_return': excess[mask].mean() if bucket.size else np.nan,
+            'avg_score': scores[mask].mean() if bucket.size else np.nan
+        })
+
+    return {
+        'summary': pd.DataFrame(rows),
+        'rank_ic': rank_ic(np.where(observed, scores, np.nan), forward_returns),
+        'dates': dates,
+        'symbols': symbols,
+        'scores': scores,
+        'forward_returns': forward_returns
+    }
+
+
+def seed_offline_store(store, symbols, years=10, snapshots_per_year=4):
+    """
+    Fill a store with synthetic offline data: long daily histories plus quarterly
+    fundamentals snapshots that drift around each symbol's current values.
+    """
+    from offline_data import OfflineDataSource
+    data_source = OfflineDataSource(extra_symbols=symbols)
+    analyzer = StockCompetitorAnalyzer(data_source=data_source)
+    period = f"{years}y" if years in (1, 2, 5, 10) else 'max'
+    drifting = ScoringModel.default().metrics
+
+    seeded = 0
+    for symbol in symbols:
+        stock = analyzer.get_stock_info(symbol)
+        if not stock:
+            continue
+        hist = data_source.get_history(symbol, period=period)
+        store.save(symbol, hist)
+
+        rng = np.random.default_rng(zlib.crc32(f"fundamentals:{symbol}".encode()))
+        as_of_dates = pd.date_range(end=hist.index[-1], periods=years * snapshots_per_year,
+                                    freq=f"{12 // snapshots_per_year}MS")
+        drift = np.exp(np.cumsum(rng.normal(0, 0.15, (len(as_of_dates), len(drifting))), axis=0))
+        for as_of, factors in zip(as_of_dates, drift):
+            snapshot = {field: stock.get(field) for field in FUNDAMENTAL_FIELDS}
+            snapshot.update({metric: stock.get(metric, 0) * factor for metric, factor in zip(drifting, factors)})
+            store.save_fundamentals(symbol, snapshot, as_of=as_of)
+        seeded += 1
+    return seeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the stock score against stored histories")
+    parser.add_argument('--universe', help="CSV or text file of symbols (default: everything in the store)")
+    parser.add_argument('--offline', action='store_true', help="Seed the store with synthetic offline data first")
+    parser.add_argument('--store', help="History store directory (default: finance/cache/history)")
+    parser.add_argument('--rebalance', choices=list(REBALANCE_PERIODS), default='monthly')
+    parser.add_argument('--horizon', type=int, default=21, help="Forward return horizon in trading days")
+    parser.add_argument('--years', type=int, default=10, help="Years of offline data to seed")
+    parser.add_argument('--model', help="JSON scoring model spec (default: built-in model)")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.store)
+    symbols = None
+    if args.universe or args.offline:
+        from sector_screener import load_universe
+        symbols = load_universe(args.universe)
+
+    if args.offline:
+        print(f"🧪 Seeding {len(symbols)} symbols with {args.years} years of offline data...")
+        seeded = seed_offline_store(store, symbols, years=args.years)
+        print(f"💾 {seeded} symbols stored in {store.root}")
+
+    start = time.perf_counter()
+    model = load_scoring_model(args.model)
+    result = run_backtest(store, symbols, frequency=args.rebalance, horizon=args.horizon, model=model)
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 90)
+    print(f"📈 SCORE BACKTEST ({model.name} model): {len(result['symbols'])} symbols, {len(result['dates'])} {args.rebalance} "
+          f"rebalances, {args.horizon}-day forward returns ({elapsed:.2f}s)")
+    print("=" * 90)
+    print(result['summary'].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"\n🎯 Mean rank IC: {result['rank_ic']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import hashlib
+import json
+
+import numpy as np
+
+# The original hand-written score, expressed as a spec. Each term adds
+#   weight * (clip(scale * transform(value) + shift, min, max) + offset)
+# and is skipped when the value (and the industry value, for relative terms) is missing or not positive.
+DEFAULT_SCORING_SPEC = {
+    'name': 'default',
+    'base': 50,
+    'clip': [0, 100],
+    'terms': [
+        # Valuation (lower P/E than the industry is better)
+        {'metric': 'pe_ratio', 'transform': 'inverse_ratio', 'scale': 20, 'min': 0, 'max': 20, 'offset': -10},
+        # Profitability
+        {'metric': 'roe', 'scale': 100, 'max': 15, 'offset': -7.5},
+        {'metric': 'profit_margin', 'scale': 100, 'max': 10, 'offset': -5},
+        # Financial health
+        {'metric': 'debt_to_equity', 'scale': -0.01, 'shift': 5, 'min': -10, 'max': 5},
+        {'metric': 'current_ratio', 'scale': 2.5, 'max': 5, 'offset': -2.5},
+        # Growth
+        {'metric': 'revenue_growth', 'scale': 100, 'max': 10, 'offset': -5}
+    ]
+}
+
+# value: the metric itself; ratio: metric / industry average; inverse_ratio: industry average / metric
+TRANSFORMS = ('value', 'ratio', 'inverse_ratio')
+
+TERM_KEYS = {'metric', 'transform', 'scale', 'shift', 'min', 'max', 'offset', 'weight', 'positive_only'}
+
+
+class ScoringModel:
+    """
+    A scoring model defined by a declarative spec and compiled into arrays.
+
+    The spec lists one term per metric contribution (transform, scale, clamp,
+    offset, weight, optional comparison to the industry average). Compiling turns
+    the terms into parameter vectors, so evaluate() scores any number of candidates
+    at once with a handful of NumPy operations instead of per-stock Python branches.
+    """
+
+    def __init__(self, spec):
+        terms = spec.get('terms') or []
+        if not terms:
+            raise ValueError("A scoring model needs at least one term")
+        for i, term in enumerate(terms):
+            if 'metric' not in term:
+                raise ValueError(f"Term {i} has no 'metric'")
+            unknown = set(term) - TERM_KEYS
+            if unknown:
+                raise ValueError(f"Term {i} ({term['metric']}) has unknown keys: {', '.join(sorted(unknown))}")
+            if term.get('transform', 'value') not in TRANSFORMS:
+                raise ValueError(f"Term {i} ({term['metric']}) has unknown transform '{term['transform']}'")
+
+        self.spec = spec
+        self.name = spec.get('name', 'custom')
+        # Identifies the spec in caches: two models with the same name but different terms differ
+        self.fingerprint = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+        self.base = float(spec.get('base', 50))
+        self.lower, self.upper = (float(v) for v in spec.get('clip', [0, 100]))
+
+        def column(key, default):
+            return np.array([default if term.get(key) is None else float(term[key]) for term in terms])
+
+        transforms = [term.get('transform', 'value') for term in terms]
+        self.metrics = list(dict.fromkeys(term['metric'] for term in terms))
+        self.relative_metrics = list(dict.fromkeys(term['metric'] for term, t in zip(terms, transforms) if t != 'value'))
+        self._rows = np.array([self.metrics.index(term['metric']) for term in terms])
+        self._relative = np.array([t != 'value' for t in transforms])
+        self._inverse = np.array([t == 'inverse_ratio' for t in transforms])
+        self._positive_only = np.array([term.get('positive_only', True) for term in terms])
+        self._scale = column('scale', 1.0)
+        self._shift = column('shift', 0.0)
+        self._min = column('min', -np.inf)
+        self._max = column('max', np.inf)
+        self._offset = column('offset', 0.0)
+        self._weight = column('weight', 1.0)
+
+    def __reduce__(self):
+        return (ScoringModel, (self.spec,))
+
+    @classmethod
+    def default(cls):
+        """The built-in model (the original hand-written score)"""
+        return cls(DEFAULT_SCORING_SPEC)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a model spec from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def evaluate(self, metrics, industry=None):
+        """
+        Score many candidates at once.
+
+        Args:
+            metrics (dict): metric name -> array of candidate values (any shape); NaN = missing
+            industry (dict): metric name -> industry average, broadcastable against the
+                             metric arrays (only needed for relative terms)
+
+        Returns:
+            ndarray: scores clipped to the model's range, same shape as the metric arrays
+        """
+        values = np.stack(np.broadcast_arrays(*[np.asarray(metrics[m], dtype=float) for m in self.metrics]))
+        shape = values.shape[1:]
+        x = values[self._rows]
+
+        industry = industry or {}
+        benchmark = np.ones_like(x)
+        for i in np.flatnonzero(self._relative):
+            metric = self.metrics[self._rows[i]]
+            benchmark[i] = np.broadcast_to(np.asarray(industry.get(metric, np.nan), dtype=float), shape)
+
+        def per_term(param):
+            return param.reshape((-1,) + (1,) * len(shape))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valid = ~np.isnan(x) & (~per_term(self._positive_only) | (x > 0))
+            valid &= ~per_term(self._relative) | (benchmark > 0)
+            transformed = np.where(per_term(self._inverse), benchmark / x,
+                                   np.where(per_term(self._relative), x / benchmark, x))
+            points = np.clip(transformed * per_term(self._scale) + per_term(self._shift),
+                             per_term(self._min), per_term(self._max)) + per_term(self._offset)
+            total = self.base + np.where(valid, per_term(self._weight) * points, 0.0).sum(axis=0)
+
+        return np.clip(total, self.lower, self.upper)
+
+    def evaluate_records(self, records, industry_avg=None):
+        """Score a list of stock records against one industry-average record"""
+        metrics = {m: [np.nan if record.get(m) is None else record[m] for record in records] for m in self.metrics}
+        industry = {m: np.nan if (industry_avg or {}).get(m) is None else industry_avg[m] for m in self.relative_metrics}
+        return self.evaluate(metrics, industry)
+
+    def score(self, stock_data, industry_avg=None):
+        """Score a single stock record against an industry-average record"""
+        return float(self.evaluate_records([stock_data], industry_avg)[0])
+
+
+def load_scoring_model(path=None):
+    """The model in a JSON spec file, or the default model when no path is given"""
+    return ScoringModel.from_file(path) if path else ScoringModel.default()
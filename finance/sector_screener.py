@@ -0,0 +1,197 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from scoring_model import load_scoring_model
+from stock_analyzer import (INDUSTRY_COMPETITORS, SECTOR_COMPETITORS, PeerStats,
+                            StockCompetitorAnalyzer, peer_group_key)
+
+# Columns carried into the ranked tables, in display order
+SCREENER_COLUMNS = [
+    'symbol', 'name', 'sector', 'industry', 'peer_group', 'peer_count', 'peer_rank',
+    'score', 'recommendation', 'target_price', 'risk_level', 'current_price', 'market_cap',
+    'pe_ratio', 'roe', 'profit_margin', 'debt_to_equity', 'current_ratio', 'revenue_growth'
+]
+
+
+def load_universe(path=None):
+    """
+    Symbols to screen: every ticker in the competitor tables, or those listed in a file.
+
+    A universe file may be a CSV with a 'symbol' column or plain text with tickers
+    separated by newlines, commas or spaces.
+    """
+    if path is None:
+        symbols = []
+        for table in (INDUSTRY_COMPETITORS, SECTOR_COMPETITORS):
+            for group in table.values():
+                symbols.extend(group)
+    elif path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+        column = next((c for c in df.columns if c.strip().lower() in ('symbol', 'ticker')), df.columns[0])
+        symbols = df[column].dropna().astype(str).tolist()
+    else:
+        with open(path, encoding='utf-8') as f:
+            symbols = re.split(r'[\s,;]+', f.read())
+
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+
+
+def fetch_universe(analyzer, symbols, max_workers=16, callback=None):
+    """Fetch each distinct symbol once, in parallel threads; symbols without data are skipped"""
+    unique = list(dict.fromkeys(symbols))
+    stocks = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, stock in enumerate(pool.map(analyzer.get_stock_info, unique)):
+            if stock:
+                stocks.append(stock)
+            if callback and (i + 1) % 100 == 0:
+                callback(f"📊 Fetched {i + 1}/{len(unique)} symbols...")
+    return stocks
+
+
+def group_peers(stocks):
+    """Split stocks into peer groups keyed by industry table (or sector when no table matches)"""
+    groups = {}
+    for stock in stocks:
+        groups.setdefault(peer_group_key(stock), []).append(stock)
+    return groups
+
+
+def make_shards(groups, n_shards):
+    """Pack whole peer groups into roughly equal-sized shards, largest groups first"""
+    shards = [[] for _ in range(max(1, n_shards))]
+    sizes = [0] * len(shards)
+    for key, members in sorted(groups.items(), key=lambda item: len(item[1]), reverse=True):
+        smallest = sizes.index(min(sizes))
+        shards[smallest].append((key, members))
+        sizes[smallest] += len(members)
+    return [shard for shard in shards if shard]
+
+
+def score_shard(shard, model=None):
+    """Compute peer statistics and score every member of each peer group in a shard"""
+    analyzer = StockCompetitorAnalyzer(scoring_model=model)
+    rows = []
+    for group_key, members in shard:
+        industry_avg = PeerStats(members).means
+        scores = analyzer.scoring_model.evaluate_records(members, industry_avg)
+        scored = []
+        for stock, score in zip(members, scores.tolist()):
+            rec_data = analyzer.generate_recommendation(score, stock)
+            row = {column: stock.get(column) for column in SCREENER_COLUMNS}
+            row.update({
+                'peer_group': group_key,
+                'peer_count': len(members),
+                'score': score,
+                'recommendation': rec_data['recommendation'],
+                'target_price': rec_data['target_price'],
+                'risk_level': rec_data['risk_level']
+            })
+            scored.append(row)
+
+        scored.sort(key=lambda row: row['score'], reverse=True)
+        for rank, row in enumerate(scored, start=1):
+            row['peer_rank'] = rank
+        rows.extend(scored)
+    return rows
+
+
+def rank_by_sector(rows):
+    """One ranked table per sector, best score first"""
+    if not rows:
+        return {}
+    df = pd.DataFrame(rows, columns=SCREENER_COLUMNS)
+    tables = {}
+    for sector, sector_df in df.groupby('sector', sort=True):
+        ranked = sector_df.sort_values(['score', 'symbol'], ascending=[False, True]).reset_index(drop=True)
+        ranked.insert(0, 'sector_rank', ranked.index + 1)
+        tables[sector] = ranked
+    return tables
+
+
+def screen_universe(symbols, analyzer=None, workers=None, fetch_workers=16, callback=None):
+    """
+    Rank every symbol against its own peer group.
+
+    Data is fetched once per distinct symbol; peer statistics and scores (with the
+    analyzer's scoring model) are computed in a process pool, one shard of whole peer
+    groups per task.
+
+    Returns:
+        dict: sector name -> ranked DataFrame
+    """
+    analyzer = analyzer or StockCompetitorAnalyzer()
+    workers = workers or os.cpu_count() or 1
+
+    if callback:
+        callback(f"🔍 Fetching data for {len(symbols)} symbols...")
+    stocks = fetch_universe(analyzer, symbols, fetch_workers, callback)
+
+    groups = group_peers(stocks)
+    if callback:
+        callback(f"🧮 Scoring {len(stocks)} stocks in {len(groups)} peer groups...")
+
+    # Small universes are not worth the process start-up cost
+    if workers == 1 or len(stocks) < 200:
+        rows = score_shard(list(groups.items()), analyzer.scoring_model)
+    else:
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            score = partial(score_shard, model=analyzer.scoring_model)
+            for shard_rows in pool.map(score, make_shards(groups, workers * 4)):
+                rows.extend(shard_rows)
+
+    return rank_by_sector(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank every stock in a universe against its own peer group")
+    parser.add_argument('--universe', help="CSV or text file of symbols (default: all competitor tables)")
+    parser.add_argument('--offline', action='store_true', help="Use synthetic offline data instead of Yahoo Finance")
+    parser.add_argument('--workers', type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument('--fetch-workers', type=int, default=16, help="Concurrent data fetches")
+    parser.add_argument('--output', help="Directory to write one CSV per sector")
+    parser.add_argument('--top', type=int, default=10, help="Rows per sector to print")
+    parser.add_argument('--model', help="JSON scoring model spec (default: built-in model)")
+    parser.add_argument('--excel', help="Write a multi-sheet .xlsx report to this path (needs xlsxwriter)")
+    args = parser.parse_args()
+
+    symbols = load_universe(args.universe)
+
+    data_source = None
+    if args.offline:
+        from offline_data import OfflineDataSource
+        data_source = OfflineDataSource(extra_symbols=symbols)
+
+    analyzer = StockCompetitorAnalyzer(data_source=data_source, scoring_model=load_scoring_model(args.model))
+    tables = screen_universe(symbols, analyzer,
+                             workers=args.workers, fetch_workers=args.fetch_workers, callback=print)
+
+    for sector, table in tables.items():
+        print("\n" + "=" * 90)
+        print(f"🏆 {sector.upper()} ({len(table)} stocks)")
+        print("=" * 90)
+        print(table[['sector_rank', 'symbol', 'peer_group', 'peer_rank', 'score', 'recommendation']]
+              .head(args.top).to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            file_name = re.sub(r'[^A-Za-z0-9]+', '_', sector).strip('_').lower()
+            table.to_csv(os.path.join(args.output, f"screener_{file_name}.csv"), index=False)
+
+    if args.output:
+        print(f"\n💾 Ranked tables written to {args.output}")
+
+    if args.excel:
+        from excel_report import write_screener_report
+        write_screener_report(tables, args.excel, analyzer)
+        print(f"\n📑 Excel report written to {args.excel}")
+
+
+if __name__ == "__main__":
+    main()
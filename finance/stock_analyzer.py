@@ -7,60 +7,415 @@ from datetime import datetime, timedelta
 import yfinance as yf
 import warnings
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
+import time
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import re
+import argparse
+import os
+
+from scoring_model import ScoringModel
+from fetch_resilience import ResilientDataSource, PermanentFetchError, TransientFetchError
+from chart_renderer import DashboardRenderer
 
 warnings.filterwarnings('ignore')
 plt.style.use('default')
 
+# Industry-based competitor lists (real stocks only)
+INDUSTRY_COMPETITORS = {
+    # Technology
+    'Software': ['MSFT', 'ORCL', 'CRM', 'ADBE', 'NOW', 'INTU', 'VMW', 'CTXS', 'TEAM', 'ZM', 'DDOG', 'SNOW', 'PLTR', 'WDAY', 'ADSK'],
+    'Semiconductors': ['NVDA', 'AMD', 'INTC', 'QCOM', 'AVGO', 'TXN', 'ADI', 'MRVL', 'XLNX', 'LRCX', 'KLAC', 'AMAT'],
+    'Consumer Electronics': ['AAPL', 'SONY', 'HPQ', 'DELL', 'LOGI', 'GRMN', 'HEAR'],
+    'Internet Content': ['GOOGL', 'META', 'AMZN', 'NFLX', 'UBER', 'LYFT', 'SNAP', 'PINS', 'TWTR', 'ROKU'],
+    'E-commerce': ['AMZN', 'SHOP', 'EBAY', 'ETSY', 'BABA', 'JD', 'MELI', 'SE'],
+
+    # Healthcare & Pharmaceuticals  
+    'Biotechnology': ['GILD', 'AMGN', 'BIIB', 'REGN', 'VRTX', 'CELG', 'ILMN', 'MRNA', 'BNTX', 'NVAX'],
+    'Drug Manufacturers': ['JNJ', 'PFE', 'MRK', 'ABT', 'BMY', 'LLY', 'AZN', 'NVO', 'RHHBY', 'GSK'],
+    'Medical Devices': ['MDT', 'ABT', 'TMO', 'DHR', 'SYK', 'BSX', 'EW', 'ZBH', 'ISRG', 'DXCM'],
+    'Healthcare Plans': ['UNH', 'ANTM', 'AET', 'CI', 'HUM', 'CNC', 'MOH'],
+
+    # Financial Services
+    'Banks': ['JPM', 'BAC', 'WFC', 'C', 'USB', 'PNC', 'TFC', 'COF', 'MS', 'GS'],
+    'Insurance': ['BRK-B', 'PGR', 'AIG', 'MET', 'PRU', 'ALL', 'TRV', 'CB', 'AXP'],
+    'Credit Services': ['V', 'MA', 'AXP', 'COF', 'DFS', 'SYF', 'PYPL', 'SQ'],
+    'Investment Banking': ['GS', 'MS', 'JPM', 'BAC', 'C', 'BCS', 'DB', 'CS'],
+
+    # Energy & Utilities
+    'Oil & Gas': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'HAL', 'OXY', 'KMI', 'WMB', 'EPD'],
+    'Utilities': ['NEE', 'DUK', 'SO', 'D', 'EXC', 'AEP', 'XEL', 'PEG', 'ED', 'FE'],
+    'Renewable Energy': ['TSLA', 'ENPH', 'SEDG', 'NEE', 'BEP', 'ICLN'],
+
+    # Consumer & Retail
+    'Retail': ['WMT', 'TGT', 'COST', 'HD', 'LOW', 'TJX', 'ROST', 'BBY', 'GPS', 'M'],
+    'Restaurants': ['MCD', 'SBUX', 'YUM', 'QSR', 'CMG', 'DPZ', 'DRI', 'EAT'],
+    'Consumer Goods': ['PG', 'UL', 'KO', 'PEP', 'CL', 'KMB', 'GIS', 'K', 'CAG', 'CPB'],
+    'Apparel': ['NKE', 'LULU', 'UAA', 'VFC', 'RL', 'PVH', 'URBN', 'GPS'],
+
+    # Industrial & Manufacturing
+    'Aerospace': ['BA', 'LMT', 'RTX', 'NOC', 'GD', 'TDG', 'LHX', 'HWM', 'TXT'],
+    'Industrial Equipment': ['GE', 'CAT', 'DE', 'HON', 'MMM', 'EMR', 'ITW', 'PH', 'ROK'],
+    'Automotive': ['TSLA', 'GM', 'F', 'TM', 'HMC', 'STLA', 'RIVN', 'LCID', 'NIO', 'XPEV'],
+    'Transportation': ['UPS', 'FDX', 'UAL', 'DAL', 'AAL', 'LUV', 'JBLU', 'UBER', 'LYFT'],
+
+    # Real Estate & REITs
+    'REITs': ['AMT', 'PLD', 'CCI', 'EQIX', 'SPG', 'O', 'WELL', 'PSA', 'AVB', 'EQR'],
+
+    # Media & Entertainment
+    'Media': ['DIS', 'NFLX', 'PARA', 'WBD', 'ROKU', 'SPOT', 'T', 'VZ', 'TMUS'],
+    'Gaming': ['ATVI', 'EA', 'TTWO', 'RBLX', 'UNITY', 'ZNGA']
+}
+
+# Sector-based fallback
+SECTOR_COMPETITORS = {
+    'Technology': ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'TSLA', 'CRM', 'ORCL', 'ADBE', 'INTC', 'AMD'],
+    'Healthcare': ['JNJ', 'PFE', 'UNH', 'MRK', 'ABT', 'TMO', 'DHR', 'BMY', 'LLY', 'AMGN', 'GILD', 'MDT'],
+    'Financial Services': ['JPM', 'BAC', 'BRK-B', 'V', 'MA', 'WFC', 'GS', 'MS', 'C', 'USB', 'AXP', 'COF'],
+    'Consumer Cyclical': ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'SBUX', 'TJX', 'LOW', 'TGT', 'GM', 'F'],
+    'Consumer Defensive': ['PG', 'KO', 'PEP', 'WMT', 'COST', 'UL', 'CL', 'KMB', 'GIS', 'K'],
+    'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'HAL', 'OXY', 'KMI', 'WMB', 'MPC'],
+    'Industrials': ['BA', 'CAT', 'GE', 'MMM', 'HON', 'UPS', 'LMT', 'RTX', 'DE', 'NOC'],
+    'Communication Services': ['GOOGL', 'META', 'NFLX', 'DIS', 'VZ', 'T', 'TMUS', 'ROKU', 'SNAP'],
+    'Utilities': ['NEE', 'DUK', 'SO', 'D', 'EXC', 'AEP', 'XEL', 'PEG', 'ED', 'FE'],
+    'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'SPG', 'O', 'WELL', 'PSA', 'AVB', 'EQR'],
+    'Materials': ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'DD', 'DOW', 'PPG', 'ECL', 'NUE']
+}
+
+
+def match_industry(industry):
+    """Return the INDUSTRY_COMPETITORS key matching a data-source industry name, or None"""
+    for key in INDUSTRY_COMPETITORS:
+        if key.lower() in industry.lower() or industry.lower() in key.lower():
+            return key
+    return None
+
+
+def peer_group_key(stock):
+    """Peer group a stock belongs to: its matching industry table, else its sector"""
+    return match_industry(stock['industry']) or stock['sector']
+
+
+# Score cut-offs for each recommendation, best first; anything below the last is STRONG SELL
+RECOMMENDATION_THRESHOLDS = [(70, 'STRONG BUY'), (60, 'BUY'), (40, 'HOLD'), (30, 'SELL')]
+RECOMMENDATION_LEVELS = [label for _, label in RECOMMENDATION_THRESHOLDS] + ['STRONG SELL']
+
+# Fields set by calculate_price_fields, which change with every price refresh
+PRICE_FIELDS = ['current_price', 'ytd_return', 'one_year_return', 'volatility']
+
+
+def recommendation_labels(scores):
+    """Recommendation label for every score in an array"""
+    scores = np.asarray(scores, dtype=float)
+    return np.select([scores >= cutoff for cutoff, _ in RECOMMENDATION_THRESHOLDS],
+                     [label for _, label in RECOMMENDATION_THRESHOLDS], default='STRONG SELL')
+
+
+class YahooFinanceSource:
+    """Live market data from Yahoo Finance via yfinance"""
+    
+    def get_info(self, symbol):
+        """Return the raw yfinance info dict for a symbol"""
+        return yf.Ticker(symbol).info
+    
+    def get_history(self, symbol, period="1y"):
+        """Return daily OHLCV history for a symbol"""
+        return yf.Ticker(symbol).history(period=period)
+    
+    def get_histories(self, symbols, period="5d"):
+        """Return recent daily history for many symbols in a single download"""
+        data = yf.download(list(symbols), period=period, group_by='ticker', progress=False, threads=False)
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {symbols[0]: data}
+        available = set(data.columns.get_level_values(0))
+        return {s: data[s].dropna(how='all') for s in symbols if s in available}
+
+
+class PeerStats:
+    """
+    Per-metric summary statistics for one peer set, computed once and shared.
+    
+    Holds means, medians and percentiles for every numeric metric, plus the
+    positive-only means and best values the GUI uses for peer comparisons.
+    """
+    
+    # Derived per-analysis fields that are not part of the peer data itself
+    EXCLUDED_FIELDS = ('score', 'recommendation_data')
+    
+    def __init__(self, stocks, key=None):
+        self.key = key
+        self.symbols = tuple(stock['symbol'] for stock in stocks)
+        
+        df = pd.DataFrame(stocks).drop(columns=list(self.EXCLUDED_FIELDS), errors='ignore')
+        numeric_df = df.select_dtypes(include=[np.number])
+        self.metrics = list(numeric_df.columns)
+        values = numeric_df.to_numpy(dtype=float)
+        positive = np.where(values > 0, values, np.nan)
+        nonzero = np.where(values != 0, values, np.nan)
+        
+        self.means = self._by_metric(self._reduce(np.nanmean, values))
+        self.medians = self._by_metric(self._reduce(np.nanmedian, values))
+        self.percentiles = {q: self._by_metric(self._reduce(np.nanpercentile, values, q)) for q in (10, 25, 75, 90)}
+        self.positive_means = self._by_metric(self._reduce(np.nanmean, positive))
+        self.max_values = self._by_metric(self._reduce(np.nanmax, nonzero))
+        self.min_positive = self._by_metric(self._reduce(np.nanmin, positive))
+    
+    @staticmethod
+    def _reduce(func, values, *args):
+        """Column-wise NaN-aware reduction; columns without any value give NaN (without numpy's warnings)"""
+        row = np.full(values.shape[1], np.nan)
+        present = ~np.isnan(values).all(axis=0)
+        if present.any():
+            row[present] = func(values[:, present], *args, axis=0)
+        return row
+    
+    def _by_metric(self, row):
+        return {metric: float(value) for metric, value in zip(self.metrics, row)}
+    
+    def to_dict(self):
+        """Plain-dict form for serialization"""
+        return {
+            'symbols': list(self.symbols),
+            'means': self.means,
+            'medians': self.medians,
+            'percentiles': self.percentiles,
+            'positive_means': self.positive_means
+        }
+
+
 class StockCompetitorAnalyzer:
-    def __init__(self, alpha_vantage_api_key=None):
+    def __init__(self, alpha_vantage_api_key=None, data_source=None, history_store=None,
+                 peer_index=None, peer_mode='industry', price_ttl=300, fundamentals_ttl=86400,
+                 scoring_model=None):
         """
         Initialize the Stock Competitor Analyzer
         
         Args:
             alpha_vantage_api_key (str): Alpha Vantage API key for enhanced data
+            data_source: Object providing get_info(symbol) and get_history(symbol, period).
+                         Defaults to live Yahoo Finance data. Wrapped in a ResilientDataSource
+                         (retries, circuit breaker, latency histograms) unless it already is one.
+            history_store (HistoryStore): Local cache that fetched daily histories are written to
+            peer_index (ReturnCorrelationIndex): Precomputed return-correlation peers
+            peer_mode (str): 'industry' for the hand-curated tables, 'correlation' for peer_index
+            price_ttl (float): Seconds before price-derived fields are refreshed
+            fundamentals_ttl (float): Seconds before fundamentals (margins, ROE, ...) are refetched
+            scoring_model (ScoringModel): Compiled scoring spec (defaults to the built-in model)
         """
         self.alpha_vantage_api_key = alpha_vantage_api_key
+        data_source = data_source or YahooFinanceSource()
+        if not isinstance(data_source, ResilientDataSource):
+            data_source = ResilientDataSource(data_source)
+        self.data_source = data_source
+        self.history_store = history_store
+        self.peer_index = peer_index
+        self.peer_mode = peer_mode
+        self.scoring_model = scoring_model or ScoringModel.default()
         self.cache = {}
         
+        # Concurrent requests for the same symbol share a single fetch
+        self._lock = threading.Lock()
+        self._inflight = {}
+        
+        # Bumped whenever a symbol's cached data changes; keys the peer/score caches below.
+        # Fundamentals and prices are versioned separately so price-only updates keep scores.
+        self.data_versions = {}
+        self.price_versions = {}
+        self._peer_stats_cache = OrderedDict()
+        self._score_cache = OrderedDict()
+        self.max_cached_peer_sets = 256
+        
+        # Tiered refresh: cheap price updates on a short TTL, fundamentals on a long one
+        self.price_ttl = price_ttl
+        self.fundamentals_ttl = fundamentals_ttl
+        self._price_fetched_at = {}
+        self._fundamentals_fetched_at = {}
+        self._histories = {}
+        self._validated = {}
+        self._recent_info = {}
+        
     def validate_symbol(self, symbol):
-        """Validate if stock symbol exists and is actively traded"""
+        """
+        Validate if stock symbol exists and is actively traded
+        
+        Raises:
+            TransientFetchError: the data source is throttling or unreachable, so the
+                                 symbol's validity is unknown (nothing is cached)
+        """
+        cached = self._validated.get(symbol)
+        if cached and time.time() - cached[1] < self.fundamentals_ttl:
+            return cached[0]
+        
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            # Check if it's a real stock (not ETF/Index)
-            return ('symbol' in info or 'shortName' in info) and info.get('quoteType', '') == 'EQUITY'
-        except:
+            info = self.data_source.get_info(symbol)
+        except PermanentFetchError:
+            self._validated[symbol] = (False, time.time())
             return False
+        
+        # Check if it's a real stock (not ETF/Index)
+        is_valid = ('symbol' in info or 'shortName' in info) and info.get('quoteType', '') == 'EQUITY'
+        
+        # Keep the info for the data fetch that usually follows straight after
+        self._recent_info[symbol] = (info, time.time())
+        self._validated[symbol] = (is_valid, time.time())
+        return is_valid
+    
+    def _is_fresh(self, symbol, fetched_at, ttl):
+        return symbol in fetched_at and time.time() - fetched_at[symbol] < ttl
+    
+    def data_age(self, symbol):
+        """Seconds since a symbol's (prices, fundamentals) were fetched; None if never fetched"""
+        now = time.time()
+        price_time = self._price_fetched_at.get(symbol)
+        fundamentals_time = self._fundamentals_fetched_at.get(symbol)
+        return (None if price_time is None else now - price_time,
+                None if fundamentals_time is None else now - fundamentals_time)
+    
+    def expire_prices(self, symbol):
+        """Mark a symbol's prices stale so the next lookup refreshes them"""
+        self._price_fetched_at.pop(symbol, None)
     
     def get_stock_info(self, symbol):
-        """Get comprehensive stock information"""
+        """Get comprehensive stock information (cached, coalesced across threads)"""
+        if (symbol in self.cache and self._is_fresh(symbol, self._price_fetched_at, self.price_ttl)
+                and self._is_fresh(symbol, self._fundamentals_fetched_at, self.fundamentals_ttl)):
+            return self.cache[symbol]
+        
+        with self._lock:
+            done = self._inflight.get(symbol)
+            is_leader = done is None
+            if is_leader:
+                done = self._inflight[symbol] = threading.Event()
+        
+        # Another thread is already fetching this symbol - wait for its result
+        if not is_leader:
+            done.wait()
+            return self.cache.get(symbol)
+        
         try:
-            if symbol in self.cache:
+            if (symbol in self.cache and symbol in self._histories
+                    and self._is_fresh(symbol, self._fundamentals_fetched_at, self.fundamentals_ttl)):
+                if not self._is_fresh(symbol, self._price_fetched_at, self.price_ttl):
+                    try:
+                        self._update_prices(symbol, self.data_source.get_history(symbol, period="5d"))
+                    except Exception as e:
+                        # Keep serving the cached data with its older prices
+                        print(f"Error refreshing prices for {symbol}: {str(e)}")
                 return self.cache[symbol]
-                
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            hist = stock.history(period="1y")
+            return self._fetch_stock_info(symbol)
+        except Exception as e:
+            print(f"Error getting data for {symbol}: {str(e)}")
+            return self.cache.get(symbol)
+        finally:
+            with self._lock:
+                del self._inflight[symbol]
+            done.set()
+    
+    def refresh_prices(self, symbols):
+        """
+        Bring price-derived fields up to date for cached symbols with one small request.
+        
+        Only symbols whose fundamentals are still fresh and whose prices are stale are
+        refreshed; everything else is left for get_stock_info to handle.
+        """
+        stale = [s for s in dict.fromkeys(symbols)
+                 if s in self.cache and s in self._histories and s not in self._inflight
+                 and self._is_fresh(s, self._fundamentals_fetched_at, self.fundamentals_ttl)
+                 and not self._is_fresh(s, self._price_fetched_at, self.price_ttl)]
+        if not stale:
+            return []
+        
+        try:
+            if hasattr(self.data_source, 'get_histories'):
+                recent = self.data_source.get_histories(stale, period="5d")
+            else:
+                recent = {s: self.data_source.get_history(s, period="5d") for s in stale}
+        except Exception as e:
+            print(f"Error refreshing prices for {', '.join(stale)}: {str(e)}")
+            return []
+        
+        for symbol, hist in recent.items():
+            if symbol in stale:
+                self._update_prices(symbol, hist)
+        return [s for s in stale if s in recent]
+    
+    def get_closes(self, symbols):
+        """
+        Aligned daily closes from the cached histories (no network access).
+        
+        Returns:
+            DataFrame: dates x symbols, NaN where a symbol has no price for a date
+        """
+        with self._lock:
+            histories = {s: self._histories[s] for s in symbols if s in self._histories}
+        closes = {}
+        for symbol, hist in histories.items():
+            close = hist['Close']
+            index = pd.DatetimeIndex(close.index)
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            closes[symbol] = pd.Series(close.to_numpy(), index=index.normalize())
+        return pd.DataFrame(closes).sort_index()
+    
+    def _update_prices(self, symbol, recent_hist):
+        """Merge recent daily bars into the stored history and recompute price-derived fields"""
+        if recent_hist is None or len(recent_hist) == 0:
+            return
+        if self.history_store is not None:
+            self.history_store.save(symbol, recent_hist)
+        
+        hist = pd.concat([self._histories[symbol], recent_hist])
+        hist = hist[~hist.index.duplicated(keep='last')].sort_index()
+        hist = hist[hist.index > hist.index[-1] - pd.DateOffset(years=1)]
+        
+        stock_data = dict(self.cache[symbol])
+        stock_data.update(self.calculate_price_fields(hist, stock_data['current_price']))
+        
+        with self._lock:
+            self._histories[symbol] = hist
+            self.cache[symbol] = stock_data
+            self.price_versions[symbol] = self.price_versions.get(symbol, 0) + 1
+            self._price_fetched_at[symbol] = time.time()
+    
+    def calculate_price_fields(self, hist, fallback_price=0):
+        """Price-derived fields that change every tick: current price, returns and volatility"""
+        if len(hist) == 0:
+            return {'current_price': fallback_price}
+        return {
+            'current_price': hist['Close'].iloc[-1],
+            'ytd_return': self.calculate_ytd_return(hist),
+            'one_year_return': self.calculate_return(hist, 252),
+            'volatility': hist['Close'].pct_change().std() * np.sqrt(252)
+        }
+    
+    def _fetch_stock_info(self, symbol):
+        """Fetch stock information from the data source and store it in the cache"""
+        try:
+            recent = self._recent_info.pop(symbol, None)
+            if recent and time.time() - recent[1] < self.price_ttl:
+                info = recent[0]
+            else:
+                info = self.data_source.get_info(symbol)
             
             # Skip if not a regular stock
             if info.get('quoteType', '') not in ['EQUITY', 'ETF']:
+                self._validated[symbol] = (False, time.time())
                 return None
             
-            # Calculate additional metrics
-            current_price = hist['Close'][-1] if len(hist) > 0 else info.get('currentPrice', 0)
+            hist = self.data_source.get_history(symbol, period="1y")
+            if self.history_store is not None:
+                self.history_store.save(symbol, hist)
             
             stock_data = {
                 'symbol': symbol,
                 'name': info.get('shortName', symbol),
                 'sector': info.get('sector', 'Unknown'),
                 'industry': info.get('industry', 'Unknown'),
-                'current_price': current_price,
+                'current_price': info.get('currentPrice', 0),
                 'market_cap': info.get('marketCap', 0),
                 'pe_ratio': info.get('trailingPE', 0),
                 'forward_pe': info.get('forwardPE', 0),
@@ -86,102 +441,69 @@ class StockCompetitorAnalyzer:
             }
             
             # Calculate price performance
-            if len(hist) > 0:
-                stock_data['ytd_return'] = self.calculate_ytd_return(hist)
-                stock_data['one_year_return'] = self.calculate_return(hist, 252)
-                stock_data['volatility'] = hist['Close'].pct_change().std() * np.sqrt(252)
-            
-            self.cache[symbol] = stock_data
+            stock_data.update(self.calculate_price_fields(hist, stock_data['current_price']))
+            
+            if self.history_store is not None:
+                self.history_store.save_fundamentals(symbol, stock_data)
+            
+            now = time.time()
+            with self._lock:
+                self.cache[symbol] = stock_data
+                self._histories[symbol] = hist
+                self._validated[symbol] = (info.get('quoteType', '') == 'EQUITY', now)
+                self._fundamentals_fetched_at[symbol] = now
+                self._price_fetched_at[symbol] = now
+                self.data_versions[symbol] = self.data_versions.get(symbol, 0) + 1
+                self.price_versions[symbol] = self.price_versions.get(symbol, 0) + 1
             return stock_data
             
+        except PermanentFetchError as e:
+            print(f"No data for {symbol}: {str(e)}")
+            self._validated[symbol] = (False, time.time())
+            return None
         except Exception as e:
+            # Transient failures are not cached, so the next lookup tries again
             print(f"Error getting data for {symbol}: {str(e)}")
             return None
     
-    def find_industry_competitors(self, main_stock, max_competitors=5):
-        """Find real competitors based on industry and sector"""
+    def fetch_stats(self):
+        """Per-endpoint latency histograms, retry count and circuit breaker state of the data source"""
+        return self.data_source.stats()
+    
+    def find_industry_competitors(self, main_stock, max_competitors=5, mode=None):
+        """
+        Find real competitors based on industry and sector
+        
+        Args:
+            mode (str): 'industry' (default) uses the competitor tables; 'correlation'
+                        uses the most return-correlated symbols from peer_index and
+                        falls back to the tables for symbols the index doesn't cover
+        """
         sector = main_stock['sector']
         industry = main_stock['industry']
         market_cap = main_stock['market_cap']
-        
-        # Industry-based competitor lists (real stocks only)
-        industry_competitors = {
-            # Technology
-            'Software': ['MSFT', 'ORCL', 'CRM', 'ADBE', 'NOW', 'INTU', 'VMW', 'CTXS', 'TEAM', 'ZM', 'DDOG', 'SNOW', 'PLTR', 'WDAY'],
-            'Semiconductors': ['NVDA', 'AMD', 'INTC', 'QCOM', 'AVGO', 'TXN', 'ADI', 'MRVL', 'XLNX', 'LRCX', 'KLAC', 'AMAT'],
-            'Consumer Electronics': ['AAPL', 'SONY', 'HPQ', 'DELL', 'LOGI', 'GRMN', 'HEAR'],
-            'Internet Content': ['GOOGL', 'META', 'AMZN', 'NFLX', 'UBER', 'LYFT', 'SNAP', 'PINS', 'TWTR', 'ROKU'],
-            'E-commerce': ['AMZN', 'SHOP', 'EBAY', 'ETSY', 'BABA', 'JD', 'MELI', 'SE'],
-            
-            # Healthcare & Pharmaceuticals  
-            'Biotechnology': ['GILD', 'AMGN', 'BIIB', 'REGN', 'VRTX', 'CELG', 'ILMN', 'MRNA', 'BNTX', 'NVAX'],
-            'Drug Manufacturers': ['JNJ', 'PFE', 'MRK', 'ABT', 'BMY', 'LLY', 'AZN', 'NVO', 'RHHBY', 'GSK'],
-            'Medical Devices': ['MDT', 'ABT', 'TMO', 'DHR', 'SYK', 'BSX', 'EW', 'ZBH', 'ISRG', 'DXCM'],
-            'Healthcare Plans': ['UNH', 'ANTM', 'AET', 'CI', 'HUM', 'CNC', 'MOH'],
-            
-            # Financial Services
-            'Banks': ['JPM', 'BAC', 'WFC', 'C', 'USB', 'PNC', 'TFC', 'COF', 'MS', 'GS'],
-            'Insurance': ['BRK-B', 'PG', 'AIG', 'MET', 'PRU', 'ALL', 'TRV', 'CB', 'AXP'],
-            'Credit Services': ['V', 'MA', 'AXP', 'COF', 'DFS', 'SYF', 'PYPL', 'SQ'],
-            'Investment Banking': ['GS', 'MS', 'JPM', 'BAC', 'C', 'BCS', 'DB', 'CS'],
-            
-            # Energy & Utilities
-            'Oil & Gas': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'HAL', 'OXY', 'KMI', 'WMB', 'EPD'],
-            'Utilities': ['NEE', 'DUK', 'SO', 'D', 'EXC', 'AEP', 'XEL', 'PEG', 'ED', 'FE'],
-            'Renewable Energy': ['TSLA', 'ENPH', 'SEDG', 'NEE', 'BEP', 'ICLN'],
-            
-            # Consumer & Retail
-            'Retail': ['WMT', 'TGT', 'COST', 'HD', 'LOW', 'TJX', 'ROST', 'BBY', 'GPS', 'M'],
-            'Restaurants': ['MCD', 'SBUX', 'YUM', 'QSR', 'CMG', 'DPZ', 'DRI', 'EAT'],
-            'Consumer Goods': ['PG', 'UL', 'KO', 'PEP', 'CL', 'KMB', 'GIS', 'K', 'CAG', 'CPB'],
-            'Apparel': ['NKE', 'ADSK', 'LULU', 'UAA', 'VFC', 'RL', 'PVH', 'URBN', 'GPS'],
-            
-            # Industrial & Manufacturing
-            'Aerospace': ['BA', 'LMT', 'RTX', 'NOC', 'GD', 'TDG', 'LHX', 'HWM', 'TXT'],
-            'Industrial Equipment': ['GE', 'CAT', 'DE', 'HON', 'MMM', 'EMR', 'ITW', 'PH', 'ROK'],
-            'Automotive': ['TSLA', 'GM', 'F', 'TM', 'HMC', 'STLA', 'RIVN', 'LCID', 'NIO', 'XPEV'],
-            'Transportation': ['UPS', 'FDX', 'UAL', 'DAL', 'AAL', 'LUV', 'JBLU', 'UBER', 'LYFT'],
-            
-            # Real Estate & REITs
-            'REITs': ['AMT', 'PLD', 'CCI', 'EQIX', 'SPG', 'O', 'WELL', 'PSA', 'AVB', 'EQR'],
-            
-            # Media & Entertainment
-            'Media': ['DIS', 'NFLX', 'PARA', 'WBD', 'ROKU', 'SPOT', 'T', 'VZ', 'TMUS'],
-            'Gaming': ['ATVI', 'EA', 'TTWO', 'RBLX', 'UNITY', 'ZNGA']
-        }
-        
-        # Sector-based fallback
-        sector_competitors = {
-            'Technology': ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'TSLA', 'CRM', 'ORCL', 'ADBE', 'INTC', 'AMD'],
-            'Healthcare': ['JNJ', 'PFE', 'UNH', 'MRK', 'ABT', 'TMO', 'DHR', 'BMY', 'LLY', 'AMGN', 'GILD', 'MDT'],
-            'Financial Services': ['JPM', 'BAC', 'BRK-B', 'V', 'MA', 'WFC', 'GS', 'MS', 'C', 'USB', 'AXP', 'COF'],
-            'Consumer Cyclical': ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'SBUX', 'TJX', 'LOW', 'TGT', 'GM', 'F'],
-            'Consumer Defensive': ['PG', 'KO', 'PEP', 'WMT', 'COST', 'UL', 'CL', 'KMB', 'GIS', 'K'],
-            'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'HAL', 'OXY', 'KMI', 'WMB', 'MPC'],
-            'Industrials': ['BA', 'CAT', 'GE', 'MMM', 'HON', 'UPS', 'LMT', 'RTX', 'DE', 'NOC'],
-            'Communication Services': ['GOOGL', 'META', 'NFLX', 'DIS', 'VZ', 'T', 'TMUS', 'ROKU', 'SNAP'],
-            'Utilities': ['NEE', 'DUK', 'SO', 'D', 'EXC', 'AEP', 'XEL', 'PEG', 'ED', 'FE'],
-            'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'SPG', 'O', 'WELL', 'PSA', 'AVB', 'EQR'],
-            'Materials': ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'DD', 'DOW', 'PPG', 'ECL', 'NUE']
-        }
+        mode = mode or self.peer_mode
         
         competitors = []
         main_symbol = main_stock['symbol']
         
+        # Data-driven peers from the precomputed correlation index
+        if mode == 'correlation' and self.peer_index is not None:
+            competitors.extend(self.peer_index.peers(main_symbol, k=max_competitors * 2))
+        
         # First try industry-specific matches
-        for key, symbols in industry_competitors.items():
-            if key.lower() in industry.lower() or industry.lower() in key.lower():
-                competitors.extend([s for s in symbols if s != main_symbol])
-                break
+        industry_key = match_industry(industry)
+        if not competitors and industry_key:
+            competitors.extend([s for s in INDUSTRY_COMPETITORS[industry_key] if s != main_symbol])
         
         # If no industry match, try sector
-        if not competitors and sector in sector_competitors:
-            competitors.extend([s for s in sector_competitors[sector] if s != main_symbol])
+        if not competitors and sector in SECTOR_COMPETITORS:
+            competitors.extend([s for s in SECTOR_COMPETITORS[sector] if s != main_symbol])
         
         # If still no competitors, use similar market cap stocks from same sector
         if not competitors:
             all_sector_stocks = []
-            for symbols in sector_competitors.values():
+            for symbols in SECTOR_COMPETITORS.values():
                 all_sector_stocks.extend(symbols)
             competitors = [s for s in all_sector_stocks if s != main_symbol][:10]
         
@@ -191,8 +513,11 @@ class StockCompetitorAnalyzer:
         # Validate competitors are real stocks
         validated_competitors = []
         for comp in competitors:
-            if self.validate_symbol(comp):
-                validated_competitors.append(comp)
+            try:
+                if self.validate_symbol(comp):
+                    validated_competitors.append(comp)
+            except TransientFetchError as e:
+                print(f"Skipping {comp} for now: {str(e)}")
             if len(validated_competitors) >= max_competitors:
                 break
         
@@ -204,7 +529,7 @@ class StockCompetitorAnalyzer:
             current_year_start = datetime(datetime.now().year, 1, 1)
             hist_current_year = hist[hist.index >= current_year_start]
             if len(hist_current_year) > 1:
-                return (hist_current_year['Close'][-1] / hist_current_year['Close'][0] - 1) * 100
+                return (hist_current_year['Close'].iloc[-1] / hist_current_year['Close'].iloc[0] - 1) * 100
         except:
             pass
         return 0
@@ -213,61 +538,19 @@ class StockCompetitorAnalyzer:
         """Calculate return over specified number of days"""
         try:
             if len(hist) >= days:
-                return (hist['Close'][-1] / hist['Close'][-days] - 1) * 100
+                return (hist['Close'].iloc[-1] / hist['Close'].iloc[-days] - 1) * 100
         except:
             pass
         return 0
     
     def calculate_score(self, stock_data, industry_avg):
-        """Calculate investment score based on multiple metrics"""
-        score = 50  # Base score
-        
-        try:
-            # Valuation scoring (lower is better for P/E, P/B)
-            if stock_data['pe_ratio'] > 0 and industry_avg.get('pe_ratio', 0) > 0:
-                pe_score = max(0, min(20, 20 * (industry_avg['pe_ratio'] / stock_data['pe_ratio'])))
-                score += pe_score - 10
-            
-            # Profitability scoring
-            if stock_data['roe'] and stock_data['roe'] > 0:
-                roe_score = min(15, stock_data['roe'] * 100)
-                score += roe_score - 7.5
-            
-            if stock_data['profit_margin'] and stock_data['profit_margin'] > 0:
-                margin_score = min(10, stock_data['profit_margin'] * 100)
-                score += margin_score - 5
-            
-            # Financial health scoring
-            if stock_data['debt_to_equity'] and stock_data['debt_to_equity'] > 0:
-                debt_score = max(-10, min(5, 5 - (stock_data['debt_to_equity'] / 100)))
-                score += debt_score
-            
-            if stock_data['current_ratio'] and stock_data['current_ratio'] > 0:
-                liquidity_score = min(5, stock_data['current_ratio'] * 2.5)
-                score += liquidity_score - 2.5
-            
-            # Growth scoring
-            if stock_data['revenue_growth'] and stock_data['revenue_growth'] > 0:
-                growth_score = min(10, stock_data['revenue_growth'] * 100)
-                score += growth_score - 5
-            
-        except Exception as e:
-            print(f"Error calculating score: {e}")
-        
-        return max(0, min(100, score))
+        """Calculate investment score based on multiple metrics (see scoring_model for the spec)"""
+        return self.scoring_model.score(stock_data, industry_avg)
     
     def generate_recommendation(self, score, stock_data):
         """Generate investment recommendation based on score and metrics"""
-        if score >= 70:
-            recommendation = "STRONG BUY"
-        elif score >= 60:
-            recommendation = "BUY"
-        elif score >= 40:
-            recommendation = "HOLD"
-        elif score >= 30:
-            recommendation = "SELL"
-        else:
-            recommendation = "STRONG SELL"
+        recommendation = next((label for cutoff, label in RECOMMENDATION_THRESHOLDS if score >= cutoff),
+                              "STRONG SELL")
         
         # Calculate target price (simple projection)
         current_price = stock_data['current_price']
@@ -283,14 +566,261 @@ class StockCompetitorAnalyzer:
             'risk_level': 'High' if stock_data.get('beta', 1) > 1.5 else 'Medium' if stock_data.get('beta', 1) > 0.8 else 'Low'
         }
     
-    def analyze_stock(self, symbol, callback=None):
-        """Main analysis function with callback for GUI updates"""
+    def peer_set_key(self, stocks):
+        """Cache key for a peer set: its membership plus each member's data versions"""
+        return tuple(sorted((stock['symbol'], self.data_versions.get(stock['symbol'], 0),
+                             self.price_versions.get(stock['symbol'], 0)) for stock in stocks))
+    
+    def get_peer_stats(self, stocks):
+        """Return PeerStats for a set of stocks, reusing a cached copy for the same peers and data"""
+        key = self.peer_set_key(stocks)
+        with self._lock:
+            stats = self._peer_stats_cache.get(key)
+            if stats is not None:
+                self._peer_stats_cache.move_to_end(key)
+                return stats
+        
+        stats = PeerStats(stocks, key=key)
+        with self._lock:
+            self._peer_stats_cache[key] = stats
+            while len(self._peer_stats_cache) > self.max_cached_peer_sets:
+                self._peer_stats_cache.popitem(last=False)
+        return stats
+    
+    def score_stock(self, stock_data, peer_stats):
+        """
+        Score and recommendation for one stock against a peer set.
+        
+        Scores are cached per scoring model and fundamentals version of the stock and
+        its peers. Price versions join the key only when the model scores a
+        price-derived metric; otherwise a price-only update just recomputes the
+        target price.
+        """
+        symbol = stock_data['symbol']
+        fundamentals_key = tuple(sorted((s, self.data_versions.get(s, 0)) for s in peer_stats.symbols))
+        price_key = None
+        if any(metric in PRICE_FIELDS for metric in self.scoring_model.metrics):
+            price_key = tuple(sorted((s, self.price_versions.get(s, 0)) for s in set(peer_stats.symbols) | {symbol}))
+        key = (self.scoring_model.fingerprint, symbol, self.data_versions.get(symbol, 0), fundamentals_key, price_key)
+        with self._lock:
+            score = self._score_cache.get(key)
+        
+        if score is None:
+            score = self.calculate_score(stock_data, peer_stats.means)
+            with self._lock:
+                self._score_cache[key] = score
+                while len(self._score_cache) > self.max_cached_peer_sets * 8:
+                    self._score_cache.popitem(last=False)
+        
+        return score, self.generate_recommendation(score, stock_data)
+    
+    def score_sensitivity(self, stock_data, peer_stats, n_samples=5000, spread=0.1, seed=0):
+        """
+        Monte Carlo sensitivity of a stock's score to noise in its input metrics.
+        
+        Every score metric is scaled by lognormal noise (`spread` = 1 sigma, roughly a
+        relative error), once all together and once one metric at a time, and all
+        perturbed copies are scored in a single batched pass through the scoring model.
+        
+        Returns:
+            dict: score distribution, recommendation probabilities and per-metric fragility
+        """
+        metrics = self.scoring_model.metrics
+        base = np.array([np.nan if stock_data.get(m) is None else float(stock_data[m]) for m in metrics])
+        noise = np.exp(np.random.default_rng(seed).normal(0, spread, (len(metrics), n_samples)))
+        
+        # Row 0 perturbs every metric jointly, row i + 1 only metric i
+        factors = np.ones((len(metrics) + 1, len(metrics), n_samples))
+        factors[0] = noise
+        factors[np.arange(1, len(metrics) + 1), np.arange(len(metrics))] = noise
+        samples = base[None, :, None] * factors
+        
+        scores = self.scoring_model.evaluate({m: samples[:, i] for i, m in enumerate(metrics)}, peer_stats.means)
+        labels = recommendation_labels(scores)
+        
+        base_score = self.calculate_score(stock_data, peer_stats.means)
+        base_label = self.generate_recommendation(base_score, stock_data)['recommendation']
+        probabilities = {label: float(np.mean(labels[0] == label)) for label in RECOMMENDATION_LEVELS}
+        
+        by_metric = [
+            {'metric': metric, 'score_std': float(scores[i + 1].std()),
+             'flip_probability': float(np.mean(labels[i + 1] != base_label))}
+            for i, metric in enumerate(metrics)
+        ]
+        by_metric.sort(key=lambda row: (row['flip_probability'], row['score_std']), reverse=True)
+        
+        return {
+            'samples': n_samples,
+            'spread': spread,
+            'base_score': base_score,
+            'base_recommendation': base_label,
+            'mean': float(scores[0].mean()),
+            'std': float(scores[0].std()),
+            'percentiles': {q: float(v) for q, v in zip((5, 25, 50, 75, 95), np.percentile(scores[0], [5, 25, 50, 75, 95]))},
+            'probabilities': probabilities,
+            'flip_probability': 1 - probabilities[base_label],
+            'by_metric': by_metric
+        }
+    
+    def build_analysis(self, main_stock, competitor_data, sensitivity=False):
+        """
+        Score a main stock against already-fetched competitors and rank them (no network access)
+        
+        Args:
+            sensitivity (bool): Also run the Monte Carlo score sensitivity of the main stock
+                                (only the AI tab and the console show it)
+        """
+        # Work on copies so concurrent analyses never write scores into shared cache entries
+        main_stock = dict(main_stock)
+        competitor_data = [dict(comp) for comp in competitor_data]
+        
+        # Peer statistics are shared by every analysis of the same peer set
+        all_stocks = [main_stock] + competitor_data
+        peer_stats = self.get_peer_stats(all_stocks)
+        industry_avg = peer_stats.means
+        
+        # Calculate scores and recommendations
+        for stock in all_stocks:
+            stock['score'], stock['recommendation_data'] = self.score_stock(stock, peer_stats)
+        
+        # Sort stocks by score (best to worst)
+        all_stocks.sort(key=lambda x: x['score'], reverse=True)
+        
+        return {
+            'main_stock': main_stock,
+            'competitors': competitor_data,
+            'all_stocks': all_stocks,
+            'industry_avg': industry_avg,
+            'peer_stats': peer_stats,
+            'sensitivity': self.score_sensitivity(main_stock, peer_stats) if sensitivity else None
+        }
+    
+    def calculate_strengths_weaknesses(self, main_stock, competitors, peer_means=None):
+        """
+        Calculate strengths and weaknesses vs competitors
+        
+        Args:
+            peer_means (dict): Positive-only peer averages, if already known (e.g. for a whole peer group)
+        """
+        strengths = []
+        weaknesses = []
+        
+        if not competitors:
+            return strengths, weaknesses
+        
+        try:
+            # Peer averages come from these records, not the cached peer statistics, since
+            # they may be a saved snapshot rather than the analyzer's current data
+            if peer_means is None:
+                peer_means = PeerStats(competitors).positive_means
+            avg_pe = peer_means.get('pe_ratio')
+            avg_roe = peer_means.get('roe')
+            avg_margin = peer_means.get('profit_margin')
+            avg_debt = peer_means.get('debt_to_equity')
+            
+            # Valuation analysis
+            if main_stock['pe_ratio'] and avg_pe and main_stock['pe_ratio'] > 0:
+                if main_stock['pe_ratio'] < avg_pe * 0.85:
+                    strengths.append(f"Attractive valuation with P/E of {main_stock['pe_ratio']:.1f} vs peer average of {avg_pe:.1f}")
+                elif main_stock['pe_ratio'] > avg_pe * 1.25:
+                    weaknesses.append(f"Premium valuation at P/E of {main_stock['pe_ratio']:.1f} vs peer average of {avg_pe:.1f}")
+            
+            # Profitability analysis  
+            if main_stock['roe'] and avg_roe and main_stock['roe'] > 0:
+                if main_stock['roe'] > avg_roe * 1.15:
+                    strengths.append(f"Superior profitability with ROE of {main_stock['roe']*100:.1f}% vs peer average of {avg_roe*100:.1f}%")
+                elif main_stock['roe'] < avg_roe * 0.75:
+                    weaknesses.append(f"Below-average profitability with ROE of {main_stock['roe']*100:.1f}% vs peer average of {avg_roe*100:.1f}%")
+            
+            # Margin analysis
+            if main_stock['profit_margin'] and avg_margin and main_stock['profit_margin'] > 0:
+                if main_stock['profit_margin'] > avg_margin * 1.2:
+                    strengths.append(f"Excellent profit margins at {main_stock['profit_margin']*100:.1f}% vs peer average of {avg_margin*100:.1f}%")
+                elif main_stock['profit_margin'] < avg_margin * 0.8:
+                    weaknesses.append(f"Compressed margins at {main_stock['profit_margin']*100:.1f}% vs peer average of {avg_margin*100:.1f}%")
+            
+            # Financial health
+            if main_stock['debt_to_equity'] is not None:
+                if main_stock['debt_to_equity'] < 25:
+                    strengths.append(f"Strong balance sheet with low debt-to-equity ratio of {main_stock['debt_to_equity']:.1f}")
+                elif main_stock['debt_to_equity'] > 100:
+                    weaknesses.append(f"High financial leverage with debt-to-equity ratio of {main_stock['debt_to_equity']:.1f}")
+            
+            # Growth analysis
+            if main_stock['revenue_growth'] and main_stock['revenue_growth'] > 0.15:
+                strengths.append(f"Strong revenue growth momentum at {main_stock['revenue_growth']*100:.1f}%")
+            elif main_stock['revenue_growth'] and main_stock['revenue_growth'] < -0.05:
+                weaknesses.append(f"Declining revenue trend at {main_stock['revenue_growth']*100:.1f}%")
+            
+            # Market performance
+            if main_stock.get('ytd_return'):
+                if main_stock['ytd_return'] > 15:
+                    strengths.append(f"Strong market performance with YTD return of +{main_stock['ytd_return']:.1f}%")
+                elif main_stock['ytd_return'] < -15:
+                    weaknesses.append(f"Poor market performance with YTD return of {main_stock['ytd_return']:.1f}%")
+            
+        except Exception as e:
+            print(f"Error calculating strengths/weaknesses: {e}")
+        
+        return strengths, weaknesses
+    
+    def assess_risks(self, main_stock, competitors):
+        """Assess investment risks"""
+        risks = []
+        
+        try:
+            # High volatility
+            if main_stock.get('beta', 1) > 1.5:
+                risks.append(f"High volatility risk with beta of {main_stock['beta']:.2f}")
+            
+            # Valuation risk
+            if main_stock['pe_ratio'] and main_stock['pe_ratio'] > 30:
+                risks.append(f"Valuation risk with elevated P/E ratio of {main_stock['pe_ratio']:.1f}")
+            
+            # Leverage risk  
+            if main_stock['debt_to_equity'] and main_stock['debt_to_equity'] > 80:
+                risks.append(f"Financial leverage risk with debt-to-equity of {main_stock['debt_to_equity']:.1f}")
+            
+            # Profitability concerns
+            if main_stock['roe'] and main_stock['roe'] < 0.05:
+                risks.append(f"Low profitability with ROE of {main_stock['roe']*100:.1f}%")
+            
+            # Growth concerns
+            if main_stock['revenue_growth'] and main_stock['revenue_growth'] < -0.1:
+                risks.append(f"Revenue decline risk with growth of {main_stock['revenue_growth']*100:.1f}%")
+            
+            # Market performance
+            if main_stock.get('ytd_return') and main_stock['ytd_return'] < -20:
+                risks.append(f"Poor market momentum with YTD return of {main_stock['ytd_return']:.1f}%")
+            
+            # Sector-specific risks
+            sector = main_stock.get('sector', '')
+            if 'Technology' in sector:
+                risks.append("Technology sector volatility and regulatory scrutiny")
+            elif 'Energy' in sector:
+                risks.append("Commodity price volatility and environmental regulations")
+            elif 'Financial' in sector:
+                risks.append("Interest rate sensitivity and regulatory changes")
+                
+        except Exception as e:
+            print(f"Error assessing risks: {e}")
+        
+        return risks
+    
+    def analyze_stock(self, symbol, callback=None, sensitivity=False):
+        """Main analysis function with callback for GUI updates (sensitivity: see build_analysis)"""
         try:
             if callback:
                 callback(f"🔍 Validating symbol {symbol.upper()}...")
             
             # Validate symbol
-            if not self.validate_symbol(symbol):
+            try:
+                is_valid = self.validate_symbol(symbol)
+            except TransientFetchError as e:
+                if callback:
+                    callback(f"⏳ Data source temporarily unavailable, try again shortly ({str(e)})")
+                return None
+            if not is_valid:
                 error_msg = f"❌ Error: Invalid or non-existent stock symbol '{symbol}'"
                 if callback:
                     callback(error_msg)
@@ -299,6 +829,13 @@ class StockCompetitorAnalyzer:
             if callback:
                 callback(f"📊 Retrieving data for {symbol.upper()}...")
             
+            # Re-analysis with fresh fundamentals: update every price in one batched request
+            known = self.cache.get(symbol.upper())
+            if known and self._is_fresh(symbol.upper(), self._fundamentals_fetched_at, self.fundamentals_ttl):
+                refreshed = self.refresh_prices([symbol.upper()] + self.find_industry_competitors(known))
+                if refreshed and callback:
+                    callback(f"⚡ Refreshed prices for {', '.join(refreshed)}")
+            
             # Get main stock data
             main_stock = self.get_stock_info(symbol.upper())
             if not main_stock:
@@ -337,31 +874,12 @@ class StockCompetitorAnalyzer:
             if callback:
                 callback("🧮 Calculating metrics and scores...")
             
-            # Create comparison dataframe
-            all_stocks = [main_stock] + competitor_data
-            df = pd.DataFrame(all_stocks)
-            
-            # Calculate industry averages (only numeric columns)
-            numeric_df = df.select_dtypes(include=[np.number])
-            industry_avg = numeric_df.mean().to_dict()
-            
-            # Calculate scores and recommendations
-            for stock in all_stocks:
-                stock['score'] = self.calculate_score(stock, industry_avg)
-                stock['recommendation_data'] = self.generate_recommendation(stock['score'], stock)
-            
-            # Sort stocks by score (best to worst)
-            all_stocks.sort(key=lambda x: x['score'], reverse=True)
+            result = self.build_analysis(main_stock, competitor_data, sensitivity)
             
             if callback:
                 callback("✅ Analysis complete!")
             
-            return {
-                'main_stock': main_stock,
-                'competitors': competitor_data,
-                'all_stocks': all_stocks,
-                'industry_avg': industry_avg
-            }
+            return result
             
         except Exception as e:
             error_msg = f"❌ Error during analysis: {str(e)}"
@@ -371,9 +889,27 @@ class StockCompetitorAnalyzer:
 
 
 class ModernStockAnalyzerGUI:
-    def __init__(self):
-        self.analyzer = StockCompetitorAnalyzer()
+    def __init__(self, analyzer=None, monitor=None, snapshots=None, warmup=False):
+        """
+        Args:
+            analyzer (StockCompetitorAnalyzer): Analyzer to use (a live one is created by default)
+            monitor (WatchlistMonitor): Optional warm store; watched symbols display instantly
+            snapshots (SnapshotStore): Where finished analyses are saved for the history list
+            warmup (bool or list): Prefetch the most analyzed peer groups in the background
+                                   (a list adds symbols to always warm up)
+        """
+        if snapshots is None:
+            from analysis_snapshots import SnapshotStore
+            snapshots = SnapshotStore()
+        self.analyzer = analyzer or StockCompetitorAnalyzer()
+        self.monitor = monitor
+        self.snapshots = snapshots
         self.analysis_result = None
+        self.warmer = None
+        if warmup:
+            from cache_warmup import start_warmup
+            self.warmer = start_warmup(self.analyzer, self.snapshots,
+                                       warmup if isinstance(warmup, (list, tuple)) else None)
         self.setup_gui()
     
     def setup_gui(self):
@@ -530,7 +1066,25 @@ class ModernStockAnalyzerGUI:
                                     fg=self.colors['text_secondary'], 
                                     relief='flat', padx=20, pady=12, cursor='hand2',
                                     activebackground=self.colors['border'])
-        self.clear_button.pack(side='left')
+        self.clear_button.pack(side='left', padx=(0, 10))
+        
+        self.history_button = tk.Button(input_container, text="🕘 History", 
+                                      command=self.open_history_window, 
+                                      font=('Segoe UI', 11),
+                                      bg=self.colors['bg_card'], 
+                                      fg=self.colors['text_secondary'], 
+                                      relief='flat', padx=20, pady=12, cursor='hand2',
+                                      activebackground=self.colors['border'])
+        self.history_button.pack(side='left', padx=(0, 10))
+        
+        self.export_button = tk.Button(input_container, text="📑 Export Excel", 
+                                     command=self.export_excel, 
+                                     font=('Segoe UI', 11),
+                                     bg=self.colors['bg_card'], 
+                                     fg=self.colors['text_secondary'], 
+                                     relief='flat', padx=20, pady=12, cursor='hand2',
+                                     activebackground=self.colors['border'])
+        self.export_button.pack(side='left')
         
         # Popular examples with modern chip design
         examples_frame = tk.Frame(input_frame, bg=self.colors['bg_secondary'])
@@ -667,6 +1221,20 @@ class ModernStockAnalyzerGUI:
         
         # Clear status with header
         self.status_text.delete(1.0, tk.END)
+        
+        # Watched symbols are served straight from the monitor's warm store
+        warm_result = self.monitor.get_analysis(symbol) if self.monitor else None
+        if warm_result:
+            age = time.time() - warm_result['refreshed_at']
+            self.update_status(f"⚡ Loaded {symbol} from watchlist (refreshed {age:.0f}s ago)")
+            # The monitor skips the sensitivity run; do it now that the result is shown
+            if warm_result.get('sensitivity') is None:
+                warm_result = dict(warm_result, sensitivity=self.analyzer.score_sensitivity(
+                    warm_result['main_stock'], warm_result['peer_stats']))
+            self.analysis_result = warm_result
+            self.display_results()
+            return
+        
         self.update_status(f"🚀 Starting analysis for {symbol}")
         
         # Run analysis in separate thread
@@ -677,10 +1245,11 @@ class ModernStockAnalyzerGUI:
     def _analyze_thread(self, symbol):
         """Thread function for analysis"""
         try:
-            result = self.analyzer.analyze_stock(symbol, callback=self.update_status)
+            result = self.analyzer.analyze_stock(symbol, callback=self.update_status, sensitivity=True)
             
             if result:
                 self.analysis_result = result
+                self.save_snapshot(result)
                 self.root.after(0, self.display_results)
             else:
                 self.root.after(0, self.analysis_failed)
@@ -689,6 +1258,98 @@ class ModernStockAnalyzerGUI:
             self.update_status(f"❌ Critical Error: {str(e)}")
             self.root.after(0, self.analysis_failed)
     
+    def save_snapshot(self, result):
+        """Keep a finished analysis so it can be reopened later without refetching"""
+        try:
+            symbols = [stock['symbol'] for stock in result['all_stocks']]
+            snapshot_id = self.snapshots.save(result, self.analyzer.get_closes(symbols))
+            self.update_status(f"📸 Saved snapshot {snapshot_id}")
+        except Exception as e:
+            self.update_status(f"⚠️ Could not save snapshot: {str(e)}")
+    
+    def export_excel(self):
+        """Write the current analysis to a multi-sheet Excel workbook"""
+        if not self.analysis_result:
+            messagebox.showwarning("Nothing to Export", "Analyze a stock (or open one from History) first")
+            return
+        
+        symbol = self.analysis_result['main_stock']['symbol']
+        path = filedialog.asksaveasfilename(defaultextension='.xlsx', initialfile=f"{symbol}_analysis.xlsx",
+                                            filetypes=[("Excel workbook", "*.xlsx")])
+        if not path:
+            return
+        
+        try:
+            from excel_report import write_analysis_report
+            write_analysis_report(self.analysis_result, path, self.analyzer)
+            self.update_status(f"📑 Exported {symbol} analysis to {path}")
+        except ImportError as e:
+            messagebox.showerror("Export Failed", str(e))
+        except Exception as e:
+            messagebox.showerror("Export Failed", f"Could not write {path}:\n{str(e)}")
+    
+    def open_history_window(self):
+        """List saved analyses; open one or compare several side by side"""
+        window = tk.Toplevel(self.root)
+        window.title("🕘 Analysis History")
+        window.geometry("900x500")
+        window.configure(bg=self.colors['bg_primary'])
+        
+        columns = ('symbol', 'name', 'saved_at', 'score', 'recommendation', 'peers')
+        tree = ttk.Treeview(window, columns=columns, show='headings', selectmode='extended')
+        for column, width in zip(columns, (80, 180, 150, 70, 120, 260)):
+            tree.heading(column, text=column.replace('_', ' ').title())
+            tree.column(column, width=width, anchor='w')
+        for row in self.snapshots.list().itertuples(index=False):
+            tree.insert('', 'end', iid=row.id, values=[getattr(row, c) for c in columns])
+        tree.pack(fill='both', expand=True, padx=15, pady=15)
+        
+        def open_selected():
+            selected = tree.selection()
+            if selected:
+                self.open_snapshot(selected[0])
+                window.destroy()
+        
+        def compare_selected():
+            selected = tree.selection()
+            if len(selected) < 2:
+                messagebox.showinfo("Compare", "Select two or more snapshots to compare", parent=window)
+                return
+            self.show_comparison(self.snapshots.compare(selected))
+        
+        buttons = tk.Frame(window, bg=self.colors['bg_primary'])
+        buttons.pack(fill='x', padx=15, pady=(0, 15))
+        for text, command in [("📂 Open", open_selected), ("⚖️ Compare", compare_selected)]:
+            tk.Button(buttons, text=text, command=command, 
+                     font=('Segoe UI', 11, 'bold'), bg=self.colors['accent_primary'], 
+                     fg='white', relief='flat', padx=20, pady=8, cursor='hand2').pack(side='left', padx=(0, 10))
+        tree.bind('<Double-1>', lambda e: open_selected())
+    
+    def open_snapshot(self, snapshot_id):
+        """Show a saved analysis exactly as it was, without touching the network"""
+        self.clear_results()
+        self.status_text.delete(1.0, tk.END)
+        self.analysis_result = self.snapshots.load(snapshot_id)
+        self.symbol_var.set(self.analysis_result['main_stock']['symbol'])
+        self.update_status(f"📂 Opened snapshot {snapshot_id} (saved {self.analysis_result['saved_at']})")
+        self.display_results()
+    
+    def show_comparison(self, table):
+        """Side-by-side table of several snapshots"""
+        window = tk.Toplevel(self.root)
+        window.title("⚖️ Snapshot Comparison")
+        window.configure(bg=self.colors['bg_primary'])
+        
+        columns = ['field'] + list(table.columns)
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=len(table))
+        for column in columns:
+            tree.heading(column, text='' if column == 'field' else column)
+            tree.column(column, width=130 if column == 'field' else 200, anchor='w')
+        for label, values in table.iterrows():
+            cells = [f"{v:,.2f}" if isinstance(v, float) else ('' if v is None else v) for v in values]
+            tree.insert('', 'end', values=[label] + cells)
+        tree.pack(fill='both', expand=True, padx=15, pady=15)
+    
     def analysis_failed(self):
         """Handle failed analysis with better UX"""
         self.analyze_button.config(state='normal', text='🚀 Analyze Stock', 
@@ -940,6 +1601,7 @@ class ModernStockAnalyzerGUI:
         canvas.configure(yscrollcommand=scrollbar.set)
         
         all_stocks = self.analysis_result['all_stocks']  # Already sorted
+        peer_stats = self.analysis_result['peer_stats']
         
         # Header
         header_frame = tk.Frame(scrollable_frame, bg=self.colors['bg_primary'])
@@ -1036,12 +1698,12 @@ class ModernStockAnalyzerGUI:
                     
                     # Highlight best values
                     if key in ['roe', 'roa', 'gross_margin', 'operating_margin', 'profit_margin', 'revenue_growth'] and stock.get(key, 0):
-                        if stock.get(key, 0) == max([s.get(key, 0) for s in all_stocks if s.get(key, 0)]):
+                        if stock.get(key, 0) == peer_stats.max_values.get(key):
                             text_color = self.colors['accent_success']
                         else:
                             text_color = self.colors['text_primary']
                     elif key in ['pe_ratio', 'debt_to_equity'] and stock.get(key, 0):
-                        if stock.get(key, 0) == min([s.get(key, 0) for s in all_stocks if s.get(key, 0) and s.get(key, 0) > 0]):
+                        if stock.get(key, 0) == peer_stats.min_positive.get(key):
                             text_color = self.colors['accent_success']
                         else:
                             text_color = self.colors['text_primary']
@@ -1058,118 +1720,7 @@ class ModernStockAnalyzerGUI:
     def populate_charts_tab(self):
         """Populate charts tab with modern visualizations"""
         try:
-            all_stocks = self.analysis_result['all_stocks']
-            main_symbol = self.analysis_result['main_stock']['symbol']
-            
-            # Create figure with dark theme
-            fig = Figure(figsize=(14, 10), facecolor=self.colors['bg_primary'])
-            
-            # Create 2x2 subplot - fix compatibility issue
-            axes = fig.subplots(2, 2)
-            
-            # Set face color for each subplot individually
-            for ax in axes.flat:
-                ax.set_facecolor(self.colors['bg_card'])
-            fig.suptitle('Investment Analysis Dashboard', fontsize=16, color=self.colors['text_primary'], fontweight='bold')
-            
-            symbols = [stock['symbol'] for stock in all_stocks]
-            colors = [self.colors['accent_danger'] if s == main_symbol else self.colors['accent_primary'] for s in symbols]
-            
-            # 1. Investment Scores Ranking
-            ax1 = axes[0, 0]
-            scores = [stock['score'] for stock in all_stocks]
-            bars1 = ax1.barh(symbols, scores, color=colors, alpha=0.8)
-            ax1.set_title('Investment Scores (Ranked)', fontweight='bold', color=self.colors['text_primary'])
-            ax1.set_xlabel('Score (0-100)', color=self.colors['text_primary'])
-            ax1.axvline(x=50, color=self.colors['text_muted'], linestyle='--', alpha=0.7, label='Neutral (50)')
-            ax1.axvline(x=60, color=self.colors['accent_success'], linestyle='--', alpha=0.7, label='Buy Zone (60+)')
-            
-            # Add value labels
-            for i, (bar, score) in enumerate(zip(bars1, scores)):
-                ax1.text(score + 1, i, f'{score:.1f}', va='center', fontweight='bold', color=self.colors['text_primary'])
-            
-            ax1.set_facecolor(self.colors['bg_card'])
-            ax1.tick_params(colors=self.colors['text_primary'])
-            ax1.legend(loc='lower right')
-            
-            # 2. P/E Ratio Comparison
-            ax2 = axes[0, 1]
-            pe_ratios = [stock['pe_ratio'] if stock['pe_ratio'] and stock['pe_ratio'] > 0 else 0 for stock in all_stocks]
-            bars2 = ax2.bar(symbols, pe_ratios, color=colors, alpha=0.8)
-            ax2.set_title('P/E Ratio Comparison', fontweight='bold', color=self.colors['text_primary'])
-            ax2.set_ylabel('P/E Ratio', color=self.colors['text_primary'])
-            
-            for bar in bars2:
-                height = bar.get_height()
-                if height > 0:
-                    ax2.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                            f'{height:.1f}', ha='center', va='bottom', fontweight='bold', 
-                            color=self.colors['text_primary'])
-            
-            ax2.set_facecolor(self.colors['bg_card'])
-            ax2.tick_params(colors=self.colors['text_primary'])
-            plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
-            
-            # 3. ROE vs Debt/Equity Scatter
-            ax3 = axes[1, 0]
-            roe_values = [stock['roe']*100 if stock['roe'] else 0 for stock in all_stocks]
-            debt_values = [stock['debt_to_equity'] if stock['debt_to_equity'] else 0 for stock in all_stocks]
-            
-            scatter_colors = [self.colors['accent_danger'] if s == main_symbol else self.colors['accent_primary'] for s in symbols]
-            scatter = ax3.scatter(debt_values, roe_values, c=scatter_colors, s=120, alpha=0.8, edgecolors='white', linewidth=2)
-            
-            # Add labels
-            for i, symbol in enumerate(symbols):
-                if debt_values[i] > 0 or roe_values[i] > 0:
-                    ax3.annotate(symbol, (debt_values[i], roe_values[i]), 
-                               xytext=(5, 5), textcoords='offset points', 
-                               fontsize=9, fontweight='bold', color=self.colors['text_primary'])
-            
-            ax3.set_xlabel('Debt/Equity Ratio', color=self.colors['text_primary'])
-            ax3.set_ylabel('ROE (%)', color=self.colors['text_primary'])
-            ax3.set_title('Profitability vs Financial Leverage', fontweight='bold', color=self.colors['text_primary'])
-            ax3.grid(True, alpha=0.3, color=self.colors['text_muted'])
-            ax3.set_facecolor(self.colors['bg_card'])
-            ax3.tick_params(colors=self.colors['text_primary'])
-            
-            # Add quadrant lines
-            if max(debt_values) > 0 and max(roe_values) > 0:
-                ax3.axhline(y=np.mean([r for r in roe_values if r > 0]), color=self.colors['text_muted'], linestyle='--', alpha=0.5)
-                ax3.axvline(x=np.mean([d for d in debt_values if d > 0]), color=self.colors['text_muted'], linestyle='--', alpha=0.5)
-            
-            # 4. Recommendation Distribution
-            ax4 = axes[1, 1]
-            recommendations = [stock['recommendation_data']['recommendation'] for stock in all_stocks]
-            rec_counts = {}
-            rec_colors_map = {
-                'STRONG BUY': self.colors['accent_success'],
-                'BUY': '#16a34a',
-                'HOLD': self.colors['accent_warning'], 
-                'SELL': '#dc2626',
-                'STRONG SELL': self.colors['accent_danger']
-            }
-            
-            for rec in recommendations:
-                rec_counts[rec] = rec_counts.get(rec, 0) + 1
-            
-            if rec_counts:
-                wedges, texts, autotexts = ax4.pie(rec_counts.values(), 
-                                                 labels=rec_counts.keys(),
-                                                 colors=[rec_colors_map.get(rec, self.colors['accent_primary']) for rec in rec_counts.keys()],
-                                                 autopct='%1.0f%%', startangle=90,
-                                                 textprops={'color': self.colors['text_primary'], 'fontweight': 'bold'})
-                
-                ax4.set_title('Investment Recommendations Distribution', fontweight='bold', color=self.colors['text_primary'])
-                ax4.set_facecolor(self.colors['bg_card'])
-            
-            # Style all axes
-            for ax in axes.flat:
-                ax.spines['bottom'].set_color(self.colors['border'])
-                ax.spines['top'].set_color(self.colors['border'])
-                ax.spines['right'].set_color(self.colors['border'])
-                ax.spines['left'].set_color(self.colors['border'])
-            
-            plt.tight_layout()
+            fig = DashboardRenderer(self.colors).draw(self.analysis_result)
             
             # Embed in tkinter
             canvas_widget = FigureCanvasTkAgg(fig, self.charts_tab)
@@ -1284,6 +1835,11 @@ class ModernStockAnalyzerGUI:
             tk.Label(metric_box, text=value, font=('Segoe UI', 12, 'bold'), 
                     bg='white', fg=self.colors['bg_primary']).pack(pady=(2, 12))
         
+        # Score Sensitivity (Monte Carlo)
+        sensitivity = self.analysis_result.get('sensitivity')
+        if sensitivity:
+            self.create_sensitivity_card(scrollable_frame, sensitivity)
+        
         # Competitive Analysis
         competitive_frame = tk.Frame(scrollable_frame, bg=self.colors['bg_primary'])
         competitive_frame.pack(fill='x', padx=20, pady=20)
@@ -1444,66 +2000,53 @@ class ModernStockAnalyzerGUI:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
     
+    def create_sensitivity_card(self, parent, sensitivity):
+        """Show how stable the score and recommendation are under noisy inputs"""
+        card = tk.Frame(parent, bg=self.colors['bg_card'], relief='solid', bd=1)
+        card.pack(fill='x', padx=20, pady=(0, 20))
+        
+        tk.Label(card, text="🎲 Score Sensitivity", 
+                font=('Segoe UI', 18, 'bold'), 
+                bg=self.colors['bg_card'], fg=self.colors['text_primary']).pack(anchor='w', padx=20, pady=(20, 5))
+        
+        tk.Label(card, text=f"{sensitivity['samples']:,} simulations with ±{sensitivity['spread']*100:.0f}% noise on each input metric", 
+                font=('Segoe UI', 11), 
+                bg=self.colors['bg_card'], fg=self.colors['text_muted']).pack(anchor='w', padx=20)
+        
+        stay = 1 - sensitivity['flip_probability']
+        stability_color = (self.colors['accent_success'] if stay >= 0.9 else
+                           self.colors['accent_warning'] if stay >= 0.6 else self.colors['accent_danger'])
+        summary = (f"Score 90% range: {sensitivity['percentiles'][5]:.1f} – {sensitivity['percentiles'][95]:.1f}    "
+                   f"{sensitivity['base_recommendation']} holds in {stay*100:.0f}% of simulations")
+        tk.Label(card, text=summary, 
+                font=('Segoe UI', 13, 'bold'), 
+                bg=self.colors['bg_card'], fg=stability_color).pack(anchor='w', padx=20, pady=(10, 10))
+        
+        # Recommendation probabilities
+        probs_frame = tk.Frame(card, bg=self.colors['bg_card'])
+        probs_frame.pack(fill='x', padx=20)
+        for i, (label, probability) in enumerate(sensitivity['probabilities'].items()):
+            box = tk.Frame(probs_frame, bg='white', relief='solid', bd=1)
+            box.grid(row=0, column=i, sticky='ew', padx=5, pady=5)
+            probs_frame.columnconfigure(i, weight=1)
+            tk.Label(box, text=label, font=('Segoe UI', 10, 'bold'), 
+                    bg='white', fg=self.colors['text_muted']).pack(pady=(8, 2))
+            tk.Label(box, text=f"{probability*100:.1f}%", font=('Segoe UI', 12, 'bold'), 
+                    bg='white', fg=self.colors['bg_primary']).pack(pady=(2, 8))
+        
+        # Most fragile inputs
+        for row in sensitivity['by_metric'][:3]:
+            text = (f"• {row['metric'].replace('_', ' ').title()}: score σ {row['score_std']:.2f}, "
+                    f"flips the recommendation in {row['flip_probability']*100:.1f}% of cases")
+            tk.Label(card, text=text, 
+                    font=('Segoe UI', 11), bg=self.colors['bg_card'], 
+                    fg=self.colors['text_primary'], anchor='w').pack(anchor='w', padx=20, pady=2)
+        
+        tk.Frame(card, height=15, bg=self.colors['bg_card']).pack()
+    
     def calculate_strengths_weaknesses(self, main_stock, competitors):
         """Calculate strengths and weaknesses vs competitors"""
-        strengths = []
-        weaknesses = []
-        
-        if not competitors:
-            return strengths, weaknesses
-        
-        try:
-            # Calculate averages
-            avg_pe = np.mean([c['pe_ratio'] for c in competitors if c['pe_ratio'] and c['pe_ratio'] > 0])
-            avg_roe = np.mean([c['roe'] for c in competitors if c['roe'] and c['roe'] > 0])
-            avg_margin = np.mean([c['profit_margin'] for c in competitors if c['profit_margin'] and c['profit_margin'] > 0])
-            avg_debt = np.mean([c['debt_to_equity'] for c in competitors if c['debt_to_equity'] and c['debt_to_equity'] > 0])
-            
-            # Valuation analysis
-            if main_stock['pe_ratio'] and avg_pe and main_stock['pe_ratio'] > 0:
-                if main_stock['pe_ratio'] < avg_pe * 0.85:
-                    strengths.append(f"Attractive valuation with P/E of {main_stock['pe_ratio']:.1f} vs peer average of {avg_pe:.1f}")
-                elif main_stock['pe_ratio'] > avg_pe * 1.25:
-                    weaknesses.append(f"Premium valuation at P/E of {main_stock['pe_ratio']:.1f} vs peer average of {avg_pe:.1f}")
-            
-            # Profitability analysis  
-            if main_stock['roe'] and avg_roe and main_stock['roe'] > 0:
-                if main_stock['roe'] > avg_roe * 1.15:
-                    strengths.append(f"Superior profitability with ROE of {main_stock['roe']*100:.1f}% vs peer average of {avg_roe*100:.1f}%")
-                elif main_stock['roe'] < avg_roe * 0.75:
-                    weaknesses.append(f"Below-average profitability with ROE of {main_stock['roe']*100:.1f}% vs peer average of {avg_roe*100:.1f}%")
-            
-            # Margin analysis
-            if main_stock['profit_margin'] and avg_margin and main_stock['profit_margin'] > 0:
-                if main_stock['profit_margin'] > avg_margin * 1.2:
-                    strengths.append(f"Excellent profit margins at {main_stock['profit_margin']*100:.1f}% vs peer average of {avg_margin*100:.1f}%")
-                elif main_stock['profit_margin'] < avg_margin * 0.8:
-                    weaknesses.append(f"Compressed margins at {main_stock['profit_margin']*100:.1f}% vs peer average of {avg_margin*100:.1f}%")
-            
-            # Financial health
-            if main_stock['debt_to_equity'] is not None:
-                if main_stock['debt_to_equity'] < 25:
-                    strengths.append(f"Strong balance sheet with low debt-to-equity ratio of {main_stock['debt_to_equity']:.1f}")
-                elif main_stock['debt_to_equity'] > 100:
-                    weaknesses.append(f"High financial leverage with debt-to-equity ratio of {main_stock['debt_to_equity']:.1f}")
-            
-            # Growth analysis
-            if main_stock['revenue_growth'] and main_stock['revenue_growth'] > 0.15:
-                strengths.append(f"Strong revenue growth momentum at {main_stock['revenue_growth']*100:.1f}%")
-            elif main_stock['revenue_growth'] and main_stock['revenue_growth'] < -0.05:
-                weaknesses.append(f"Declining revenue trend at {main_stock['revenue_growth']*100:.1f}%")
-            
-            # Market performance
-            if main_stock.get('ytd_return'):
-                if main_stock['ytd_return'] > 15:
-                    strengths.append(f"Strong market performance with YTD return of +{main_stock['ytd_return']:.1f}%")
-                elif main_stock['ytd_return'] < -15:
-                    weaknesses.append(f"Poor market performance with YTD return of {main_stock['ytd_return']:.1f}%")
-            
-        except Exception as e:
-            print(f"Error calculating strengths/weaknesses: {e}")
-        
-        return strengths, weaknesses
+        return self.analyzer.calculate_strengths_weaknesses(main_stock, competitors)
     
     def generate_investment_thesis(self, main_stock, rec_data, rank, total):
         """Generate AI-style investment thesis"""
@@ -1539,46 +2082,7 @@ class ModernStockAnalyzerGUI:
     
     def assess_risks(self, main_stock, competitors):
         """Assess investment risks"""
-        risks = []
-        
-        try:
-            # High volatility
-            if main_stock.get('beta', 1) > 1.5:
-                risks.append(f"High volatility risk with beta of {main_stock['beta']:.2f}")
-            
-            # Valuation risk
-            if main_stock['pe_ratio'] and main_stock['pe_ratio'] > 30:
-                risks.append(f"Valuation risk with elevated P/E ratio of {main_stock['pe_ratio']:.1f}")
-            
-            # Leverage risk  
-            if main_stock['debt_to_equity'] and main_stock['debt_to_equity'] > 80:
-                risks.append(f"Financial leverage risk with debt-to-equity of {main_stock['debt_to_equity']:.1f}")
-            
-            # Profitability concerns
-            if main_stock['roe'] and main_stock['roe'] < 0.05:
-                risks.append(f"Low profitability with ROE of {main_stock['roe']*100:.1f}%")
-            
-            # Growth concerns
-            if main_stock['revenue_growth'] and main_stock['revenue_growth'] < -0.1:
-                risks.append(f"Revenue decline risk with growth of {main_stock['revenue_growth']*100:.1f}%")
-            
-            # Market performance
-            if main_stock.get('ytd_return') and main_stock['ytd_return'] < -20:
-                risks.append(f"Poor market momentum with YTD return of {main_stock['ytd_return']:.1f}%")
-            
-            # Sector-specific risks
-            sector = main_stock.get('sector', '')
-            if 'Technology' in sector:
-                risks.append("Technology sector volatility and regulatory scrutiny")
-            elif 'Energy' in sector:
-                risks.append("Commodity price volatility and environmental regulations")
-            elif 'Financial' in sector:
-                risks.append("Interest rate sensitivity and regulatory changes")
-                
-        except Exception as e:
-            print(f"Error assessing risks: {e}")
-        
-        return risks
+        return self.analyzer.assess_risks(main_stock, competitors)
     
     def format_market_cap(self, market_cap):
         """Format market cap in readable format"""
@@ -1604,8 +2108,55 @@ class ModernStockAnalyzerGUI:
         self.root.mainloop()
 
 
+def add_analyzer_arguments(parser):
+    """Command-line options for where peers come from and whether fetched data is recorded"""
+    parser.add_argument('--peers', choices=['industry', 'correlation'], default='industry',
+                        help="Peer discovery: the competitor tables, or the return-correlation index "
+                             "built by 'peer_finder.py build'")
+    parser.add_argument('--record-history', action='store_true',
+                        help="Write fetched price histories and fundamentals snapshots to the local history "
+                             "store (used by score_backtester.py)")
+
+
+def create_analyzer(peers='industry', record_history=False, data_source=None):
+    """
+    StockCompetitorAnalyzer configured from the add_analyzer_arguments options.
+    
+    Correlation peers need the saved peer index; without it the competitor tables are used.
+    """
+    history_store = None
+    if record_history:
+        from history_store import HistoryStore
+        history_store = HistoryStore()
+    
+    peer_index = None
+    if peers == 'correlation':
+        from peer_finder import DEFAULT_INDEX_PATH, ReturnCorrelationIndex
+        if os.path.exists(DEFAULT_INDEX_PATH):
+            peer_index = ReturnCorrelationIndex.load()
+            print(f"🎯 Using correlation peers for {len(peer_index)} indexed symbols")
+        else:
+            print("⚠️ No peer index found; run 'python peer_finder.py build' first. Using industry peers.")
+            peers = 'industry'
+    
+    return StockCompetitorAnalyzer(data_source=data_source, history_store=history_store,
+                                   peer_index=peer_index, peer_mode=peers)
+
+
 def main():
     """Main function to run the application"""
+    parser = argparse.ArgumentParser(description="Stock Competitor Analyzer")
+    parser.add_argument('--console', action='store_true', help="Use the console version instead of the GUI")
+    parser.add_argument('--warmup', nargs='?', const='', default=None, metavar='SYMBOLS',
+                        help="Prefetch the most analyzed peer groups at startup (plus optional comma-separated symbols)")
+    add_analyzer_arguments(parser)
+    args = parser.parse_args()
+    analyzer = create_analyzer(args.peers, args.record_history)
+    
+    if args.console:
+        console_main(analyzer)
+        return
+    
     try:
         # Check if required packages are installed
         import matplotlib.pyplot as plt
@@ -1616,8 +2167,9 @@ def main():
         print("🚀 Starting Stock Competitor Analyzer Pro...")
         print("📋 All required packages are available.")
         
-        # Create and run the modern GUI
-        app = ModernStockAnalyzerGUI()
+        # Create and run the modern GUI, prefetching the most analyzed peer groups meanwhile if asked to
+        warmup = args.warmup.split(',') if args.warmup is not None else False
+        app = ModernStockAnalyzerGUI(analyzer=analyzer, warmup=warmup)
         app.run()
         
     except ImportError as e:
@@ -1627,20 +2179,33 @@ def main():
         
         # Fallback to console version
         print("\n🔄 Falling back to console version...")
-        console_main()
+        console_main(analyzer)
     except Exception as e:
         print(f"❌ Error starting GUI: {e}")
         print("🔄 Falling back to console version...")
-        console_main()
+        console_main(analyzer)
 
 
-def console_main():
+def print_sensitivity(sensitivity):
+    """Console summary of a Monte Carlo score sensitivity result"""
+    if not sensitivity:
+        return
+    print(f"\n🎲 SCORE SENSITIVITY ({sensitivity['samples']:,} simulations, ±{sensitivity['spread']*100:.0f}% input noise):")
+    print(f"   Score: {sensitivity['mean']:.1f} ± {sensitivity['std']:.1f} "
+          f"(90% range {sensitivity['percentiles'][5]:.1f} - {sensitivity['percentiles'][95]:.1f})")
+    print(f"   {sensitivity['base_recommendation']} holds in {(1 - sensitivity['flip_probability'])*100:.1f}% of simulations")
+    print("   " + "  ".join(f"{label}: {p*100:.1f}%" for label, p in sensitivity['probabilities'].items() if p > 0))
+    for row in sensitivity['by_metric'][:3]:
+        print(f"   • {row['metric']:<15} σ {row['score_std']:.2f}   flip {row['flip_probability']*100:.1f}%")
+
+
+def console_main(analyzer=None):
     """Console version of the application"""
     print("=" * 60)
     print("📈 STOCK COMPETITOR ANALYZER - CONSOLE VERSION")
     print("=" * 60)
     
-    analyzer = StockCompetitorAnalyzer()
+    analyzer = analyzer or StockCompetitorAnalyzer()
     
     while True:
         try:
@@ -1656,7 +2221,7 @@ def console_main():
                 continue
             
             print(f"\n🔍 Analyzing {symbol}...")
-            result = analyzer.analyze_stock(symbol, callback=print)
+            result = analyzer.analyze_stock(symbol, callback=print, sensitivity=True)
             
             if result:
                 main_stock = result['main_stock']
@@ -1721,6 +2286,8 @@ def console_main():
                     print(f"📊 {main_stock['symbol']} shows above-average performance.")
                 else:
                     print(f"⚠️ {main_stock['symbol']} ranks in the bottom half - consider alternatives.")
+                
+                print_sensitivity(result.get('sensitivity'))
             
             another = input("\n🔄 Analyze another stock? (y/n): ").strip().lower()
             if another not in ['y', 'yes']:
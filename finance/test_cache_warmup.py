@@ -0,0 +1,14 @@
+from cache_warmup import start_warmup
+from offline_data import OfflineDataSource
+from stock_analyzer import StockCompetitorAnalyzer
+
+
+def test_warmup_is_skipped_while_the_breaker_is_open():
+    source = OfflineDataSource()
+    analyzer = StockCompetitorAnalyzer(data_source=source)
+    breaker = analyzer.data_source.breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    assert start_warmup(analyzer, configured=['AAPL']) is None
+    assert source.calls['info'] == 0
@@ -0,0 +1,33 @@
+import copy
+import math
+import warnings
+
+from offline_data import OfflineDataSource
+from stock_analyzer import PeerStats, StockCompetitorAnalyzer
+
+
+def test_strengths_use_the_given_records_not_cached_peer_stats():
+    analyzer = StockCompetitorAnalyzer(data_source=OfflineDataSource())
+    main_stock, *peers = [analyzer.get_stock_info(s) for s in ['AAPL', 'MSFT', 'GOOGL', 'AMZN']]
+    main_stock = dict(main_stock, pe_ratio=15.4)
+
+    # A reopened snapshot of the same peer set, with very different data
+    snapshot_peers = [dict(copy.deepcopy(peer), pe_ratio=1000.0) for peer in peers]
+    strengths, _ = analyzer.calculate_strengths_weaknesses(main_stock, snapshot_peers)
+    assert any('peer average of 1000.0' in s for s in strengths)
+
+    strengths, _ = analyzer.calculate_strengths_weaknesses(main_stock, peers)
+    assert not any('peer average of 1000.0' in s for s in strengths)
+
+
+def test_metrics_without_values_give_nan_without_warnings():
+    stocks = [{'symbol': 'A', 'pe_ratio': 10.0, 'roe': float('nan'), 'debt_to_equity': 0.0},
+              {'symbol': 'B', 'pe_ratio': 30.0, 'roe': float('nan'), 'debt_to_equity': 0.0}]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        stats = PeerStats(stocks)
+
+    assert stats.means['pe_ratio'] == 20.0
+    assert stats.percentiles[25]['pe_ratio'] == 15.0
+    assert math.isnan(stats.means['roe']) and math.isnan(stats.medians['roe'])
+    assert math.isnan(stats.positive_means['debt_to_equity']) and math.isnan(stats.max_values['debt_to_equity'])
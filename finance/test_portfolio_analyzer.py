@@ -0,0 +1,30 @@
+import pytest
+
+from portfolio_analyzer import load_holdings
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_percent_weights_and_unweighted_lines_share_the_rest(tmp_path):
+    holdings = load_holdings(write(tmp_path, 'holdings.txt', "CRM,0.3\nMSFT 0.2\nJPM\nXOM,10%\n"))
+    assert holdings == pytest.approx({'CRM': 0.3, 'MSFT': 0.2, 'JPM': 0.4, 'XOM': 0.1})
+
+
+def test_unweighted_files_are_held_equally(tmp_path):
+    holdings = load_holdings(write(tmp_path, 'holdings.txt', "CRM\nMSFT\n"))
+    assert holdings == pytest.approx({'CRM': 0.5, 'MSFT': 0.5})
+
+
+def test_blank_csv_weight_gets_the_leftover(tmp_path):
+    holdings = load_holdings(write(tmp_path, 'holdings.csv', "symbol,weight\nCRM,0.5\nMSFT,0.3\nJPM,\n"))
+    assert holdings == pytest.approx({'CRM': 0.5, 'MSFT': 0.3, 'JPM': 0.2})
+
+
+@pytest.mark.parametrize('text', ["CRM,0.6\nMSFT,0.4\nJPM\n", "CRM,nan\nMSFT,0.4\n", "CRM,inf\n", "CRM,abc\n"])
+def test_unusable_weights_are_rejected(tmp_path, text):
+    with pytest.raises(ValueError):
+        load_holdings(write(tmp_path, 'holdings.txt', text))
@@ -0,0 +1,52 @@
+import pytest
+
+from offline_data import OfflineDataSource
+from scoring_model import ScoringModel
+from stock_analyzer import StockCompetitorAnalyzer
+
+PRICE_MODEL = ScoringModel({
+    'name': 'momentum',
+    'terms': [{'metric': 'one_year_return', 'scale': 1, 'min': -50, 'max': 50, 'positive_only': False}]
+})
+
+
+def analyzer_with_peers(scoring_model=None):
+    analyzer = StockCompetitorAnalyzer(data_source=OfflineDataSource(), scoring_model=scoring_model)
+    symbols = ['AAPL', 'MSFT', 'GOOGL']
+    return analyzer, [analyzer.get_stock_info(s) for s in symbols]
+
+
+def test_price_refresh_invalidates_scores_of_price_based_models():
+    analyzer, (main_stock, *peers) = analyzer_with_peers(PRICE_MODEL)
+    analyzer.build_analysis(main_stock, peers)
+
+    # A price refresh that moves the main stock's one-year return
+    hist = analyzer._histories['AAPL'].copy()
+    recent = hist.iloc[-5:].copy()
+    recent['Close'] *= 1.5
+    analyzer._update_prices('AAPL', recent)
+    main_stock = analyzer.cache['AAPL']
+
+    result = analyzer.build_analysis(main_stock, [analyzer.cache[p['symbol']] for p in peers])
+    stats = analyzer.get_peer_stats([main_stock] + peers)
+    assert result['main_stock']['score'] == analyzer.calculate_score(main_stock, stats.means)
+
+
+def test_switching_models_does_not_reuse_scores():
+    analyzer, (main_stock, *peers) = analyzer_with_peers()
+    default_score = analyzer.build_analysis(main_stock, peers)['main_stock']['score']
+
+    analyzer.scoring_model = PRICE_MODEL
+    result = analyzer.build_analysis(main_stock, peers)
+    stats = analyzer.get_peer_stats([main_stock] + peers)
+    assert result['main_stock']['score'] == analyzer.calculate_score(main_stock, stats.means)
+    assert result['main_stock']['score'] != default_score
+
+
+def test_sensitivity_runs_only_when_asked_for():
+    analyzer, (main_stock, *peers) = analyzer_with_peers()
+    assert analyzer.build_analysis(main_stock, peers)['sensitivity'] is None
+
+    sensitivity = analyzer.build_analysis(main_stock, peers, sensitivity=True)['sensitivity']
+    assert sensitivity['samples'] == 5000
+    assert sum(sensitivity['probabilities'].values()) == pytest.approx(1)
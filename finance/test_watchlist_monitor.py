@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from offline_data import OfflineDataSource
+from stock_analyzer import StockCompetitorAnalyzer
+from watchlist_monitor import MAX_REQUEST_COST, RateBudget, WatchlistMonitor
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_budget_holds_the_largest_request_at_low_rates():
+    stop = threading.Event()
+    budget = RateBudget(1.0)
+    assert budget.capacity >= MAX_REQUEST_COST
+    assert budget.acquire(2, stop)
+    assert budget.acquire(MAX_REQUEST_COST - 2, stop)
+
+
+def test_budget_rejects_costs_it_can_never_hold():
+    with pytest.raises(ValueError):
+        RateBudget(1.0).acquire(MAX_REQUEST_COST + 1)
+
+
+def test_monitor_at_default_rate_calls_the_data_source():
+    source = OfflineDataSource()
+    monitor = WatchlistMonitor(StockCompetitorAnalyzer(data_source=source), {'AAPL': 1.0}).start()
+    try:
+        assert wait_for(lambda: source.calls['info'] > 0 and 'AAPL' in monitor.analyzer.cache)
+    finally:
+        monitor.stop()
+
+
+def test_invalid_symbols_are_dropped():
+    source = OfflineDataSource()
+    monitor = WatchlistMonitor(StockCompetitorAnalyzer(data_source=source), {'NOTASYMBOL': 1.0}).start()
+    try:
+        assert wait_for(lambda: 'NOTASYMBOL' not in monitor.importance)
+    finally:
+        monitor.stop()
+    assert 'NOTASYMBOL' not in monitor.groups
+
+
+def test_failing_symbols_back_off():
+    source = OfflineDataSource(failure_rate=1.0)
+    monitor = WatchlistMonitor(StockCompetitorAnalyzer(data_source=source), {'AAPL': 1.0}, refresh_interval=60)
+    monitor._failures['AAPL'] = 1
+    assert monitor._due_time('AAPL') >= time.time() + 59
+    monitor._failures['AAPL'] = 3
+    assert monitor._due_time('AAPL') >= time.time() + 4 * 59
@@ -0,0 +1,332 @@
+import argparse
+import heapq
+import itertools
+import re
+import threading
+import time
+
+import pandas as pd
+
+from stock_analyzer import StockCompetitorAnalyzer
+
+
+# Most requests a single caller spends at once (competitor discovery validates five symbols)
+MAX_REQUEST_COST = 5
+
+# A symbol that keeps failing waits at most this many refresh intervals between retries
+MAX_BACKOFF = 16
+
+
+class RateBudget:
+    """Token bucket shared by all workers: at most `rate` data requests per second on average"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        # The bucket must hold the largest single spend, or that acquire could never succeed
+        self.capacity = max(burst or rate, MAX_REQUEST_COST)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1, stop_event=None):
+        """Block until `cost` requests fit in the budget; returns False if stopped while waiting"""
+        if cost > self.capacity:
+            raise ValueError(f"Cost {cost} exceeds the budget capacity of {self.capacity}")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return True
+                wait = (cost - self.tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def load_watchlist(path):
+    """
+    Read a watchlist file: one symbol per line, optionally followed by an importance weight
+    (e.g. "CRM, 3"). CSV files need a 'symbol' column and may have an 'importance' column.
+    """
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+        df.columns = [c.strip().lower() for c in df.columns]
+        importance = df['importance'] if 'importance' in df.columns else pd.Series(1.0, index=df.index)
+        return {str(s).strip().upper(): float(w) for s, w in zip(df['symbol'], importance) if str(s).strip()}
+
+    watchlist = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = [p for p in re.split(r'[\s,;]+', line.split('#')[0]) if p]
+            if parts:
+                watchlist[parts[0].upper()] = float(parts[1]) if len(parts) > 1 else 1.0
+    return watchlist
+
+
+class WatchlistMonitor:
+    """
+    Keeps a watchlist warm in the background.
+
+    Symbols wait in a priority queue ordered by when they become due, where a symbol
+    is due once its data age exceeds the refresh interval divided by its importance.
+    Worker threads refresh due symbols within a global request budget and re-score
+    every peer group the new data belongs to, so readers only ever hit the warm store.
+    """
+
+    def __init__(self, analyzer=None, watchlist=None, requests_per_minute=60, workers=4,
+                 refresh_interval=None, batch_size=10):
+        """
+        Args:
+            analyzer (StockCompetitorAnalyzer): Shared analyzer whose caches are kept warm
+            watchlist (dict): symbol -> importance (higher refreshes more often)
+            requests_per_minute (float): Global data request budget
+            workers (int): Background refresh threads
+            refresh_interval (float): Seconds between refreshes at importance 1 (default: price TTL)
+            batch_size (int): Max symbols whose prices are refreshed in one batched request
+        """
+        self.analyzer = analyzer or StockCompetitorAnalyzer()
+        self.budget = RateBudget(requests_per_minute / 60.0)
+        self.workers = workers
+        self.refresh_interval = refresh_interval or self.analyzer.price_ttl
+        self.batch_size = batch_size
+
+        self.importance = {}
+        self.results = {}
+        self.groups = {}
+        self._members = {}
+        self._failures = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+        for symbol, importance in (watchlist or {}).items():
+            self.add(symbol, importance)
+
+    def add(self, symbol, importance=1.0):
+        """Start watching a symbol (or change its importance)"""
+        symbol = symbol.upper()
+        with self._cond:
+            is_new = symbol not in self.importance
+            self.importance[symbol] = max(float(importance), 1e-6)
+            if is_new:
+                self.groups.setdefault(symbol, None)
+                self._push(symbol)
+            self._cond.notify()
+
+    def _watch_peer(self, symbol, importance):
+        """Keep a competitor of a watched symbol fresh at least as often as its owner"""
+        with self._cond:
+            if symbol not in self.importance:
+                self.importance[symbol] = importance
+                self._push(symbol)
+                self._cond.notify()
+            elif importance > self.importance[symbol]:
+                self.importance[symbol] = importance
+
+    def _due_time(self, symbol):
+        failures = self._failures.get(symbol, 0)
+        if failures:
+            # Back off a failing symbol so it does not use up the budget of the others
+            return time.time() + self.refresh_interval * min(2 ** (failures - 1), MAX_BACKOFF)
+        price_age, _ = self.analyzer.data_age(symbol)
+        if price_age is None:
+            return time.time() - self.importance[symbol]  # never fetched: most important first
+        return time.time() - price_age + self.refresh_interval / self.importance[symbol]
+
+    def _push(self, symbol):
+        heapq.heappush(self._heap, (self._due_time(symbol), next(self._counter), symbol))
+
+    def _is_invalid(self, symbol):
+        validated = self.analyzer._validated.get(symbol)
+        return validated is not None and not validated[0]
+
+    def _drop(self, symbol):
+        """Stop watching a symbol the data source reports as invalid"""
+        print(f"⚠️ Dropping {symbol} from the watchlist: not a valid equity symbol")
+        self.importance.pop(symbol, None)
+        self.groups.pop(symbol, None)
+        self.results.pop(symbol, None)
+        self._failures.pop(symbol, None)
+
+    def start(self):
+        """Start the background refresh workers"""
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"watchlist-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the workers and wait for them to finish their current refresh"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _next_batch(self):
+        """Wait for due symbols and pop up to batch_size of them"""
+        with self._cond:
+            while not self._stop.is_set():
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    batch = []
+                    while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                        batch.append(heapq.heappop(self._heap)[2])
+                    return batch
+                self._cond.wait(timeout=(self._heap[0][0] - now) if self._heap else None)
+        return []
+
+    def _worker(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._refresh(batch)
+            except Exception as e:
+                print(f"Error refreshing {', '.join(batch)}: {str(e)}")
+            finally:
+                with self._cond:
+                    for symbol in batch:
+                        if self._is_invalid(symbol):
+                            self._drop(symbol)
+                        else:
+                            self._push(symbol)
+                    self._cond.notify()
+
+    def _refresh(self, batch):
+        """Refresh a batch: known symbols share one price request, new ones get a full fetch"""
+        price_only = [s for s in batch if s in self.analyzer.cache
+                      and self.analyzer.data_age(s)[1] is not None
+                      and self.analyzer.data_age(s)[1] < self.analyzer.fundamentals_ttl]
+        full = [s for s in batch if s not in price_only]
+
+        updated = []
+        attempted = []
+        try:
+            if price_only and self.budget.acquire(1, self._stop):
+                attempted.extend(price_only)
+                for symbol in price_only:
+                    self.analyzer.expire_prices(symbol)
+                updated.extend(self.analyzer.refresh_prices(price_only))
+
+            for symbol in full:
+                if not self.budget.acquire(2, self._stop):
+                    break
+                attempted.append(symbol)
+                if self.analyzer.get_stock_info(symbol):
+                    updated.append(symbol)
+        finally:
+            # Consecutive failures per symbol drive the retry backoff in _due_time
+            with self._cond:
+                for symbol in attempted:
+                    if symbol in updated:
+                        self._failures.pop(symbol, None)
+                    else:
+                        self._failures[symbol] = self._failures.get(symbol, 0) + 1
+
+        for symbol in updated:
+            if symbol in self.groups and self.groups[symbol] is None:
+                self._discover_peers(symbol)
+        self._rescore({owner for symbol in updated for owner in self._members.get(symbol, ())} |
+                      {symbol for symbol in updated if symbol in self.groups})
+
+    def _discover_peers(self, symbol):
+        """Find a watched symbol's competitors once and start watching them too"""
+        stock = self.analyzer.cache.get(symbol)
+        if not stock or not self.budget.acquire(5, self._stop):
+            return
+        peers = self.analyzer.find_industry_competitors(stock)
+        with self._cond:
+            self.groups[symbol] = peers
+            for member in [symbol] + peers:
+                self._members.setdefault(member, set()).add(symbol)
+        for peer in peers:
+            self._watch_peer(peer, self.importance[symbol])
+
+    def _rescore(self, owners):
+        """Rebuild the stored analysis of every peer group whose data is all cached"""
+        for owner in owners:
+            peers = self.groups.get(owner)
+            main_stock = self.analyzer.cache.get(owner)
+            if not peers or not main_stock:
+                continue
+            competitor_data = [self.analyzer.cache[p] for p in peers if p in self.analyzer.cache]
+            if competitor_data:
+                result = self.analyzer.build_analysis(main_stock, competitor_data)
+                result['refreshed_at'] = time.time()
+                self.results[owner] = result
+
+    def get_analysis(self, symbol):
+        """Latest warm analysis for a watched symbol, or None (never touches the network)"""
+        return self.results.get(symbol.upper())
+
+    def snapshot(self):
+        """One row per watched symbol with its latest score and data age"""
+        rows = []
+        for symbol in sorted(self.groups):
+            result = self.results.get(symbol)
+            price_age, fundamentals_age = self.analyzer.data_age(symbol)
+            main_stock = result['main_stock'] if result else {}
+            rows.append({
+                'symbol': symbol,
+                'importance': self.importance.get(symbol),
+                'price': main_stock.get('current_price'),
+                'score': main_stock.get('score'),
+                'recommendation': main_stock.get('recommendation_data', {}).get('recommendation'),
+                'price_age_s': price_age,
+                'fundamentals_age_s': fundamentals_age
+            })
+        return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a watchlist fresh in the background")
+    parser.add_argument('watchlist', help="Watchlist file (SYMBOL[,importance] per line, or CSV)")
+    parser.add_argument('--offline', action='store_true', help="Use synthetic offline data instead of Yahoo Finance")
+    parser.add_argument('--rpm', type=float, default=60, help="Global data requests per minute")
+    parser.add_argument('--workers', type=int, default=4, help="Background refresh threads")
+    parser.add_argument('--interval', type=float, default=None, help="Refresh interval at importance 1 (seconds)")
+    parser.add_argument('--report-every', type=float, default=30, help="Seconds between console reports")
+    parser.add_argument('--gui', action='store_true', help="Open the GUI backed by the warm store")
+    args = parser.parse_args()
+
+    data_source = None
+    if args.offline:
+        from offline_data import OfflineDataSource
+        data_source = OfflineDataSource()
+
+    analyzer = StockCompetitorAnalyzer(data_source=data_source)
+    monitor = WatchlistMonitor(analyzer, load_watchlist(args.watchlist), requests_per_minute=args.rpm,
+                               workers=args.workers, refresh_interval=args.interval).start()
+    print(f"👀 Watching {len(monitor.groups)} symbols ({args.rpm:.0f} requests/min budget)")
+
+    try:
+        if args.gui:
+            from stock_analyzer import ModernStockAnalyzerGUI
+            ModernStockAnalyzerGUI(analyzer=analyzer, monitor=monitor).run()
+        else:
+            while True:
+                time.sleep(args.report_every)
+                print("\n" + "=" * 90)
+                print(f"📋 WATCHLIST @ {time.strftime('%H:%M:%S')}")
+                print("=" * 90)
+                print(monitor.snapshot().to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    except KeyboardInterrupt:
+        print("\n👋 Stopping watchlist monitor...")
+    finally:
+        monitor.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,161 +1,102 @@
+import argparse
 import os
-import pandas as pd
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-import tkinter as tk
-from tkinter import simpledialog, messagebox
-
-# Function to process and generate the graph based on user input
-def process_and_plot(period_days):
-    # Get the directory where the script is located
-    script_directory = os.path.dirname(os.path.abspath(__file__))
-
-    # Define the path to the "sales" folder within the same directory
-    sales_directory = os.path.join(script_directory, 'sales')
-
-    # Get all CSV files in the "sales" directory that match the naming pattern "sales-YYYY-MM.csv"
-    files = [f for f in os.listdir(sales_directory) if f.startswith('sales-') and f.endswith('.csv')]
-
-    # Initialize an empty list to store data
-    all_data = []
-
-    # Load all the files and append them to the list
-    for file in files:
-        file_path = os.path.join(sales_directory, file)
-        data = pd.read_csv(file_path)
-        
-        # Extract year-month from filename (e.g., "sales-2024-03.csv" -> "2024-03")
-        file_month = file.replace('sales-', '').replace('.csv', '')
-        data['File_Month'] = file_month
-        
-        all_data.append(data)
-
-    # Concatenate all data into one DataFrame
-    sales_data = pd.concat(all_data, ignore_index=True)
-
-    # Convert the "Date" column to datetime and ensure clean data
-    sales_data['Date'] = pd.to_datetime(sales_data['Date'], errors='coerce')
-
-    # Filter out rows where the 'Date' is invalid
-    sales_data = sales_data.dropna(subset=['Date'])
-
-    # Add a column for the count of items (each row represents one item)
-    sales_data['Item Count'] = 1
-
-    # Separate refunded and non-refunded items
-    refunded_data = sales_data[sales_data['Status'].str.contains('Refunded', case=False, na=False)]
-    non_refunded_data = sales_data[~sales_data['Status'].str.contains('Refunded', case=False, na=False)]
-
-    # Determine the resampling period
-    if period_days == 0:
-        # Group by the CSV file month instead of calendar month
-        period_label = "Monthly (by File)"
-        bar_width = 15
-        
-        # Group by File_Month for non-refunded items
-        grouped_data = non_refunded_data.groupby('File_Month').agg({
-            'Income EUR': 'sum',
-            'Item Count': 'sum',
-            'Date': 'min'  # Use the earliest date in each file as the x-axis point
-        }).reset_index()
-        
-        # Group by File_Month for refunded items
-        grouped_refunded_data = refunded_data.groupby('File_Month').agg({
-            'Income EUR': 'sum',
-            'Item Count': 'sum',
-            'Date': 'min'
-        }).reset_index()
-        
-        # Calculate days in each file's month for average
-        grouped_data['Days_in_Period'] = grouped_data['File_Month'].apply(
-            lambda x: pd.Period(x).days_in_month
-        )
-        grouped_data['Avg Daily Income EUR'] = grouped_data['Income EUR'] / grouped_data['Days_in_Period']
-        
-    else:
-        resample_period = f'{period_days}D'
-        period_label = f"Every {period_days} Days"
-        bar_width = max(1, period_days // 2)
-
-        # Group data by the selected period for non-refunded items
-        grouped_data = non_refunded_data.resample(resample_period, on='Date').agg({
-            'Income EUR': 'sum',
-            'Item Count': 'sum'
-        }).reset_index()
-
-        # Group data by the selected period for refunded items
-        grouped_refunded_data = refunded_data.resample(resample_period, on='Date').agg({
-            'Income EUR': 'sum',
-            'Item Count': 'sum'
-        }).reset_index()
-
-        # Calculate the daily average income per period
-        grouped_data['Avg Daily Income EUR'] = grouped_data['Income EUR'] / period_days
-
-    # Sort by date to ensure proper plotting
-    grouped_data = grouped_data.sort_values('Date')
-    grouped_refunded_data = grouped_refunded_data.sort_values('Date')
-
-    # Plot the data
-    plt.figure(figsize=(12, 6))
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+from sales_aggregation import aggregate_periods, aggregate_sales, bar_width, period_label, rebucket, stream_daily_rollup
+from sales_loader import GRAPH_COLUMNS, iter_sales_chunks, load_sales
+from sales_store import SalesStore
+
+# Function to get the width of the plotting area in pixels
+def axis_width_px(ax):
+    fig = ax.figure
+    return fig.get_figwidth() * fig.dpi * ax.get_position().width
+
+# Function to pick which buckets get value labels: all of them when they fit the axis width,
+# otherwise every n-th one counted back from the latest bucket
+def label_positions(ax, count, label_width_px=60):
+    step = max(1, -(-count * label_width_px // int(axis_width_px(ax))))
+    return np.arange(count - 1, -1, -step)[::-1]
+
+# Function to draw a bar series; when bars would be a couple of pixels wide they are drawn as
+# one collection instead of one patch per bucket, which looks the same and renders in constant time
+def draw_bars(ax, dates, heights, width, **style):
+    if len(dates) <= axis_width_px(ax) / 2:
+        return ax.bar(dates, heights, width=width, **style)
+    ax.xaxis.update_units(dates)
+    x = mdates.date2num(dates.to_numpy())
+    top = heights.to_numpy(dtype=float)
+    bottom = np.zeros_like(top)
+    left, right = x - width / 2, x + width / 2
+    bars = PolyCollection(np.stack([np.column_stack(corner) for corner in
+                                    [(left, bottom), (left, top), (right, top), (right, bottom)]], axis=1),
+                          facecolors=style.pop('color'), linewidths=0, **style)
+    bars.sticky_edges.y.append(0)
+    ax.add_collection(bars)
+    return bars
+
+# Function to write one series' value labels at the given positions
+def annotate_points(ax, dates, values, positions, fmt, **style):
+    for x, y in zip(dates.iloc[positions], values.iloc[positions]):
+        ax.text(x, y, fmt.format(y), fontsize=10, va='bottom', **style)
+
+# Function to draw the income / items sold / average daily income chart for one period view
+def plot_sales(grouped_data, grouped_refunded_data, period_days):
+    width = bar_width(period_days)
+    fig, ax = plt.subplots(figsize=(12, 6))
 
     # Non-refunded income (bar)
-    plt.bar(grouped_data['Date'], grouped_data['Income EUR'], label='Income EUR (Non-Refunded)', 
-            color='orange', alpha=0.7, width=bar_width)
+    draw_bars(ax, grouped_data['Date'], grouped_data['Income EUR'], width, label='Income EUR (Non-Refunded)',
+              color='orange', alpha=0.7)
 
     # Items Sold (line with markers)
-    plt.plot(grouped_data['Date'], grouped_data['Item Count'], label='Items Sold (Non-Refunded)', 
-             color='blue', marker='o', linestyle='-')
+    ax.plot(grouped_data['Date'], grouped_data['Item Count'], label='Items Sold (Non-Refunded)',
+            color='blue', marker='o', linestyle='-')
 
     # Avg Daily Income (dashed line with labels)
-    plt.plot(grouped_data['Date'], grouped_data['Avg Daily Income EUR'], label='Avg Daily Income EUR', 
-             color='green', linestyle='--', marker='x')
-
-    # Annotate Avg Daily Income
-    for i, row in grouped_data.iterrows():
-        plt.text(row['Date'], row['Avg Daily Income EUR'], 
-                 f"{row['Avg Daily Income EUR']:.2f}", 
-                 fontsize=10, color='green', ha='left', va='bottom')
-
-    # Annotate Income EUR on top of bar
-    for i, row in grouped_data.iterrows():
-        plt.text(row['Date'], row['Income EUR'], 
-                 f"{row['Income EUR']:.0f}€", 
-                 fontsize=10, color='darkorange', ha='center', va='bottom')
-
-    # Annotate Items Sold next to dot
-    for i, row in grouped_data.iterrows():
-        plt.text(row['Date'], row['Item Count'], 
-                 f"{int(row['Item Count'])}", 
-                 fontsize=10, color='blue', ha='center', va='bottom')
+    ax.plot(grouped_data['Date'], grouped_data['Avg Daily Income EUR'], label='Avg Daily Income EUR',
+            color='green', linestyle='--', marker='x')
+
+    # Value labels, thinned so they stay legible however many buckets there are
+    shown = label_positions(ax, len(grouped_data))
+    annotate_points(ax, grouped_data['Date'], grouped_data['Avg Daily Income EUR'], shown, '{:.2f}',
+                    color='green', ha='left')
+    annotate_points(ax, grouped_data['Date'], grouped_data['Income EUR'], shown, '{:.0f}€',
+                    color='darkorange', ha='center')
+    annotate_points(ax, grouped_data['Date'], grouped_data['Item Count'], shown, '{:.0f}',
+                    color='blue', ha='center')
 
     # Refunded income (red bars) - only if there's refunded data
     if not grouped_refunded_data.empty:
-        plt.bar(grouped_refunded_data['Date'], grouped_refunded_data['Income EUR'], 
-                label='Refunded Income EUR', color='red', alpha=0.5, width=bar_width)
+        draw_bars(ax, grouped_refunded_data['Date'], grouped_refunded_data['Income EUR'], width,
+                  label='Refunded Income EUR', color='red', alpha=0.5)
 
         # Refunded items (purple line)
-        plt.plot(grouped_refunded_data['Date'], grouped_refunded_data['Item Count'], 
-                 label='Refunded Items', color='purple', marker='s', linestyle='-')
+        ax.plot(grouped_refunded_data['Date'], grouped_refunded_data['Item Count'],
+                label='Refunded Items', color='purple', marker='s', linestyle='-')
 
     # Formatting the graph
-    plt.title(f'Income, Items Sold, and Average Daily Income ({period_label})', fontsize=16)
-    plt.xlabel('Date', fontsize=12)
-    plt.ylabel('Amount', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.legend()
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-
-    # Show the graph
-    plt.show()
-
+    ax.set_title(f'Income, Items Sold, and Average Daily Income ({period_label(period_days)})', fontsize=16)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Amount', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    # Searching for the emptiest corner is slow with thousands of points
+    ax.legend(loc='best' if len(shown) == len(grouped_data) else 'upper left')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    return fig
+
+# Function to print the grouped tables of one period view
+def print_sales_tables(grouped_data, grouped_refunded_data, period_days):
     # Display the updated data with the daily average income
     print("Non-refunded data:")
     if period_days == 0:
         print(grouped_data[['File_Month', 'Date', 'Income EUR', 'Item Count', 'Avg Daily Income EUR']])
     else:
         print(grouped_data[['Date', 'Income EUR', 'Item Count', 'Avg Daily Income EUR']])
-    
+
     if not grouped_refunded_data.empty:
         print("\nRefunded data:")
         if period_days == 0:
@@ -163,8 +104,38 @@ def process_and_plot(period_days):
         else:
             print(grouped_refunded_data[['Date', 'Income EUR', 'Item Count']])
 
+# Function to process and generate the graph based on user input
+def process_and_plot(period_days, sales_data=None):
+    # Load every monthly export (months parsed before come from the cache)
+    if sales_data is None:
+        sales_data = load_sales(columns=GRAPH_COLUMNS)
+
+    grouped_data, grouped_refunded_data = aggregate_sales(sales_data, period_days)
+
+    # Show the graph, then the tables behind it
+    plot_sales(grouped_data, grouped_refunded_data, period_days)
+    plt.show()
+    print_sales_tables(grouped_data, grouped_refunded_data, period_days)
+
+# Function to write one period view's tables (CSV) and chart (PNG) to a folder
+def write_period_view(grouped_data, grouped_refunded_data, period_days, output_dir, chart=True):
+    name = 'monthly' if period_days == 0 else f'{period_days}d'
+    paths = [os.path.join(output_dir, f'sales-{name}.csv'), os.path.join(output_dir, f'refunds-{name}.csv')]
+    grouped_data.to_csv(paths[0], index=False)
+    grouped_refunded_data.to_csv(paths[1], index=False)
+    if chart:
+        fig = plot_sales(grouped_data, grouped_refunded_data, period_days)
+        paths.append(os.path.join(output_dir, f'sales-{name}.png'))
+        fig.savefig(paths[-1], dpi=120)
+        plt.close(fig)
+    return paths
+
 # Function to show the input dialog for period days
 def get_period_from_user():
+    # Tkinter is only needed for the dialog, so the --period path runs without it
+    import tkinter as tk
+    from tkinter import simpledialog, messagebox
+
     # Create a simple Tkinter window
     root = tk.Tk()
     root.withdraw()  # Hide the root window
@@ -181,5 +152,65 @@ def get_period_from_user():
         # Show a message if no valid input was provided
         messagebox.showwarning("Invalid Input", "Please enter a valid number of days.")
 
-# Run the GUI to get user input and process the data
-get_period_from_user()
+# Function to parse a --period value (whole days, 0 or more)
+def period_days_arg(value):
+    try:
+        days = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of days: {value!r}")
+    if days < 0:
+        raise argparse.ArgumentTypeError(f"days per period must be 0 or more, got {days}")
+    return days
+
+# Without arguments the period is asked for in a dialog; with --period the views are
+# computed from a single load and shown, or written to --output without any GUI
+def main():
+    parser = argparse.ArgumentParser(description="Income and items sold per period from the monthly sales exports")
+    parser.add_argument('--period', type=period_days_arg, nargs='+', metavar='DAYS',
+                        help="Days per period (0 = by export file); several values give several views")
+    parser.add_argument('--sales-dir', help="Folder with sales-YYYY-MM.csv files (default: sales/)")
+    parser.add_argument('--output', help="Write CSV tables and PNG charts here instead of showing them")
+    parser.add_argument('--no-charts', action='store_true', help="With --output, write the tables only")
+    parser.add_argument('--no-cache', action='store_true', help="Re-parse every export instead of using cache/")
+    parser.add_argument('--stream', action='store_true',
+                        help="Read the exports in chunks instead of loading every row (bounded memory, no cache)")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Rows per chunk with --stream")
+    parser.add_argument('--store', action='store_true',
+                        help="Ingest new or changed exports into sales.db and query it instead of the CSVs")
+    args = parser.parse_args()
+
+    if args.period is None:
+        get_period_from_user()
+        return
+
+    if args.store:
+        store = SalesStore()
+        store.ingest(args.sales_dir)
+        rollup = store.daily_rollup()
+        store.close()
+        views = {period_days: rebucket(rollup, period_days) for period_days in args.period}
+    elif args.stream:
+        rollup = stream_daily_rollup(iter_sales_chunks(args.sales_dir, GRAPH_COLUMNS, args.chunk_size))
+        views = {period_days: rebucket(rollup, period_days) for period_days in args.period}
+    else:
+        sales_data = load_sales(args.sales_dir, cache=False if args.no_cache else None, columns=GRAPH_COLUMNS)
+        views = aggregate_periods(sales_data, args.period)
+
+    if args.output:
+        plt.switch_backend('Agg')
+        os.makedirs(args.output, exist_ok=True)
+
+    for period_days, (grouped_data, grouped_refunded_data) in views.items():
+        if args.output:
+            for path in write_period_view(grouped_data, grouped_refunded_data, period_days, args.output,
+                                          chart=not args.no_charts):
+                print(f"Saved {path}")
+        else:
+            plot_sales(grouped_data, grouped_refunded_data, period_days)
+            plt.show()
+            print(f"\n=== {period_label(period_days)} ===")
+            print_sales_tables(grouped_data, grouped_refunded_data, period_days)
+
+# Run the GUI or the CLI (guarded so the module can be imported, e.g. by loader worker processes)
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,115 @@
+import argparse
+import os
+import re
+
 import pandas as pd
 
-# Load the Excel file
-file_path = 'creations-2024-12-10.csv'
-df = pd.read_csv(file_path)
+from sales_aggregation import daily_rollup
+from sales_loader import SCRIPT_DIRECTORY, SalesCache, load_sales
+from sales_store import SalesStore
+
+# "creations-2024-12-10.csv" -> "2024-12-10" (Cults creations export, lifetime counts per design)
+CREATIONS_FILE_PATTERN = re.compile(r'^creations-(\d{4}-\d{2}-\d{2})\.csv$')
+
+# Columns the creations export must have
+CREATIONS_COLUMNS = ['Design', 'Views', 'Total']
+
+# Ranking metric -> (export it comes from, column, tie-breaking column)
+METRICS = {
+    'total': ('creations', 'Total', 'Views'),
+    'views': ('creations', 'Views', 'Total'),
+    'income': ('sales', 'Income EUR', 'Item Count'),
+    'items': ('sales', 'Item Count', 'Income EUR')
+}
+
+# Function to list every creations-YYYY-MM-DD.csv in a folder as (export date, path), oldest first
+def list_creations_files(creations_directory):
+    files = []
+    for name in os.listdir(creations_directory):
+        match = CREATIONS_FILE_PATTERN.match(name)
+        if match:
+            files.append((pd.Timestamp(match.group(1)), os.path.join(creations_directory, name)))
+    return sorted(files)
+
+# Function to pick the newest creations export dated inside the window (its counts are lifetime totals)
+def latest_creations_file(creations_directory, start=None, end=None):
+    files = [(date, path) for date, path in list_creations_files(creations_directory)
+             if (start is None or date >= start) and (end is None or date <= end)]
+    if not files:
+        raise FileNotFoundError(f"No creations-YYYY-MM-DD.csv export in {creations_directory} for the chosen dates")
+    return files[-1][1]
+
+# Function to rank designs of a creations export by Total or Views (ties broken by the other one)
+def top_from_creations(path, metric, k=10):
+    _, column, tie_breaker = METRICS[metric]
+    df = pd.read_csv(path, usecols=lambda c: c in CREATIONS_COLUMNS)
+
+    # Check if necessary columns exist
+    if not all(col in df.columns for col in CREATIONS_COLUMNS):
+        raise ValueError(f"Missing one of the required columns: {', '.join(CREATIONS_COLUMNS)}")
+
+    # Partial selection of the k best rows instead of sorting the whole export
+    return df.nlargest(k, [column, tie_breaker])[CREATIONS_COLUMNS].reset_index(drop=True)
+
+# Function to rank designs by non-refunded income or items sold over the monthly sales exports
+def top_from_sales(sales_data, metric, k=10, start=None, end=None):
+    _, column, tie_breaker = METRICS[metric]
+
+    # Per day and design first, so the date window filters a small table
+    rollup = daily_rollup(sales_data, by=['Design'])
+    in_window = ~rollup['Refunded']
+    if start is not None:
+        in_window &= rollup['Date'] >= start
+    if end is not None:
+        in_window &= rollup['Date'] <= end
+
+    per_design = rollup[in_window].groupby('Design', observed=True)[['Income EUR', 'Item Count']].sum()
+    return per_design.nlargest(k, [column, tie_breaker]).reset_index()
+
+# Function to rank designs by any metric over the exports in the given folders and dates
+# (sales metrics are queried from a SalesStore when one is given; cache is passed on to load_sales)
+def top_designs(metric='total', k=10, start=None, end=None, creations_directory=None, sales_directory=None,
+                store=None, cache=None):
+    source, column, tie_breaker = METRICS[metric]
+    if source == 'creations':
+        return top_from_creations(latest_creations_file(creations_directory or SCRIPT_DIRECTORY, start, end), metric, k)
+    if store is not None:
+        return store.top_designs(column, tie_breaker, k, start, end)
+    sales_data = load_sales(sales_directory, cache=cache, columns=['Date', 'Design', 'Income EUR', 'Status'])
+    return top_from_sales(sales_data, metric, k, start, end)
 
-# Check if necessary columns exist
-required_columns = ['Design', 'Views', 'Total']
-if not all(col in df.columns for col in required_columns):
-    raise ValueError(f"Missing one of the required columns: {', '.join(required_columns)}")
+def main():
+    parser = argparse.ArgumentParser(description="Top designs by sales, views or income")
+    parser.add_argument('--top', type=int, default=10, metavar='K', help="Number of designs to list")
+    parser.add_argument('--metric', choices=list(METRICS), default='total',
+                        help="total/views come from the creations export, income/items from the monthly sales")
+    parser.add_argument('--from', dest='start', type=pd.Timestamp, metavar='YYYY-MM-DD',
+                        help="First day of the window")
+    parser.add_argument('--to', dest='end', type=pd.Timestamp, metavar='YYYY-MM-DD',
+                        help="Last day of the window (for total/views: newest creations export up to this day)")
+    parser.add_argument('--creations-dir', help="Folder with creations-YYYY-MM-DD.csv exports (default: next to this script)")
+    parser.add_argument('--sales-dir', help="Folder with sales-YYYY-MM.csv files (default: sales/)")
+    parser.add_argument('--store', action='store_true',
+                        help="For income/items: ingest new or changed exports into sales.db and query it")
+    parser.add_argument('--no-cache', action='store_true', help="Re-parse every export instead of using cache/")
+    parser.add_argument('--cache-dir', help="Folder for parsed months (default: cache/ next to this script)")
+    parser.add_argument('--output', help="CSV to save the ranking to (default: top_K_sellable_items.csv)")
+    args = parser.parse_args()
 
-# Sort by 'Total' first, then by 'Views' in case of ties
-df_sorted = df.sort_values(by=['Total', 'Views'], ascending=[False, False])
+    store = None
+    if args.store and METRICS[args.metric][0] == 'sales':
+        store = SalesStore()
+        store.ingest(args.sales_dir)
+    cache = False if args.no_cache else (SalesCache(args.cache_dir) if args.cache_dir else None)
+    top = top_designs(args.metric, args.top, args.start, args.end, args.creations_dir, args.sales_dir, store, cache)
 
-# Get the top 10 sellable items
-top_10 = df_sorted.head(10)
+    # Display the results in a table format
+    print(top)
 
-# Display the results in a table format
-print(top_10[['Design', 'Views', 'Total']])
+    # Save the result to a new CSV
+    output = args.output or f'top_{args.top}_sellable_items.csv'
+    top.to_csv(output, index=False)
+    print(f"Saved {output}")
 
-# Optionally, save the result to a new CSV
-top_10.to_csv('top_10_sellable_items.csv', index=False)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import pandas as pd
+
+from sales_loader import concat_months
+
+# Summed per bucket for both the non-refunded and the refunded rows
+SUM_COLUMNS = {'Income EUR': 'sum', 'Item Count': 'sum'}
+
+# A daily rollup has one row per file month, day and refund flag (plus any extra columns)
+ROLLUP_KEYS = ['File_Month', 'Date', 'Refunded']
+
+
+def period_label(period_days):
+    """Chart title suffix for a period (0 = one bucket per export file)"""
+    return "Monthly (by File)" if period_days == 0 else f"Every {period_days} Days"
+
+
+def bar_width(period_days):
+    """Bar width in days for a period"""
+    return 15 if period_days == 0 else max(1, period_days // 2)
+
+
+def refund_mask(sales):
+    """True for rows whose Status marks them as refunded"""
+    return sales['Status'].str.contains('Refunded', case=False, na=False).astype(bool)
+
+
+def daily_rollup(sales, by=None):
+    """
+    Income and items sold per file month, day and refund flag (optionally also per
+    extra columns such as Design or Buyer country). Every period view is a
+    re-bucketing of this table, which has at most a few rows per day however many
+    sales there are.
+
+    Args:
+        sales (DataFrame): Rows from sales_loader.load_sales (Date, Income EUR, Status,
+                           File_Month and Item Count are needed, plus the `by` columns)
+        by (list): Extra columns to keep in the rollup, e.g. ['Design', 'Buyer country']
+
+    Returns:
+        DataFrame: File_Month, Date (midnight), Refunded, the `by` columns, Income EUR, Item Count
+    """
+    by = list(by or [])
+    # Amounts are stored as float32; upcast to float64 and round to cents before summing
+    frame = pd.DataFrame({
+        'File_Month': sales['File_Month'],
+        'Date': sales['Date'].dt.normalize(),
+        'Refunded': refund_mask(sales),
+        'Income EUR': sales['Income EUR'].astype('float64').round(2),
+        'Item Count': sales['Item Count']
+    })
+    for column in by:
+        frame[column] = sales[column]
+    return frame.groupby(ROLLUP_KEYS + by, observed=True, dropna=False).agg(SUM_COLUMNS).reset_index()
+
+
+def stream_daily_rollup(chunks, by=None):
+    """
+    daily_rollup over a stream of sales frames (e.g. sales_loader.iter_sales_chunks).
+    Each chunk is rolled up and merged into the running totals, so memory stays
+    bounded by one chunk plus the rollup itself.
+    """
+    by = list(by or [])
+    rollup = None
+    for chunk in chunks:
+        partial = daily_rollup(chunk, by)
+        if rollup is not None:
+            merged = concat_months([rollup, partial])
+            partial = merged.groupby(ROLLUP_KEYS + by, observed=True, dropna=False).agg(SUM_COLUMNS).reset_index()
+        rollup = partial
+    if rollup is None:
+        raise ValueError("No sales rows to roll up")
+    return rollup
+
+
+def rebucket(rollup, period_days):
+    """
+    One period view from a daily rollup, split into non-refunded and refunded rows.
+
+    Extra rollup columns (Design, Buyer country, ...) are summed over; filter the
+    rollup first to chart a single design or country.
+
+    Args:
+        rollup (DataFrame): Table from daily_rollup
+        period_days (int): Days per bucket, or 0 for one bucket per export file
+
+    Returns:
+        tuple: (grouped_data, grouped_refunded_data), both sorted by Date. grouped_data
+               also has Avg Daily Income EUR (and File_Month / Days_in_Period for period 0).
+    """
+    refunded = rollup['Refunded'].to_numpy()
+    non_refunded_data = rollup[~refunded]
+    refunded_data = rollup[refunded]
+
+    if period_days == 0:
+        # Group by the CSV file month, using the earliest date in each file as the x-axis point
+        by_file = dict(SUM_COLUMNS, Date='min')
+        grouped_data = non_refunded_data.groupby('File_Month', observed=True).agg(by_file).reset_index()
+        grouped_refunded_data = refunded_data.groupby('File_Month', observed=True).agg(by_file).reset_index()
+
+        # Average over the days in each file's month
+        months = grouped_data['File_Month'].astype(str)
+        grouped_data['Days_in_Period'] = pd.PeriodIndex(months, freq='M').days_in_month.to_numpy()
+        grouped_data['Avg Daily Income EUR'] = grouped_data['Income EUR'] / grouped_data['Days_in_Period']
+    else:
+        resample_period = f'{period_days}D'
+        grouped_data = non_refunded_data.resample(resample_period, on='Date').agg(SUM_COLUMNS).reset_index()
+        grouped_refunded_data = refunded_data.resample(resample_period, on='Date').agg(SUM_COLUMNS).reset_index()
+        grouped_data['Avg Daily Income EUR'] = grouped_data['Income EUR'] / period_days
+
+    return grouped_data.sort_values('Date'), grouped_refunded_data.sort_values('Date')
+
+
+def aggregate_sales(sales, period_days):
+    """Income and items sold per period of raw sales rows (see rebucket for the result)"""
+    return rebucket(daily_rollup(sales), period_days)
+
+
+def aggregate_periods(sales, periods):
+    """Several period views from one rollup: period_days -> (grouped_data, grouped_refunded_data)"""
+    rollup = daily_rollup(sales)
+    return {period_days: rebucket(rollup, period_days) for period_days in periods}
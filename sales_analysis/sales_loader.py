@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Monthly Cults exports live in "sales/"; parsed months are cached in "cache/"
+DEFAULT_SALES_DIR = os.path.join(SCRIPT_DIRECTORY, 'sales')
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIRECTORY, 'cache')
+
+# "sales-2024-03.csv" -> "2024-03"
+SALES_FILE_PATTERN = re.compile(r'^sales-(\d{4}-\d{2})\.csv$')
+
+# Bump whenever parse_sales_file changes what it returns, so stale cache entries are re-parsed
+CACHE_VERSION = 2
+
+# Column -> type of the Cults sales export. 'percent' columns hold strings like "23%"
+# and are stored as numbers (23.0); repeated labels are categoricals.
+SALES_SCHEMA = {
+    'Date': 'datetime',
+    'User': 'str',
+    'Buyer country': 'category',
+    'Design': 'category',
+    'Total before tax (EUR)': 'float32',
+    'VAT (%)': 'percent',
+    'VAT base (% of Total before tax)': 'percent',
+    'VAT EUR': 'float32',
+    'Total including VAT EUR': 'float32',
+    'Cults Commission EUR': 'float32',
+    'Income EUR': 'float32',
+    'Total in currency': 'float32',
+    'Currency': 'category',
+    'Status': 'category',
+    'Initial price in currency': 'float32',
+    'Discount': 'percent',
+    'Coupon': 'category'
+}
+
+# What the income graph needs
+GRAPH_COLUMNS = ['Date', 'Income EUR', 'Status']
+
+
+def list_sales_files(sales_directory=None):
+    """(file_month, path) of every sales-YYYY-MM.csv in the folder, oldest month first"""
+    sales_directory = sales_directory or DEFAULT_SALES_DIR
+    files = []
+    for name in os.listdir(sales_directory):
+        match = SALES_FILE_PATTERN.match(name)
+        if match:
+            files.append((match.group(1), os.path.join(sales_directory, name)))
+    return sorted(files)
+
+
+def percent_to_number(values):
+    """Categorical "23%" strings -> float32 23.0 (parsed once per distinct value, not per row)"""
+    categories = values.cat.categories
+    if len(categories) == 0:
+        return pd.Series(np.full(len(values), np.nan, dtype='float32'), index=values.index)
+    numbers = pd.to_numeric(pd.Series(categories.astype(str)).str.rstrip('%').str.strip(), errors='coerce')
+    codes = values.cat.codes.to_numpy()
+    return pd.Series(np.where(codes >= 0, numbers.to_numpy(dtype='float32')[codes], np.nan).astype('float32'),
+                     index=values.index)
+
+
+def _read_options(columns=None):
+    """read_csv arguments for the requested schema columns (Date is always included)"""
+    columns = list(columns or SALES_SCHEMA)
+    unknown = [c for c in columns if c not in SALES_SCHEMA]
+    if unknown:
+        raise ValueError(f"Unknown sales columns: {', '.join(unknown)}")
+    wanted = set(columns) | {'Date'}
+
+    dtypes = {column: 'category' if kind == 'percent' else kind
+              for column, kind in SALES_SCHEMA.items() if column in wanted and kind != 'datetime'}
+    return {'usecols': lambda c: c in wanted, 'dtype': dtypes, 'parse_dates': ['Date'], 'date_format': '%Y-%m-%d'}
+
+
+def _finish_types(data):
+    # Dates in another format are left as text by read_csv; parse the export format in one
+    # vectorised pass and only the stragglers leniently
+    if not pd.api.types.is_datetime64_any_dtype(data['Date']):
+        dates = pd.to_datetime(data['Date'], errors='coerce', format='%Y-%m-%d')
+        stragglers = dates.isna() & data['Date'].notna()
+        if stragglers.any():
+            dates[stragglers] = pd.to_datetime(data['Date'][stragglers], errors='coerce', format='mixed')
+        data['Date'] = dates
+    for column, kind in SALES_SCHEMA.items():
+        if kind == 'percent' and column in data.columns:
+            data[column] = percent_to_number(data[column])
+    return data
+
+
+def read_sales_csv(path, columns=None):
+    """
+    Read a sales export with explicit types: only the requested columns (Date is
+    always included), float32 amounts, categorical labels, dates parsed while
+    reading and VAT/discount percentages as numbers.
+    """
+    return _finish_types(pd.read_csv(path, **_read_options(columns)))
+
+
+def _tag_month(data, file_month):
+    """Valid dates only, tagged with the file month, one item per row"""
+    data = data.dropna(subset=['Date']).reset_index(drop=True)
+    data['File_Month'] = pd.Categorical.from_codes(np.zeros(len(data), dtype='int8'), [file_month])
+    data['Item Count'] = np.ones(len(data), dtype='int32')
+    return data
+
+
+def parse_sales_file(path, file_month, columns=None):
+    """Read one monthly export: valid dates only, tagged with its file month, one item per row"""
+    return _tag_month(read_sales_csv(path, columns), file_month)
+
+
+def iter_sales_chunks(sales_directory=None, columns=None, chunksize=100_000):
+    """
+    Every monthly export as a stream of typed frames of at most `chunksize` rows,
+    in file-month order, shaped like parse_sales_file's output. Nothing is cached,
+    and only one chunk is held in memory at a time.
+    """
+    sales_directory = sales_directory or DEFAULT_SALES_DIR
+    files = list_sales_files(sales_directory)
+    if not files:
+        raise FileNotFoundError(f"No sales-YYYY-MM.csv files found in {sales_directory}")
+    options = _read_options(columns)
+    for file_month, path in files:
+        with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                yield _tag_month(_finish_types(chunk), file_month)
+
+
+def concat_months(months):
+    """Concatenate monthly frames, keeping categorical columns categorical across months"""
+    for column in months[0].columns:
+        if isinstance(months[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.Index(list(dict.fromkeys(c for m in months for c in m[column].cat.categories)))
+            for month in months:
+                month[column] = month[column].cat.set_categories(categories)
+    return pd.concat(months, ignore_index=True)
+
+
+class SalesCache:
+    """
+    Parsed monthly frames on disk, keyed by file path, size and modification time.
+
+    Each month is pickled on its own (protocol 5 keeps the column buffers as-is,
+    so loading is a memory copy rather than a parse). A small JSON manifest maps
+    each source file and column selection to its entry; a month is re-parsed only
+    when its file is new or its size or mtime changed.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.cache_dir, 'manifest.json')
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_key(path):
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'version': CACHE_VERSION}
+
+    @staticmethod
+    def _entry_id(path, columns=None):
+        # One entry per file and column selection
+        return f"{os.path.abspath(path)}|{','.join(sorted(columns or SALES_SCHEMA))}"
+
+    def _entry_path(self, path, file_month, columns=None):
+        digest = hashlib.sha1(self._entry_id(path, columns).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{file_month}-{digest}.pkl")
+
+    def get(self, path, key, columns=None):
+        """The cached frame for a file if its key still matches, else None"""
+        entry = self.manifest.get(self._entry_id(path, columns))
+        if entry is None or entry['key'] != key or not os.path.exists(entry['file']):
+            self.misses += 1
+            return None
+        with open(entry['file'], 'rb') as f:
+            data = pickle.load(f)
+        self.hits += 1
+        return data
+
+    def put(self, path, file_month, key, data, columns=None):
+        entry_file = self._entry_path(path, file_month, columns)
+        tmp = entry_file + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(data, f, protocol=5)
+        os.replace(tmp, entry_file)
+        self.manifest[self._entry_id(path, columns)] = {'key': key, 'file': entry_file}
+
+    def prune(self, sales_directory, keep_paths):
+        """Drop entries of files that were removed from a sales folder"""
+        sales_directory = os.path.abspath(sales_directory)
+        keep = {os.path.abspath(p) for p in keep_paths}
+        for entry_id in list(self.manifest):
+            path = entry_id.split('|')[0]
+            if os.path.dirname(path) == sales_directory and path not in keep:
+                entry = self.manifest.pop(entry_id)
+                if os.path.exists(entry['file']):
+                    os.remove(entry['file'])
+
+    def save(self):
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+
+def parse_sales_files(files, columns=None, workers=None):
+    """
+    Parse several monthly exports, in parallel processes when there is more than one.
+
+    Results come back in the order of `files`, whatever order the workers finish in.
+    """
+    if not files:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    if workers == 1:
+        return [parse_sales_file(path, file_month, columns) for file_month, path in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(parse_sales_file, columns=columns),
+                             [path for _, path in files], [file_month for file_month, _ in files]))
+
+
+def load_sales(sales_directory=None, cache=None, columns=None, workers=None):
+    """
+    All monthly exports as one frame, in file-month order.
+
+    Args:
+        sales_directory (str): Folder with sales-YYYY-MM.csv files (default: sales/ next to this script)
+        cache (SalesCache): Parsed-month cache (default: cache/ next to this script); False disables it
+        columns (list): Schema columns to load (default: all); Date is always loaded
+        workers (int): Processes parsing new or changed months (default: CPU count)
+
+    Returns:
+        DataFrame: every row with a valid Date, plus File_Month and Item Count columns
+    """
+    sales_directory = sales_directory or DEFAULT_SALES_DIR
+    if cache is None:
+        cache = SalesCache()
+    files = list_sales_files(sales_directory)
+
+    # Cached months load straight away; the rest are parsed together
+    months = {}
+    keys = {}
+    stale = []
+    for file_month, path in files:
+        if cache:
+            keys[path] = SalesCache.file_key(path)
+            months[path] = cache.get(path, keys[path], columns)
+        if months.get(path) is None:
+            stale.append((file_month, path))
+
+    for (file_month, path), data in zip(stale, parse_sales_files(stale, columns, workers)):
+        months[path] = data
+        if cache:
+            cache.put(path, file_month, keys[path], data, columns)
+
+    if cache:
+        before = len(cache.manifest)
+        cache.prune(sales_directory, [path for _, path in files])
+        if stale or len(cache.manifest) != before:
+            cache.save()
+
+    if not files:
+        raise FileNotFoundError(f"No sales-YYYY-MM.csv files found in {sales_directory}")
+    return concat_months([months[path] for _, path in files])
@@ -0,0 +1,321 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from sales_loader import DEFAULT_SALES_DIR, SALES_SCHEMA, SCRIPT_DIRECTORY, list_sales_files, parse_sales_file
+
+# SQLite database the monthly exports are ingested into
+DEFAULT_STORE_PATH = os.path.join(SCRIPT_DIRECTORY, 'sales.db')
+
+# Export column -> store column
+STORE_COLUMNS = {
+    'Date': 'date',
+    'User': 'user',
+    'Buyer country': 'buyer_country',
+    'Design': 'design',
+    'Total before tax (EUR)': 'total_before_tax',
+    'VAT (%)': 'vat_pct',
+    'VAT base (% of Total before tax)': 'vat_base_pct',
+    'VAT EUR': 'vat',
+    'Total including VAT EUR': 'total_including_vat',
+    'Cults Commission EUR': 'commission',
+    'Income EUR': 'income',
+    'Total in currency': 'total_in_currency',
+    'Currency': 'currency',
+    'Status': 'status',
+    'Initial price in currency': 'initial_price_in_currency',
+    'Discount': 'discount_pct',
+    'Coupon': 'coupon'
+}
+
+# Columns the ad-hoc questions filter on
+INDEXED_COLUMNS = ['date', 'design', 'buyer_country', 'status', 'file_month']
+
+# Export columns kept in the per-day summary table (besides file month, date and refund flag)
+DAILY_COLUMNS = {'Design': 'design', 'Buyer country': 'buyer_country'}
+
+# A sale is identified by these columns; Status (Pending -> Paid / Refunded) may change under the same key
+ROW_KEY_COLUMNS = ['Date', 'User', 'Design', 'Total before tax (EUR)', 'Total including VAT EUR', 'Income EUR',
+                   'Total in currency', 'Currency']
+
+# Bump whenever the tables change; older databases are rebuilt from the exports
+STORE_VERSION = 2
+
+# Same test as sales_aggregation.refund_mask (LIKE is case-insensitive)
+REFUNDED_SQL = "status LIKE '%refunded%'"
+
+
+class SalesStore:
+    """
+    The monthly sales exports ingested into a local SQLite database.
+
+    One row per sale, with indexes on date, design, buyer country and status, so
+    questions about a design, a country, a buyer or refunds are answered by
+    indexed queries instead of re-reading every CSV. A per-day summary table
+    (income and items per file month, day, refund flag, design and country) is
+    kept next to it for the charts and rankings.
+
+    Ingestion is incremental and idempotent. Only exports whose size or
+    modification time changed are re-read, and their rows are upserted by a
+    stable key (a hash of date, buyer, design and totals): new sales are inserted,
+    sales whose status or other fields changed are updated in place and sales no
+    longer in the export are deleted. Re-downloading an unchanged export writes
+    nothing.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_STORE_PATH
+        self.conn = sqlite3.connect(self.path)
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ', '.join(f"{STORE_COLUMNS[c]} {'TEXT' if kind in ('datetime', 'str', 'category') else 'REAL'}"
+                            for c, kind in SALES_SCHEMA.items())
+        with self.conn:
+            # Everything in the store can be re-ingested from the exports
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < STORE_VERSION:
+                for table in ['sales', 'daily_sales', 'files']:
+                    self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self.conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS sales "
+                              f"(row_key TEXT PRIMARY KEY, {columns}, file_month TEXT NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS files "
+                              "(path TEXT PRIMARY KEY, file_month TEXT, size INTEGER, mtime_ns INTEGER)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS daily_sales (file_month TEXT, date TEXT, refunded INTEGER, "
+                              "design TEXT, buyer_country TEXT, income REAL, items INTEGER)")
+            for column in INDEXED_COLUMNS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS sales_{column} ON sales ({column})")
+            for column in ['date', 'design', 'file_month']:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS daily_sales_{column} ON daily_sales ({column})")
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _to_rows(data):
+        """
+        Parsed export -> tuples in store column order (row key, ISO dates, amounts
+        rounded to cents, NULL for missing, file month).
+
+        The row key hashes ROW_KEY_COLUMNS; identical sales in one export (same buyer,
+        design, day and amounts) are told apart by their occurrence number.
+        """
+        values = {}
+        for column, kind in SALES_SCHEMA.items():
+            series = data[column]
+            if kind == 'datetime':
+                series = series.dt.strftime('%Y-%m-%d')
+            elif kind in ('float32', 'percent'):
+                series = series.astype('float64').round(2)
+            values[column] = series.astype(object).where(series.notna(), None).tolist()
+
+        identities = ['|'.join('' if v is None else f'{v:.2f}' if isinstance(v, float) else str(v) for v in row)
+                      for row in zip(*(values[c] for c in ROW_KEY_COLUMNS))]
+        occurrence = pd.Series(identities).groupby(identities).cumcount().tolist()
+        keys = [hashlib.sha1(f'{identity}#{n}'.encode('utf-8')).hexdigest()
+                for identity, n in zip(identities, occurrence)]
+        return list(zip(keys, *values.values(), data['File_Month'].astype(str).tolist()))
+
+    def ingest(self, sales_directory=None):
+        """
+        Upsert the rows of new or changed exports of a sales folder, and drop the rows
+        of exports that were removed from it.
+
+        Returns:
+            dict: files re-read, rows inserted / updated / deleted, and a Counter of
+                  (old status, new status) changes
+        """
+        sales_directory = sales_directory or DEFAULT_SALES_DIR
+        files = list_sales_files(sales_directory)
+        known = {path: (size, mtime_ns) for path, size, mtime_ns in
+                 self.conn.execute("SELECT path, size, mtime_ns FROM files")}
+        columns = ['row_key'] + list(STORE_COLUMNS.values()) + ['file_month']
+        status = columns.index('status')
+        upsert = (f"INSERT INTO sales VALUES ({', '.join('?' * len(columns))}) ON CONFLICT (row_key) DO UPDATE SET "
+                  + ', '.join(f"{c} = excluded.{c}" for c in columns[1:]))
+        counts = {'files': 0, 'inserted': 0, 'updated': 0, 'deleted': 0, 'status_changes': Counter()}
+
+        for file_month, path in files:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            if known.get(path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            rows = self._to_rows(parse_sales_file(path, file_month))
+            stored = {row[0]: row for row in
+                      self.conn.execute(f"SELECT {', '.join(columns)} FROM sales WHERE file_month = ?", (file_month,))}
+
+            # Only rows that are new or differ from the stored ones are written
+            changed = [row for row in rows if stored.get(row[0]) != row]
+            incoming = {row[0] for row in rows}
+            removed = [(key,) for key in stored if key not in incoming]
+            for row in changed:
+                if row[0] in stored:
+                    counts['updated'] += 1
+                    if stored[row[0]][status] != row[status]:
+                        counts['status_changes'][(stored[row[0]][status], row[status])] += 1
+                else:
+                    counts['inserted'] += 1
+            counts['deleted'] += len(removed)
+
+            with self.conn:
+                if changed or removed:
+                    self.conn.executemany(upsert, changed)
+                    self.conn.executemany("DELETE FROM sales WHERE row_key = ?", removed)
+                    self._refresh_daily(file_month)
+                self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                  (path, file_month, stat.st_size, stat.st_mtime_ns))
+            counts['files'] += 1
+
+        # Exports removed from the folder
+        current = {os.path.abspath(path) for _, path in files}
+        sales_directory = os.path.abspath(sales_directory)
+        for path in known:
+            if os.path.dirname(path) == sales_directory and path not in current:
+                with self.conn:
+                    file_month = self.conn.execute("SELECT file_month FROM files WHERE path = ?", (path,)).fetchone()[0]
+                    counts['deleted'] += self.conn.execute("DELETE FROM sales WHERE file_month = ?",
+                                                           (file_month,)).rowcount
+                    self._refresh_daily(file_month)
+                    self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return counts
+
+    def _refresh_daily(self, file_month):
+        """Recompute a file month's rows of the per-day summary table (inside the caller's transaction)"""
+        self.conn.execute("DELETE FROM daily_sales WHERE file_month = ?", (file_month,))
+        self.conn.execute(f"INSERT INTO daily_sales SELECT file_month, date, {REFUNDED_SQL}, design, buyer_country, "
+                          f"SUM(income), COUNT(*) FROM sales WHERE file_month = ? "
+                          f"GROUP BY date, {REFUNDED_SQL}, design, buyer_country", (file_month,))
+
+    @staticmethod
+    def _where(start=None, end=None, design=None, country=None, buyer=None, status=None, refunded=None,
+               daily=False):
+        """
+        WHERE clause and parameters for the usual filters (dates are inclusive, status is a
+        substring). With daily=True the clause is for the per-day summary table, which
+        has no buyer or status.
+        """
+        if daily and (buyer is not None or status is not None):
+            raise ValueError("The per-day summary has no buyer or status; use query() for those filters")
+        clauses = []
+        params = []
+        for column, value in [('date >=', start), ('date <=', end), ('design =', design),
+                              ('buyer_country =', country), ('user =', buyer)]:
+            if value is not None:
+                clauses.append(f"{column} ?")
+                params.append(pd.Timestamp(value).strftime('%Y-%m-%d') if column.startswith('date') else value)
+        if status is not None:
+            clauses.append("status LIKE ?")
+            params.append(f"%{status}%")
+        if refunded is not None:
+            refunded_sql = 'refunded' if daily else REFUNDED_SQL
+            clauses.append(refunded_sql if refunded else f"NOT {refunded_sql}")
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, columns=None, **filters):
+        """
+        Matching sales rows shaped like sales_loader.load_sales: typed export columns
+        plus File_Month and Item Count.
+
+        Args:
+            columns (list): Export columns to return (default: all); Date is always included
+            **filters: start, end, design, country, buyer, status, refunded (see _where)
+        """
+        columns = ['Date'] + [c for c in (columns or SALES_SCHEMA) if c != 'Date']
+        where, params = self._where(**filters)
+        select = ', '.join(STORE_COLUMNS[c] for c in columns)
+        data = pd.read_sql_query(f"SELECT {select}, file_month FROM sales{where} ORDER BY file_month, rowid",
+                                 self.conn, params=params)
+        data.columns = columns + ['File_Month']
+
+        for column in columns:
+            kind = SALES_SCHEMA[column]
+            if kind == 'datetime':
+                data[column] = pd.to_datetime(data[column], format='%Y-%m-%d')
+            elif kind in ('float32', 'percent'):
+                data[column] = data[column].astype('float32')
+            elif kind == 'category':
+                data[column] = data[column].astype('category')
+        data['File_Month'] = data['File_Month'].astype('category')
+        data['Item Count'] = np.ones(len(data), dtype='int32')
+        return data
+
+    def daily_rollup(self, by=None, **filters):
+        """
+        sales_aggregation.daily_rollup read from the per-day summary table: income and
+        items sold per file month, day and refund flag.
+
+        Args:
+            by (list): Extra columns to keep: 'Design' and/or 'Buyer country'
+            **filters: start, end, design, country, refunded (see _where)
+        """
+        by = list(by or [])
+        unknown = [c for c in by if c not in DAILY_COLUMNS]
+        if unknown:
+            raise ValueError(f"The per-day summary has no {', '.join(unknown)} column")
+        keys = ['file_month', 'date', 'refunded'] + [DAILY_COLUMNS[c] for c in by]
+        where, params = self._where(daily=True, **filters)
+        rollup = pd.read_sql_query(
+            f"SELECT {', '.join(keys)}, SUM(income), SUM(items) FROM daily_sales{where} "
+            f"GROUP BY {', '.join(keys)} ORDER BY {', '.join(keys)}", self.conn, params=params)
+        rollup.columns = ['File_Month', 'Date', 'Refunded'] + by + ['Income EUR', 'Item Count']
+        rollup['File_Month'] = rollup['File_Month'].astype('category')
+        rollup['Date'] = pd.to_datetime(rollup['Date'], format='%Y-%m-%d')
+        rollup['Refunded'] = rollup['Refunded'].astype(bool)
+        return rollup
+
+    def top_designs(self, column='Income EUR', tie_breaker='Item Count', k=10, start=None, end=None):
+        """Designs with the most non-refunded income or items sold between two dates"""
+        where, params = self._where(start=start, end=end, refunded=False, daily=True)
+        order = {'Income EUR': 'income', 'Item Count': 'items'}
+        top = pd.read_sql_query(
+            f"SELECT design, ROUND(SUM(income), 2) AS income, SUM(items) AS items FROM daily_sales{where} "
+            f"GROUP BY design HAVING design IS NOT NULL "
+            f"ORDER BY {order[column]} DESC, {order[tie_breaker]} DESC LIMIT ?", self.conn, params=params + [k])
+        top.columns = ['Design', 'Income EUR', 'Item Count']
+        return top
+
+    def totals(self, by='file_month', **filters):
+        """Items sold and income of the matching sales rows, grouped by one store column"""
+        if by not in STORE_COLUMNS.values() and by != 'file_month':
+            raise ValueError(f"Unknown store column: {by}")
+        where, params = self._where(**filters)
+        return pd.read_sql_query(
+            f"SELECT {by}, COUNT(*) AS items, ROUND(SUM(income), 2) AS income_eur FROM sales{where} "
+            f"GROUP BY {by} ORDER BY income_eur DESC", self.conn, params=params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the monthly sales exports and answer ad-hoc questions")
+    parser.add_argument('--db', help="SQLite file (default: sales.db next to this script)")
+    parser.add_argument('--sales-dir', help="Folder with sales-YYYY-MM.csv files (default: sales/)")
+    parser.add_argument('--from', dest='start', metavar='YYYY-MM-DD', help="First sale date")
+    parser.add_argument('--to', dest='end', metavar='YYYY-MM-DD', help="Last sale date")
+    parser.add_argument('--design', help="Only this design")
+    parser.add_argument('--country', help="Only this buyer country (e.g. FR)")
+    parser.add_argument('--buyer', help="Only this buyer (User column)")
+    parser.add_argument('--status', help="Only statuses containing this text (e.g. Pending, Refunded)")
+    parser.add_argument('--by', choices=['design', 'buyer_country', 'user', 'status', 'file_month'],
+                        default='file_month', help="Group the totals by this column")
+    args = parser.parse_args()
+
+    store = SalesStore(args.db)
+    counts = store.ingest(args.sales_dir)
+    if counts['files']:
+        print(f"📥 Re-read {counts['files']} exports: {counts['inserted']} new, {counts['updated']} updated, "
+              f"{counts['deleted']} removed sales")
+        for (old, new), n in counts['status_changes'].most_common():
+            print(f"   🔄 {n} × {old} → {new}")
+
+    totals = store.totals(args.by, start=args.start, end=args.end, design=args.design, country=args.country,
+                          buyer=args.buyer, status=args.status)
+    print(totals.to_string(index=False) if len(totals) else "No matching sales")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import sales_loader
+from sales_loader import SalesCache, load_sales
+from test_sales_store import sale, write_export
+
+
+@pytest.fixture
+def sales_dir(tmp_path):
+    directory = tmp_path / 'sales'
+    directory.mkdir()
+    write_export(directory, '2024-11', [sale('2024-11-02', 'ann', 'Husky'), sale('2024-11-03', 'bob', 'Kitty')])
+    write_export(directory, '2024-12', [sale('2024-12-01', 'cat', 'Husky')])
+    return directory
+
+
+def load(sales_dir, cache_dir):
+    cache = SalesCache(str(cache_dir))
+    data = load_sales(str(sales_dir), cache=cache, workers=1)
+    return data, cache
+
+
+def test_unchanged_exports_come_from_the_cache(sales_dir, tmp_path):
+    first, cache = load(sales_dir, tmp_path / 'cache')
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    again, cache = load(sales_dir, tmp_path / 'cache')
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert again.equals(first)
+
+
+def test_changed_size_or_mtime_reparses_that_month(sales_dir, tmp_path):
+    load(sales_dir, tmp_path / 'cache')
+    path = sales_dir / 'sales-2024-12.csv'
+    write_export(sales_dir, '2024-12', [sale('2024-12-01', 'cat', 'Husky'), sale('2024-12-02', 'dan', 'Kitty')])
+    data, cache = load(sales_dir, tmp_path / 'cache')
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(data) == 4
+
+    # Same size, newer modification time
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    _, cache = load(sales_dir, tmp_path / 'cache')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_version_bump_reparses_everything(sales_dir, tmp_path, monkeypatch):
+    load(sales_dir, tmp_path / 'cache')
+    monkeypatch.setattr(sales_loader, 'CACHE_VERSION', sales_loader.CACHE_VERSION + 1)
+    _, cache = load(sales_dir, tmp_path / 'cache')
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_removed_export_is_pruned(sales_dir, tmp_path):
+    load(sales_dir, tmp_path / 'cache')
+    (sales_dir / 'sales-2024-11.csv').unlink()
+    data, cache = load(sales_dir, tmp_path / 'cache')
+    assert len(data) == 1
+    assert len(cache.manifest) == 1
+    assert len([f for f in os.listdir(tmp_path / 'cache') if f.endswith('.pkl')]) == 1
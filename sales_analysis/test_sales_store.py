@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from sales_store import SalesStore
+
+HEADER = ("Date,User,Buyer country,Design,Total before tax (EUR),VAT (%),VAT base (% of Total before tax),VAT EUR,"
+          "Total including VAT EUR,Cults Commission EUR,Income EUR,Total in currency,Currency,Status,"
+          "Initial price in currency,Discount,Coupon\n")
+
+
+def sale(date, user, design, status='⏳ Pending'):
+    return f"{date},{user},FR,{design},2.00,20%,20%,0.08,2.08,0.40,1.60,2.08,EUR,{status},,,\n"
+
+
+def write_export(directory, month, rows):
+    path = directory / f'sales-{month}.csv'
+    path.write_text(HEADER + ''.join(rows), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def sales_dir(tmp_path):
+    directory = tmp_path / 'sales'
+    directory.mkdir()
+    # The two identical sales are kept apart by their occurrence number
+    write_export(directory, '2024-11', [sale('2024-11-02', 'ann', 'Husky'), sale('2024-11-02', 'ann', 'Husky'),
+                                        sale('2024-11-03', 'bob', 'Kitty')])
+    write_export(directory, '2024-12', [sale('2024-12-01', 'cat', 'Husky')])
+    return directory
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SalesStore(str(tmp_path / 'sales.db'))
+    yield store
+    store.close()
+
+
+def row_count(store):
+    return store.conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+
+
+def test_reingesting_unchanged_exports_writes_nothing(store, sales_dir):
+    first = store.ingest(str(sales_dir))
+    assert (first['files'], first['inserted']) == (2, 4)
+    assert row_count(store) == 4
+
+    again = store.ingest(str(sales_dir))
+    assert (again['files'], again['inserted'], again['updated'], again['deleted']) == (0, 0, 0, 0)
+
+
+def test_rewritten_export_with_same_rows_writes_nothing(store, sales_dir):
+    store.ingest(str(sales_dir))
+    # A re-downloaded export: same content, newer modification time, so it is re-read
+    path = sales_dir / 'sales-2024-11.csv'
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    counts = store.ingest(str(sales_dir))
+    assert (counts['files'], counts['inserted'], counts['updated'], counts['deleted']) == (1, 0, 0, 0)
+
+
+def test_status_change_is_one_update(store, sales_dir):
+    store.ingest(str(sales_dir))
+    write_export(sales_dir, '2024-11', [sale('2024-11-02', 'ann', 'Husky'), sale('2024-11-02', 'ann', 'Husky'),
+                                        sale('2024-11-03', 'bob', 'Kitty', status='✅ Paid')])
+    counts = store.ingest(str(sales_dir))
+    assert (counts['files'], counts['inserted'], counts['updated'], counts['deleted']) == (1, 0, 1, 0)
+    assert counts['status_changes'] == {('⏳ Pending', '✅ Paid'): 1}
+    assert row_count(store) == 4
+
+
+def test_sales_missing_from_an_export_are_deleted(store, sales_dir):
+    store.ingest(str(sales_dir))
+    write_export(sales_dir, '2024-11', [sale('2024-11-02', 'ann', 'Husky'), sale('2024-11-03', 'bob', 'Kitty')])
+    counts = store.ingest(str(sales_dir))
+    assert (counts['inserted'], counts['updated'], counts['deleted']) == (0, 0, 1)
+    assert row_count(store) == 3
+
+
+def test_removed_export_drops_its_rows(store, sales_dir):
+    store.ingest(str(sales_dir))
+    (sales_dir / 'sales-2024-11.csv').unlink()
+    counts = store.ingest(str(sales_dir))
+    assert counts['deleted'] == 3
+    assert row_count(store) == 1
+    assert store.conn.execute("SELECT COUNT(*) FROM daily_sales WHERE file_month = '2024-11'").fetchone()[0] == 0